@@ -0,0 +1,141 @@
+"""
+Key/value cache backends with TTL expiry.
+
+- InMemoryCache: per-process LRU cache with per-entry TTL
+- RedisCache: shares entries across workers through any Redis-compatible
+  server (Redis, Valkey, KeyDB, ...); eviction follows the server's
+  maxmemory-policy
+
+Both expose the same async interface so callers can switch backends with
+a URL (memory:// or redis://host:port/db).
+"""
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+
+class CacheBackend(ABC):
+    """Async string key/value store with TTL."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        """Return the cached value, or None if missing or expired."""
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        """Store a value, expiring after `ttl` seconds (never if None)."""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Remove a key if present."""
+
+
+class InMemoryCache(CacheBackend):
+    """
+    Thread-safe LRU cache with per-entry TTL.
+
+    Entries are evicted least-recently-used first once `max_entries` is
+    reached.
+    """
+
+    def __init__(self, max_entries: int = 1024, clock: Callable[[], float] = time.monotonic) -> None:
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[str, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_sync(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= self.clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set_sync(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        expires_at = self.clock() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete_sync(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> Optional[str]:
+        return self.get_sync(key)
+
+    async def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        self.set_sync(key, value, ttl)
+
+    async def delete(self, key: str) -> None:
+        self.delete_sync(key)
+
+
+class RedisCache(CacheBackend):
+    """
+    Cache backed by a Redis-compatible server through redis.asyncio.
+
+    Accepts either a URL (requires the optional `redis` package) or an
+    already-constructed async client exposing get/set/delete.
+    """
+
+    def __init__(self, url: Optional[str] = None, client=None, prefix: str = "todo:") -> None:
+        if client is None:
+            try:
+                import redis.asyncio as redis_asyncio
+            except ImportError as e:
+                raise RuntimeError(
+                    "RedisCache requires the 'redis' package (pip install redis)"
+                ) from e
+            client = redis_asyncio.from_url(url, decode_responses=True)
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[str]:
+        value = await self.client.get(self.prefix + key)
+        if isinstance(value, bytes):
+            value = value.decode()
+        return value
+
+    async def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        if ttl is not None:
+            await self.client.set(self.prefix + key, value, px=max(1, int(ttl * 1000)))
+        else:
+            await self.client.set(self.prefix + key, value)
+
+    async def delete(self, key: str) -> None:
+        await self.client.delete(self.prefix + key)
+
+
+def create_cache_backend(url: str, max_entries: int = 1024) -> CacheBackend:
+    """
+    Build a cache backend from a URL.
+
+    Args:
+        url: "memory://" for the in-process cache, or a redis:// / rediss:// URL
+        max_entries: LRU capacity of the in-process cache
+
+    Raises:
+        ValueError: If the URL scheme is not supported
+    """
+    if url.startswith("memory://"):
+        return InMemoryCache(max_entries=max_entries)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCache(url)
+    raise ValueError(f"Unsupported cache URL: {url}")
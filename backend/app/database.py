@@ -1,21 +1,238 @@
 """
 Database connection and session management.
+
+Two engines share the same database:
+- a synchronous engine, used for schema creation and maintenance scripts
+- an async engine (asyncpg / aiosqlite), used by request handlers so that
+  queries never block the event loop
 """
+import time
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.config import settings
+from app.metrics import registry
+from app.models.task import task_search_ddl
+
+
+# Sync driver -> async driver for the same backend
+ASYNC_DRIVERS = {
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(database_url: str) -> str:
+    """
+    Convert a sync database URL into its async-driver equivalent.
+
+    asyncpg does not understand libpq's `sslmode`/`channel_binding` query
+    parameters, so `sslmode` is translated to asyncpg's `ssl` parameter.
+    """
+    url = make_url(database_url)
+    drivername = ASYNC_DRIVERS.get(url.drivername, url.drivername)
+
+    query = dict(url.query)
+    if drivername == "postgresql+asyncpg":
+        if "sslmode" in query:
+            query["ssl"] = query.pop("sslmode")
+        query.pop("channel_binding", None)
+
+    return url.set(drivername=drivername, query=query).render_as_string(hide_password=False)
+
+
+pool_checkout_wait = registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time a request waited to obtain a pooled connection"
+)
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+    engine_label = "sync"
+
+    def connect(self):
+        started = time.perf_counter()
+        connection = super().connect()
+        pool_checkout_wait.observe(time.perf_counter() - started, engine=self.engine_label)
+        return connection
+
+
+class TimedAsyncAdaptedQueuePool(TimedQueuePool, AsyncAdaptedQueuePool):
+    """The async engine's pool, with checkout wait timing."""
+    engine_label = "async"
+
+
+def engine_options(database_url: str, is_async: bool = False) -> dict:
+    """
+    Build create_engine keyword arguments from settings.
+
+    Pool sizing and statement timeouts only apply to server databases;
+    SQLite keeps SQLAlchemy's default pool for its driver.
+    """
+    options = {
+        "echo": settings.db_echo,
+        "pool_pre_ping": True,  # Verify connections before using them
+    }
+    if make_url(database_url).get_backend_name() == "sqlite":
+        return options
+
+    options.update(
+        # Checkouts are timed in the pool itself, so sessions can stay lazy
+        poolclass=TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+    )
+    if settings.db_statement_timeout_ms:
+        timeout = str(settings.db_statement_timeout_ms)
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": timeout}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return options
 
 
 # Create database engine
-engine = create_engine(
-    settings.database_url,
-    echo=True,  # Set to False in production
-    pool_pre_ping=True,  # Verify connections before using them
+engine = create_engine(settings.database_url, **engine_options(settings.database_url))
+
+# Async engine used by the API routes and the chat service
+async_engine = create_async_engine(
+    to_async_url(settings.database_url),
+    **engine_options(settings.database_url, is_async=True)
+)
+
+
+
+def wrap_connect_errors(sync_engine) -> None:
+    """
+    Report a failed connect as a DBAPI error, as the sync driver does.
+
+    asyncpg raises plain OSErrors (connection refused, host unreachable),
+    which SQLAlchemy does not wrap; as OperationalError they reach the
+    database error handler instead of surfacing as unhandled exceptions.
+    """
+    @event.listens_for(sync_engine, "do_connect")
+    def connect(dialect, connection_record, cargs, cparams):
+        try:
+            return dialect.connect(*cargs, **cparams)
+        except OSError as e:
+            raise dialect.loaded_dbapi.OperationalError(str(e)) from e
+
+
+wrap_connect_errors(async_engine.sync_engine)
+
+
+# ============ Pool metrics ============
+
+POOL_ENGINES = {"sync": engine, "async": async_engine.sync_engine}
+
+pool_connection_hold = registry.histogram(
+    "db_pool_connection_hold_seconds",
+    "Time a connection stayed checked out of the pool"
 )
+pool_checkouts = registry.counter("db_pool_checkouts_total", "Connections checked out of the pool")
+pool_connects = registry.counter("db_pool_connects_total", "New DBAPI connections opened by the pool")
+
+
+def _pool_stat(method: str):
+    """Gauge callback reading a QueuePool statistic from every engine that has it."""
+    def collect():
+        for name, eng in POOL_ENGINES.items():
+            reader = getattr(eng.pool, method, None)
+            if reader is not None:
+                yield {"engine": name}, reader()
+    return collect
+
+
+registry.gauge("db_pool_checked_out", "Connections currently checked out", _pool_stat("checkedout"))
+registry.gauge("db_pool_overflow", "Connections open beyond pool_size", _pool_stat("overflow"))
+registry.gauge("db_pool_size", "Configured pool size", _pool_stat("size"))
+
+
+def _instrument_pool(sync_engine, name: str) -> None:
+    """Track connection hold times and counters through pool events."""
+    @event.listens_for(sync_engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        pool_connects.inc(engine=name)
+
+    @event.listens_for(sync_engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        pool_checkouts.inc(engine=name)
+        connection_record.info["checked_out_at"] = time.perf_counter()
+
+    @event.listens_for(sync_engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        started = connection_record.info.pop("checked_out_at", None)
+        if started is not None:
+            pool_connection_hold.observe(time.perf_counter() - started, engine=name)
+
+
+for _name, _engine in POOL_ENGINES.items():
+    _instrument_pool(_engine, _name)
+
+
+def add_missing_columns(conn) -> None:
+    """
+    Add model columns that existing tables lack.
+
+    create_all only creates missing tables, so a column added to a model
+    later (such as tasks.change_seq) is added here. Additive only: columns
+    are never altered or dropped. A NOT NULL column needs a server default.
+    """
+    inspector = inspect(conn)
+    for table in SQLModel.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(conn.dialect)}"
+            if column.server_default is not None:
+                ddl += f" DEFAULT {column.server_default.arg} NOT NULL"
+            conn.execute(text(ddl))
+
+
+def convert_timestamps_to_utc(conn) -> None:
+    """
+    Turn PostgreSQL TIMESTAMP columns the models declare timezone-aware into TIMESTAMPTZ.
+
+    Tables created before the models used DateTime(timezone=True) store naive
+    UTC values; they are reinterpreted as UTC. Idempotent.
+    """
+    existing = {
+        (row.table_name, row.column_name)
+        for row in conn.execute(text(
+            "SELECT table_name, column_name FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND data_type = 'timestamp without time zone'"
+        ))
+    }
+    for table in SQLModel.metadata.sorted_tables:
+        for column in table.columns:
+            if getattr(column.type, "timezone", False) and (table.name, column.name) in existing:
+                conn.execute(text(
+                    f'ALTER TABLE "{table.name}" ALTER COLUMN {column.name} '
+                    f"TYPE TIMESTAMP WITH TIME ZONE USING {column.name} AT TIME ZONE 'UTC'"
+                ))
 
 
 def create_db_and_tables():
-    """Create all database tables."""
+    """Create all database tables and missing columns, plus the full-text search column on PostgreSQL."""
     SQLModel.metadata.create_all(engine)
+    with engine.begin() as conn:
+        add_missing_columns(conn)
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            convert_timestamps_to_utc(conn)
+            for statement in task_search_ddl(settings.search_language):
+                conn.execute(text(statement))
 
 
 def get_session():
@@ -25,3 +242,14 @@ def get_session():
     """
     with Session(engine) as session:
         yield session
+
+
+async def get_async_session():
+    """
+    Dependency function to get an async database session.
+
+    expire_on_commit is disabled so returned ORM objects can still be
+    serialized after commit without triggering lazy (blocking) loads.
+    """
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
@@ -0,0 +1,60 @@
+"""
+Entity tag helpers for conditional GET requests.
+
+ETags are derived from a cheap fingerprint of the underlying rows (row
+count, newest updated_at, change sequence, ...) rather than from the response
+body, so an unchanged resource can be answered with 304 Not Modified
+before the full query runs or anything is serialized.
+"""
+import hashlib
+import json
+from typing import Any, Optional
+
+from fastapi import Response, status
+
+
+# Clients must revalidate on every use, and shared caches must not store per-user data
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Build a strong ETag from the values that identify a resource's state.
+
+    Args:
+        *parts: JSON-serializable fingerprint values (datetimes are stringified)
+
+    Returns:
+        str: Quoted entity tag
+    """
+    raw = json.dumps(parts, default=str, separators=(",", ":"))
+    return '"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against the current ETag.
+
+    Uses the weak comparison RFC 9110 prescribes for If-None-Match, so a
+    W/ prefix added by a proxy still matches.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def not_modified(etag: str) -> Response:
+    """Return an empty 304 response carrying the current validators."""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    )
+
+
+def set_etag(response: Response, etag: str) -> None:
+    """Attach the ETag and revalidation policy to a full response."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
@@ -2,13 +2,18 @@
 FastAPI application entry point.
 """
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 from app.config import settings
-from app.database import create_db_and_tables
+from app.database import create_db_and_tables, engine
+from app.metrics import registry
 from app.routes import tasks, chat
+from app.services.task_events import task_events
+from app.services.message_writer import message_writer
+from app.services.task_sync import tombstone_compactor
 from app.exceptions import (
     validation_exception_handler,
     sqlalchemy_exception_handler,
@@ -37,6 +42,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 # Include routers
@@ -49,11 +55,8 @@ async def on_startup():
     """Initialize database tables on startup."""
     create_db_and_tables()
     
-    # Fix foreign key constraints
-    import os
-    from sqlalchemy import create_engine, text
+    # Fix foreign key constraints (reuses the shared pool instead of a throwaway engine)
     try:
-        engine = create_engine(settings.database_url)
         with engine.connect() as conn:
             # Drop foreign key constraints that prevent user-less operation
             conn.execute(text("ALTER TABLE IF EXISTS conversations DROP CONSTRAINT IF EXISTS conversations_user_id_fkey"))
@@ -62,10 +65,27 @@ async def on_startup():
             conn.execute(text("ALTER TABLE IF EXISTS tasks DROP CONSTRAINT IF EXISTS tasks_user_id_fkey"))
             conn.commit()
             print("✓ Foreign key constraints removed")
-        engine.dispose()
     except Exception as e:
         print(f"Warning: Could not remove foreign keys: {e}")
 
+    # Fan task changes out to open change-feed streams (LISTEN on PostgreSQL)
+    await task_events.start()
+
+    # Purge tombstones the change feed no longer needs
+    await tombstone_compactor.start()
+
+    # Batch chat message writes off the request path
+    await message_writer.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    """Stop background listeners and jobs."""
+    await task_events.stop()
+    await tombstone_compactor.stop()
+    # Flush buffered chat messages before exiting
+    await message_writer.stop()
+
 
 @app.get("/health")
 async def health_check():
@@ -80,6 +100,15 @@ async def health_check():
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Metrics endpoint in the Prometheus text format.
+    Reports connection pool usage, pool wait and connection hold times.
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/")
 async def root():
     """Root endpoint with API information."""
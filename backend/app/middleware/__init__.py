@@ -5,6 +5,9 @@ from app.middleware.auth import (
     get_current_user,
     validate_user_id,
     verify_jwt_token,
+    invalidate_token,
+    invalidate_user,
+    clear_auth_caches,
     security
 )
 
@@ -12,5 +15,8 @@ __all__ = [
     "get_current_user",
     "validate_user_id",
     "verify_jwt_token",
+    "invalidate_token",
+    "invalidate_user",
+    "clear_auth_caches",
     "security"
 ]
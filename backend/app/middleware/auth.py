@@ -1,15 +1,25 @@
 """
 JWT Authentication Middleware for FastAPI.
 Handles token verification and user authentication.
+
+Verified token claims are cached per process until the token's `exp`, and
+user rows for a short TTL, so a typical request needs neither an HMAC
+verification nor a database round trip.
 """
-from typing import Optional
+import hashlib
+import json
+import time
+from typing import Optional, Union
 from uuid import UUID
 from fastapi import Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.cache import InMemoryCache
 from app.config import settings
-from app.database import get_session
+from app.database import get_async_session
+from app.metrics import registry
 from app.models.user import User
 from app.errors import unauthorized_error, forbidden_error, bad_request_error
 
@@ -18,6 +28,35 @@ from app.errors import unauthorized_error, forbidden_error, bad_request_error
 # auto_error=True makes it return 403 by default, but we want 401
 security = HTTPBearer(auto_error=False)
 
+auth_cache_requests = registry.counter(
+    "auth_cache_requests_total",
+    "Auth cache lookups by cache (token/user) and result (hit/miss)"
+)
+
+# Verified claims keyed by token hash; never holds tokens that failed verification
+token_cache = InMemoryCache(max_entries=settings.auth_cache_max_entries)
+user_cache = InMemoryCache(max_entries=settings.auth_cache_max_entries)
+
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def invalidate_token(token: str) -> None:
+    """Forget the cached claims of a token (e.g. on logout or revocation)."""
+    token_cache.delete_sync(_token_key(token))
+
+
+def invalidate_user(user_id: Union[str, UUID]) -> None:
+    """Forget a cached user row; call after the user is updated or deleted."""
+    user_cache.delete_sync(str(user_id))
+
+
+def clear_auth_caches() -> None:
+    """Drop every cached token and user (e.g. after rotating the JWT secret)."""
+    token_cache.clear()
+    user_cache.clear()
+
 
 def verify_jwt_token(token: str) -> dict:
     """
@@ -32,20 +71,51 @@ def verify_jwt_token(token: str) -> dict:
     Raises:
         HTTPException: If token is invalid or expired
     """
+    if settings.auth_cache_enabled:
+        cached = token_cache.get_sync(_token_key(token))
+        auth_cache_requests.inc(cache="token", result="hit" if cached is not None else "miss")
+        if cached is not None:
+            return json.loads(cached)
+
     try:
         payload = jwt.decode(
             token,
             settings.effective_jwt_secret,
             algorithms=[settings.jwt_algorithm]
         )
-        return payload
     except JWTError as e:
         raise unauthorized_error("Invalid or expired token") from e
 
+    # Only tokens with an expiry are cached, and never beyond it
+    exp = payload.get("exp")
+    if settings.auth_cache_enabled and isinstance(exp, (int, float)):
+        ttl = exp - time.time()
+        if ttl > 0:
+            token_cache.set_sync(_token_key(token), json.dumps(payload), ttl=ttl)
+    return payload
+
+
+async def _load_user(session: AsyncSession, user_id: UUID) -> Optional[User]:
+    """Fetch a user, going through the short-TTL user cache."""
+    if settings.auth_cache_enabled:
+        cached = user_cache.get_sync(str(user_id))
+        auth_cache_requests.inc(cache="user", result="hit" if cached is not None else "miss")
+        if cached is not None:
+            return User.model_validate(json.loads(cached))
+
+    statement = select(User).where(User.id == user_id)
+    user = (await session.exec(statement)).first()
+
+    if user is not None and settings.auth_cache_enabled:
+        user_cache.set_sync(
+            str(user_id), user.model_dump_json(), ttl=settings.auth_user_cache_ttl_seconds
+        )
+    return user
+
 
 async def get_current_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ) -> User:
     """
     Dependency to get the current authenticated user from JWT token.
@@ -79,9 +149,8 @@ async def get_current_user(
     except ValueError as e:
         raise unauthorized_error("Invalid token payload: malformed user ID") from e
 
-    # Query user from database
-    statement = select(User).where(User.id == user_id)
-    user = session.exec(statement).first()
+    # Query user from database (or the user cache)
+    user = await _load_user(session, user_id)
 
     if user is None:
         raise unauthorized_error("User not found")
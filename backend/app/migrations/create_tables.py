@@ -9,7 +9,9 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from app.database import create_db_and_tables, engine
+from app.config import settings
 from app.models import User, Task
+from app.models.task import task_search_ddl
 from sqlmodel import text
 
 
@@ -21,10 +23,40 @@ def create_indexes():
         conn.execute(text(
             "CREATE INDEX IF NOT EXISTS idx_tasks_completed ON tasks(completed)"
         ))
-        # Composite index on tasks(user_id, completed)
+        # Composite indexes backing the filtered, sorted and paginated task list:
+        # (user_id[, completed], created_at|updated_at, id)
         conn.execute(text(
-            "CREATE INDEX IF NOT EXISTS idx_tasks_user_completed ON tasks(user_id, completed)"
+            "CREATE INDEX IF NOT EXISTS idx_tasks_user_created_id ON tasks(user_id, created_at, id)"
         ))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_tasks_user_updated_id ON tasks(user_id, updated_at, id)"
+        ))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_tasks_user_completed_created_id "
+            "ON tasks(user_id, completed, created_at, id)"
+        ))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_tasks_user_completed_updated_id "
+            "ON tasks(user_id, completed, updated_at, id)"
+        ))
+        # Incremental sync: changes in (change_seq, id) order, and old tombstones
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_tasks_user_change_seq_id ON tasks(user_id, change_seq, id)"
+        ))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_tasks_deleted_at ON tasks(deleted_at)"
+        ))
+        # Superseded by idx_tasks_user_completed_created_id (same leading columns)
+        conn.execute(text("DROP INDEX IF EXISTS idx_tasks_user_completed"))
+        # Composite index backing keyset pagination of the conversation list
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_conversations_user_updated_id "
+            "ON conversations(user_id, updated_at, id)"
+        ))
+        # Full-text search column and GIN index (PostgreSQL only)
+        if engine.dialect.name == "postgresql":
+            for statement in task_search_ddl(settings.search_language):
+                conn.execute(text(statement))
         conn.commit()
         print("✓ Indexes created successfully")
 
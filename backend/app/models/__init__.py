@@ -2,7 +2,7 @@
 Database models package.
 """
 from app.models.user import User
-from app.models.task import Task
+from app.models.task import Task, TaskChangeCounter
 from app.models.conversation import Conversation, Message
 
-__all__ = ["User", "Task", "Conversation", "Message"]
+__all__ = ["User", "Task", "TaskChangeCounter", "Conversation", "Message"]
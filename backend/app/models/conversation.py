@@ -4,6 +4,7 @@ Conversation and Message models for AI chatbot.
 from datetime import datetime, UTC
 from typing import Optional, List
 from uuid import UUID
+from sqlalchemy import DateTime, Index
 from sqlmodel import SQLModel, Field, Relationship
 
 
@@ -18,12 +19,16 @@ class Conversation(SQLModel, table=True):
     Each conversation belongs to a specific user.
     """
     __tablename__ = "conversations"
+    __table_args__ = (
+        # Keyset pagination index for the most-recently-updated conversation list
+        Index("idx_conversations_user_updated_id", "user_id", "updated_at", "id"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: UUID = Field(index=True)  # No foreign key constraint
     title: Optional[str] = Field(default="New Conversation", max_length=200)
-    created_at: datetime = Field(default_factory=utc_now)
-    updated_at: datetime = Field(default_factory=utc_now)
+    created_at: datetime = Field(default_factory=utc_now, sa_type=DateTime(timezone=True))
+    updated_at: datetime = Field(default_factory=utc_now, sa_type=DateTime(timezone=True))
 
     # Relationships removed - no foreign keys
 
@@ -40,6 +45,6 @@ class Message(SQLModel, table=True):
     role: str = Field(max_length=20)  # "user" or "assistant"
     content: str = Field()
     tool_calls: Optional[str] = Field(default=None)  # JSON string of tool calls
-    created_at: datetime = Field(default_factory=utc_now)
+    created_at: datetime = Field(default_factory=utc_now, sa_type=DateTime(timezone=True))
 
     # Relationships removed - no foreign keys
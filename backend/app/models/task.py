@@ -4,6 +4,7 @@ Task model for todo items.
 from datetime import datetime, UTC
 from typing import Optional
 from uuid import UUID
+from sqlalchemy import DateTime, Index
 from sqlmodel import SQLModel, Field, Relationship
 
 
@@ -18,13 +19,66 @@ class Task(SQLModel, table=True):
     Each task belongs to a specific user.
     """
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Keyset pagination indexes: each page of the task list is a range scan
+        # on (user_id[, completed], sort column, id), in either direction
+        Index("idx_tasks_user_created_id", "user_id", "created_at", "id"),
+        Index("idx_tasks_user_updated_id", "user_id", "updated_at", "id"),
+        Index("idx_tasks_user_completed_created_id", "user_id", "completed", "created_at", "id"),
+        Index("idx_tasks_user_completed_updated_id", "user_id", "completed", "updated_at", "id"),
+        # Incremental sync reads a user's changes in (change_seq, id) order;
+        # tombstone compaction looks up old deletes
+        Index("idx_tasks_user_change_seq_id", "user_id", "change_seq", "id"),
+        Index("idx_tasks_deleted_at", "deleted_at"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: UUID = Field(index=True)  # No foreign key constraint
     title: str = Field(max_length=200)
     description: Optional[str] = Field(default=None)
     completed: bool = Field(default=False)
-    created_at: datetime = Field(default_factory=utc_now)
-    updated_at: datetime = Field(default_factory=utc_now)
+    # Timestamps are timezone-aware (TIMESTAMPTZ on PostgreSQL), like utc_now()
+    created_at: datetime = Field(default_factory=utc_now, sa_type=DateTime(timezone=True))
+    updated_at: datetime = Field(default_factory=utc_now, sa_type=DateTime(timezone=True))
+    # Incremental sync: sequence number of the last write to this task (see
+    # TaskChangeCounter), and when it was deleted. Deleted tasks stay behind
+    # as tombstones until compaction removes them.
+    change_seq: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    deleted_at: Optional[datetime] = Field(default=None, sa_type=DateTime(timezone=True))
 
     # Relationships removed - no foreign keys
+
+
+class TaskChangeCounter(SQLModel, table=True):
+    """
+    Per-user change sequence for incremental sync.
+
+    `seq` is the last sequence number handed to a write transaction; every
+    task that transaction touches is stamped with it. `purged_seq` is the
+    highest sequence of a tombstone removed by compaction: a sync cursor
+    older than that may have missed deletes.
+    """
+    __tablename__ = "task_change_counters"
+
+    user_id: UUID = Field(primary_key=True)
+    seq: int = Field(default=0)
+    purged_seq: int = Field(default=0)
+
+
+def task_search_ddl(language: str) -> tuple:
+    """
+    PostgreSQL full-text search schema for tasks (idempotent).
+
+    A stored generated tsvector column weights title words (A) above
+    description words (B) and is kept current by PostgreSQL itself; a GIN
+    index over it serves `search_vector @@ tsquery`. The column is not part
+    of the model, so SQLite schemas are unaffected.
+    """
+    return (
+        "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        "GENERATED ALWAYS AS ("
+        f"setweight(to_tsvector('{language}', coalesce(title, '')), 'A') || "
+        f"setweight(to_tsvector('{language}', coalesce(description, '')), 'B')"
+        ") STORED",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_search ON tasks USING GIN (search_vector)",
+    )
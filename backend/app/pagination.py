@@ -0,0 +1,126 @@
+"""
+Keyset (cursor) pagination helpers.
+
+Continuation tokens are opaque to clients: they are URL-safe base64 encoded
+JSON documents holding the (timestamp, id) sort key of the last row on the
+previous page. Lists ordered by created_at or updated_at share the format.
+The change feed's sync cursors use the same encoding for a (change
+sequence, id) position, flagged when it lies inside a full snapshot.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime, UTC
+from typing import Optional, Tuple
+
+from app.config import settings
+from app.errors import bad_request_error
+
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    """
+    Encode a (timestamp, id) keyset position into an opaque cursor.
+
+    Args:
+        timestamp: Sort timestamp of the last row on the page
+        row_id: Primary key of the last row on the page
+
+    Returns:
+        str: URL-safe continuation token
+    """
+    return _encode({"c": timestamp.isoformat(), "i": row_id})
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a continuation token produced by encode_cursor.
+
+    Args:
+        cursor: The opaque continuation token
+
+    Returns:
+        Tuple[datetime, int]: The (timestamp, id) keyset position
+
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    try:
+        data = _decode(cursor)
+        timestamp = datetime.fromisoformat(data["c"])
+        # Cursors from naive timestamp columns hold UTC without an offset
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=UTC)
+        return timestamp, int(data["i"])
+    except (binascii.Error, ValueError, KeyError, TypeError) as e:
+        raise bad_request_error("Invalid pagination cursor") from e
+
+
+def encode_sync_cursor(seq: int, row_id: Optional[int] = None, snapshot: bool = False) -> str:
+    """
+    Encode a change feed position into an opaque sync cursor.
+
+    Args:
+        seq: Change sequence of the last change seen
+        row_id: ID of the last task seen with that sequence; None when
+            every change up to and including `seq` has been seen
+        snapshot: The position is inside a full snapshot, which is paged
+            by task ID; `seq` is then the sequence the snapshot started at
+
+    Returns:
+        str: URL-safe sync cursor
+    """
+    data = {"s": seq}
+    if row_id is not None:
+        data["i"] = row_id
+    if snapshot:
+        data["r"] = 1
+    return _encode(data)
+
+
+def decode_sync_cursor(cursor: str) -> Tuple[int, Optional[int], bool]:
+    """
+    Decode a sync cursor produced by encode_sync_cursor.
+
+    Args:
+        cursor: The opaque sync cursor
+
+    Returns:
+        Tuple[int, Optional[int], bool]: The (sequence, id, snapshot) position
+
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    try:
+        data = _decode(cursor)
+        row_id = data.get("i")
+        snapshot = bool(data.get("r"))
+        if snapshot and row_id is None:
+            raise ValueError("snapshot cursor without a task ID")
+        return int(data["s"]), int(row_id) if row_id is not None else None, snapshot
+    except (binascii.Error, ValueError, KeyError, TypeError, AttributeError) as e:
+        raise bad_request_error("Invalid sync cursor") from e
+
+
+def _encode(data: dict) -> str:
+    raw = json.dumps(data, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> dict:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode()))
+
+
+def resolve_page_size(limit: Optional[int]) -> int:
+    """
+    Clamp a requested page size to the configured bounds.
+
+    Args:
+        limit: Page size requested by the client, if any
+
+    Returns:
+        int: Page size to use for the query
+    """
+    if limit is None:
+        return settings.page_size_default
+    return max(1, min(limit, settings.page_size_max))
@@ -2,14 +2,20 @@
 Chat API routes for AI-powered task management.
 Auth temporarily disabled for testing.
 """
+import logging
+from contextlib import aclosing
 from typing import Optional
 from uuid import UUID
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from app.etag import make_etag, etag_matches, not_modified, set_etag
+from app.sse import SSE_HEADERS, format_sse
 from app.services.chat_service import ChatService
 
 
 router = APIRouter(prefix="/api", tags=["chat"])
+logger = logging.getLogger(__name__)
 
 
 class ChatRequest(BaseModel):
@@ -66,20 +72,68 @@ async def chat(
         )
 
 
+@router.post("/{user_id}/chat/stream")
+async def chat_stream(
+    user_id: str,
+    request: ChatRequest,
+    http_request: Request,
+    chat_service: ChatService = Depends(get_chat_service)
+):
+    """
+    Send a message to the AI assistant and stream the reply as Server-Sent Events.
+
+    Emits `start`, `token`, `tool_call`, `tool_result` and `done` events
+    (or `error`). Closing the connection cancels the agent run.
+    """
+    try:
+        UUID(user_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid user ID format")
+
+    async def event_stream():
+        events = chat_service.chat_stream(
+            user_id=user_id,
+            message=request.message,
+            conversation_id=request.conversation_id
+        )
+        # aclosing guarantees the service generator's cleanup (run cancellation) runs
+        async with aclosing(events):
+            try:
+                async for event in events:
+                    if await http_request.is_disconnected():
+                        break
+                    yield format_sse(event["event"], event["data"])
+            except Exception as e:
+                logger.error(f"Chat stream error: {e}", exc_info=True)
+                yield format_sse("error", {"detail": f"Chat error: {str(e)}"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+
 @router.get("/{user_id}/conversations")
 async def list_conversations(
     user_id: str,
+    limit: Optional[int] = Query(None, ge=1, description="Page size (capped by server)"),
+    cursor: Optional[str] = Query(None, description="Continuation token from next_cursor"),
     chat_service: ChatService = Depends(get_chat_service)
 ):
-    """Get all conversations for the user."""
+    """Get the user's conversations, most recently updated first, one page at a time."""
     try:
         UUID(user_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid user ID format")
     
     try:
-        conversations = chat_service.get_conversations(user_id)
-        return {"conversations": conversations}
+        conversations, next_cursor = await chat_service.get_conversations(
+            user_id, limit=limit, cursor=cursor
+        )
+        return {"conversations": conversations, "next_cursor": next_cursor}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -91,16 +145,32 @@ async def list_conversations(
 async def get_conversation(
     user_id: str,
     conversation_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     chat_service: ChatService = Depends(get_chat_service)
 ):
-    """Get a specific conversation with all messages."""
+    """
+    Get a specific conversation with all messages.
+
+    Answers 304 without loading the messages when If-None-Match matches.
+    """
     try:
         UUID(user_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid user ID format")
     
     try:
-        conversation = chat_service.get_conversation_messages(
+        fingerprint = await chat_service.get_conversation_fingerprint(user_id, conversation_id)
+        if fingerprint is None:
+            raise HTTPException(
+                status_code=404,
+                detail="Conversation not found"
+            )
+        etag = make_etag("conversation", conversation_id, *fingerprint)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+        conversation = await chat_service.get_conversation_messages(
             user_id, conversation_id
         )
         if not conversation:
@@ -108,6 +178,7 @@ async def get_conversation(
                 status_code=404,
                 detail="Conversation not found"
             )
+        set_etag(response, etag)
         return conversation
     except HTTPException:
         raise
@@ -2,40 +2,185 @@
 Task API endpoints for CRUD operations.
 Auth temporarily disabled for testing.
 """
-from typing import List
+import asyncio
+from datetime import datetime, UTC
+from typing import List, Literal, Optional, Tuple
 from uuid import UUID
-from fastapi import APIRouter, Depends, status
-from sqlmodel import Session, select
-from app.database import get_session
+from fastapi import APIRouter, Depends, Header, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, not_, update
+from sqlmodel import select, or_, and_
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.config import settings
+from app.database import get_async_session
 from app.models.task import Task, utc_now
-from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse
-from app.errors import not_found_error
+from app.schemas.task import (
+    TaskCreate,
+    TaskUpdate,
+    TaskResponse,
+    TaskFieldsResponse,
+    TaskBatchRequest,
+    TaskBatchResult,
+    TaskBatchResponse,
+    TaskSearchHit,
+    TaskSearchResponse,
+    TaskChange,
+    TaskChangesResponse,
+)
+from app.errors import not_found_error, bad_request_error
+from app.etag import make_etag, etag_matches, not_modified, set_etag
+from app.pagination import (
+    encode_cursor, decode_cursor, encode_sync_cursor, decode_sync_cursor, resolve_page_size
+)
+from app.services.task_events import task_events, task_event
+from app.services.task_search import search_tasks as run_task_search
+from app.services.task_state import get_task_version
+from app.services.task_sync import next_change_seq, read_changes
+from app.sse import SSE_HEADERS, KEEPALIVE, format_sse
 
 
 router = APIRouter(prefix="/api", tags=["tasks"])
 
+# ?sort= value -> (column, descending)
+TASK_SORTS = {
+    "created_at": (Task.created_at, False),
+    "-created_at": (Task.created_at, True),
+    "updated_at": (Task.updated_at, False),
+    "-updated_at": (Task.updated_at, True),
+}
 
-@router.get("/{user_id}/tasks", response_model=List[TaskResponse])
+# Fields a client may request through ?fields=
+TASK_FIELDS = ("id", "user_id", "title", "description", "completed", "created_at", "updated_at")
+
+# Batch result status -> change feed event type
+BATCH_EVENT_TYPES = {"created": "created", "updated": "updated", "completed": "updated", "deleted": "deleted"}
+
+
+@router.get(
+    "/{user_id}/tasks",
+    response_model=List[TaskFieldsResponse],
+    response_model_exclude_unset=True
+)
 async def list_tasks(
     user_id: str,
-    session: Session = Depends(get_session)
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, description="Page size (capped by server)"),
+    cursor: Optional[str] = Query(None, description="Continuation token from X-Next-Cursor"),
+    task_status: Literal["all", "pending", "completed"] = Query("all", alias="status"),
+    created_after: Optional[datetime] = Query(None, description="Only tasks created after this time"),
+    created_before: Optional[datetime] = Query(None, description="Only tasks created before this time"),
+    updated_since: Optional[datetime] = Query(None, description="Only tasks updated at or after this time"),
+    sort: Literal["created_at", "-created_at", "updated_at", "-updated_at"] = Query(
+        "created_at", description="Sort field; a leading '-' sorts newest first"
+    ),
+    fields: Optional[str] = Query(
+        None, description=f"Comma-separated fields to return (id is always included): {', '.join(TASK_FIELDS)}"
+    ),
+    if_none_match: Optional[str] = Header(None),
+    session: AsyncSession = Depends(get_async_session)
 ):
-    """List all tasks for a user."""
+    """
+    List tasks for a user, one page at a time.
+
+    Filters, sort and the sparse fieldset are all applied in SQL: only the
+    requested columns are selected, and each combination of status and sort
+    is a range scan on a (user_id[, completed], sort column, id) index.
+    Uses keyset pagination on (sort column, id). When more tasks remain, the
+    continuation token for the next page is returned in the X-Next-Cursor
+    header; it is only valid with the same filters and sort.
+
+    The ETag fingerprints the user's whole task set by its change sequence
+    (every write moves it on, see task_sync) plus the parameters; a matching
+    If-None-Match gets a 304 after that one primary-key lookup, without
+    loading the page.
+    """
     try:
         user_uuid = UUID(user_id)
     except ValueError:
         return []
-    
-    statement = select(Task).where(Task.user_id == user_uuid)
-    tasks = session.exec(statement).all()
-    return tasks
+
+    selected = _parse_fields(fields)
+    page_size = resolve_page_size(limit)
+    version = await get_task_version(session, user_uuid)
+    etag = make_etag(
+        "tasks", user_id, version, page_size, cursor,
+        task_status, created_after, created_before, updated_since, sort, selected
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    sort_column, descending = TASK_SORTS[sort]
+    if selected is None:
+        statement = select(Task)
+    else:
+        # The sort column is read for the cursor even when it is not returned
+        names = dict.fromkeys(("id", *selected, sort_column.key))
+        statement = select(*(getattr(Task, name) for name in names))
+
+    statement = statement.where(Task.user_id == user_uuid, Task.deleted_at.is_(None))
+    if task_status != "all":
+        statement = statement.where(Task.completed == (task_status == "completed"))
+    if created_after is not None:
+        statement = statement.where(Task.created_at > _as_utc(created_after))
+    if created_before is not None:
+        statement = statement.where(Task.created_at < _as_utc(created_before))
+    if updated_since is not None:
+        statement = statement.where(Task.updated_at >= _as_utc(updated_since))
+
+    if cursor is not None:
+        after_value, after_id = decode_cursor(cursor)
+        if descending:
+            statement = statement.where(or_(
+                sort_column < after_value,
+                and_(sort_column == after_value, Task.id < after_id)
+            ))
+        else:
+            statement = statement.where(or_(
+                sort_column > after_value,
+                and_(sort_column == after_value, Task.id > after_id)
+            ))
+
+    order = (sort_column.desc(), Task.id.desc()) if descending else (sort_column, Task.id)
+    # Fetch one extra row to learn whether another page exists
+    statement = statement.order_by(*order).limit(page_size + 1)
+    rows = (await session.exec(statement)).all()
+
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(getattr(last, sort_column.key), last.id)
+
+    if selected is None:
+        return rows
+    return [{name: getattr(row, name) for name in ("id", *selected)} for row in rows]
+
+
+def _parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Validate a ?fields= list; None means every field."""
+    if fields is None:
+        return None
+    names = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in names if name not in TASK_FIELDS]
+    if unknown:
+        raise bad_request_error(
+            f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(TASK_FIELDS)}"
+        )
+    return tuple(name for name in names if name != "id")
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Interpret a client-supplied time as UTC (naive values are taken to be UTC already)."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=UTC)
+    return value.astimezone(UTC)
 
 
 @router.post("/{user_id}/tasks", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
 async def create_task(
     user_id: str,
     task_data: TaskCreate,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Create a new task."""
     try:
@@ -47,22 +192,256 @@ async def create_task(
         user_id=user_uuid,
         title=task_data.title,
         description=task_data.description,
-        completed=False
+        completed=False,
+        change_seq=await next_change_seq(session, user_uuid)
     )
 
     session.add(task)
-    session.commit()
-    session.refresh(task)
+    await session.flush()
+    await task_events.publish(session, user_uuid, [task_event("created", task)])
+    await session.commit()
+    await session.refresh(task)
     return task
 
 
+@router.post("/{user_id}/tasks/batch", response_model=TaskBatchResponse)
+async def batch_tasks(
+    user_id: str,
+    batch: TaskBatchRequest,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Apply many task operations in a single transaction.
+
+    Creates use one multi-row INSERT ... RETURNING; completes and deletes are
+    single set-based statements; updates are one bulk UPDATE by primary key.
+    Every task touched shares one change sequence number. Operations on
+    tasks the user does not own (or has deleted) report status "not_found".
+    Results are grouped by operation, each carrying its index in the
+    request's array for that operation.
+    """
+    try:
+        user_uuid = UUID(user_id)
+    except ValueError:
+        raise not_found_error("User", user_id)
+
+    if batch.operation_count() > settings.batch_max_operations:
+        raise bad_request_error(
+            f"Batch too large: at most {settings.batch_max_operations} operations allowed"
+        )
+
+    results: List[TaskBatchResult] = []
+    now = utc_now()
+    seq = await next_change_seq(session, user_uuid)
+    live = and_(Task.user_id == user_uuid, Task.deleted_at.is_(None))
+
+    if batch.create:
+        rows = [
+            {
+                "user_id": user_uuid,
+                "title": item.title,
+                "description": item.description,
+                "completed": False,
+                "created_at": now,
+                "updated_at": now,
+                "change_seq": seq,
+            }
+            for item in batch.create
+        ]
+        created = (await session.exec(
+            insert(Task).returning(Task, sort_by_parameter_order=True), params=rows
+        )).scalars().all()
+        results.extend(
+            TaskBatchResult(op="create", index=i, id=task.id, status="created", task=task)
+            for i, task in enumerate(created)
+        )
+
+    if batch.update:
+        requested_ids = {item.id for item in batch.update}
+        owned_ids = set((await session.exec(
+            select(Task.id).where(live, Task.id.in_(requested_ids))
+        )).all())
+        changes = [
+            {
+                "id": item.id,
+                "updated_at": now,
+                "change_seq": seq,
+                **item.model_dump(exclude={"id"}, exclude_none=True),
+            }
+            for item in batch.update
+            if item.id in owned_ids
+        ]
+        if changes:
+            await session.exec(update(Task), params=changes)
+        updated = {
+            task.id: task
+            for task in (await session.exec(
+                select(Task).where(Task.id.in_(owned_ids)).execution_options(populate_existing=True)
+            )).all()
+        }
+        results.extend(
+            TaskBatchResult(op="update", index=i, id=item.id, status="updated", task=updated[item.id])
+            if item.id in updated else
+            TaskBatchResult(op="update", index=i, id=item.id, status="not_found")
+            for i, item in enumerate(batch.update)
+        )
+
+    if batch.complete:
+        completed = {
+            task.id: task
+            for task in (await session.exec(
+                update(Task)
+                .where(live, Task.id.in_(batch.complete))
+                .values(completed=True, updated_at=now, change_seq=seq)
+                .returning(Task)
+            )).scalars().all()
+        }
+        results.extend(
+            TaskBatchResult(op="complete", index=i, id=task_id, status="completed", task=completed[task_id])
+            if task_id in completed else
+            TaskBatchResult(op="complete", index=i, id=task_id, status="not_found")
+            for i, task_id in enumerate(batch.complete)
+        )
+
+    if batch.delete:
+        deleted_ids = set((await session.exec(
+            update(Task)
+            .where(live, Task.id.in_(batch.delete))
+            .values(deleted_at=now, updated_at=now, change_seq=seq)
+            .returning(Task.id)
+        )).scalars().all())
+        results.extend(
+            TaskBatchResult(
+                op="delete", index=i, id=task_id,
+                status="deleted" if task_id in deleted_ids else "not_found"
+            )
+            for i, task_id in enumerate(batch.delete)
+        )
+
+    events = [
+        task_event(BATCH_EVENT_TYPES[result.status], result.task, result.id)
+        for result in results
+        if result.status != "not_found"
+    ]
+    await task_events.publish(session, user_uuid, events)
+    await session.commit()
+    return TaskBatchResponse(results=results)
+
+
+@router.get("/{user_id}/tasks/search", response_model=TaskSearchResponse)
+async def search_tasks(
+    user_id: str,
+    q: str = Query(..., min_length=1, max_length=200, description="Search text"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size (capped by server)"),
+    offset: int = Query(0, ge=0, description="Results to skip; use next_offset from the previous page"),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Full-text search over the user's task titles and descriptions.
+
+    Results are ranked by relevance, title matches first. PostgreSQL answers
+    from a GIN-indexed tsvector column; other databases use an in-process
+    inverted index. Declared before /tasks/{task_id} so "search" is not
+    parsed as a task ID.
+    """
+    try:
+        user_uuid = UUID(user_id)
+    except ValueError:
+        raise not_found_error("User", user_id)
+
+    query = q.strip()
+    if not query:
+        raise bad_request_error("Search text cannot be empty")
+
+    page_size = resolve_page_size(limit)
+    # Fetch one extra hit to learn whether another page exists
+    hits = await run_task_search(session, user_uuid, query, page_size + 1, offset)
+    next_offset = offset + page_size if len(hits) > page_size else None
+    return TaskSearchResponse(
+        query=query,
+        results=[TaskSearchHit(task=task, rank=rank) for task, rank in hits[:page_size]],
+        next_offset=next_offset,
+    )
+
+
+@router.get("/{user_id}/tasks/changes", response_model=TaskChangesResponse)
+async def task_changes(
+    user_id: str,
+    since: Optional[str] = Query(None, description="Sync cursor from the previous response"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size (capped by server)"),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Incremental sync: the tasks created, updated or deleted since a cursor.
+
+    Changes come oldest first, in the user's change sequence order, each
+    task once with its latest state; deleted tasks appear as tombstones.
+    Without `since` - or when the cursor is older than the tombstone
+    retention - the response starts a full snapshot of live tasks and sets
+    `reset`. Keep requesting with the returned cursor while `has_more`.
+    Declared before /tasks/{task_id} so "changes" is not parsed as a task ID.
+    """
+    try:
+        user_uuid = UUID(user_id)
+    except ValueError:
+        raise not_found_error("User", user_id)
+
+    position = decode_sync_cursor(since) if since is not None else None
+    page = await read_changes(session, user_uuid, position, resolve_page_size(limit))
+    return TaskChangesResponse(
+        changes=[
+            TaskChange(id=task.id, seq=task.change_seq, deleted=True, deleted_at=task.deleted_at)
+            if task.deleted_at is not None else
+            TaskChange(id=task.id, seq=task.change_seq, task=task)
+            for task in page.tasks
+        ],
+        cursor=encode_sync_cursor(*page.position),
+        has_more=page.has_more,
+        reset=page.reset,
+    )
+
+
+@router.get("/{user_id}/tasks/events")
+async def task_event_stream(user_id: str, request: Request):
+    """
+    Stream the user's task changes as Server-Sent Events.
+
+    Emits `ready` once subscribed, then one `task` event per change with
+    `type` created, updated, deleted or resync. On `ready` and `resync`
+    clients should refetch the list; events are not replayed after a
+    reconnect. Declared before /tasks/{task_id} so "events" is not parsed
+    as a task ID.
+    """
+    try:
+        user_uuid = UUID(user_id)
+    except ValueError:
+        raise not_found_error("User", user_id)
+
+    async def event_stream():
+        async with task_events.subscribe(user_uuid) as queue:
+            yield format_sse("ready", {"user_id": user_id})
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(), timeout=settings.task_events_heartbeat_seconds
+                    )
+                except asyncio.TimeoutError:
+                    yield KEEPALIVE
+                    continue
+                yield format_sse("task", event)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
 @router.get("/{user_id}/tasks/{task_id}", response_model=TaskResponse)
 async def get_task(
     user_id: str,
     task_id: int,
-    session: Session = Depends(get_session)
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    session: AsyncSession = Depends(get_async_session)
 ):
-    """Get a specific task by ID."""
+    """Get a specific task by ID. Answers 304 if If-None-Match matches its ETag."""
     try:
         user_uuid = UUID(user_id)
     except ValueError:
@@ -70,12 +449,18 @@ async def get_task(
     
     statement = select(Task).where(
         Task.id == task_id,
-        Task.user_id == user_uuid
+        Task.user_id == user_uuid,
+        Task.deleted_at.is_(None)
     )
-    task = session.exec(statement).first()
+    task = (await session.exec(statement)).first()
 
     if task is None:
         raise not_found_error("Task", task_id)
+
+    etag = make_etag("task", task.id, task.updated_at)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     return task
 
 
@@ -84,34 +469,28 @@ async def update_task(
     user_id: str,
     task_id: int,
     task_data: TaskUpdate,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
-    """Update an existing task."""
+    """Update an existing task in a single UPDATE ... RETURNING statement."""
     try:
         user_uuid = UUID(user_id)
     except ValueError:
         raise not_found_error("Task", task_id)
-    
-    statement = select(Task).where(
-        Task.id == task_id,
-        Task.user_id == user_uuid
+
+    seq = await next_change_seq(session, user_uuid)
+    statement = (
+        update(Task)
+        .where(Task.id == task_id, Task.user_id == user_uuid, Task.deleted_at.is_(None))
+        .values(**task_data.model_dump(exclude_none=True), updated_at=utc_now(), change_seq=seq)
+        .returning(Task)
     )
-    task = session.exec(statement).first()
+    task = (await session.exec(statement)).scalars().first()
 
     if task is None:
         raise not_found_error("Task", task_id)
 
-    if task_data.title is not None:
-        task.title = task_data.title
-    if task_data.description is not None:
-        task.description = task_data.description
-    if task_data.completed is not None:
-        task.completed = task_data.completed
-
-    task.updated_at = utc_now()
-    session.add(task)
-    session.commit()
-    session.refresh(task)
+    await task_events.publish(session, user_uuid, [task_event("updated", task)])
+    await session.commit()
     return task
 
 
@@ -119,25 +498,34 @@ async def update_task(
 async def delete_task(
     user_id: str,
     task_id: int,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
-    """Delete a task."""
+    """
+    Delete a task in a single UPDATE ... RETURNING statement.
+
+    The row stays behind as a tombstone (deleted_at set) so the change
+    feed can report the delete; compaction removes it later.
+    """
     try:
         user_uuid = UUID(user_id)
     except ValueError:
         raise not_found_error("Task", task_id)
-    
-    statement = select(Task).where(
-        Task.id == task_id,
-        Task.user_id == user_uuid
+
+    now = utc_now()
+    seq = await next_change_seq(session, user_uuid)
+    statement = (
+        update(Task)
+        .where(Task.id == task_id, Task.user_id == user_uuid, Task.deleted_at.is_(None))
+        .values(deleted_at=now, updated_at=now, change_seq=seq)
+        .returning(Task.id)
     )
-    task = session.exec(statement).first()
+    deleted_id = (await session.exec(statement)).scalars().first()
 
-    if task is None:
+    if deleted_id is None:
         raise not_found_error("Task", task_id)
 
-    session.delete(task)
-    session.commit()
+    await task_events.publish(session, user_uuid, [task_event("deleted", task_id=task_id)])
+    await session.commit()
     return None
 
 
@@ -145,26 +533,31 @@ async def delete_task(
 async def toggle_complete(
     user_id: str,
     task_id: int,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
-    """Toggle the completion status of a task."""
+    """
+    Toggle the completion status of a task.
+
+    The flip happens in the database (SET completed = NOT completed), so two
+    concurrent toggles always cancel out instead of racing.
+    """
     try:
         user_uuid = UUID(user_id)
     except ValueError:
         raise not_found_error("Task", task_id)
-    
-    statement = select(Task).where(
-        Task.id == task_id,
-        Task.user_id == user_uuid
+
+    seq = await next_change_seq(session, user_uuid)
+    statement = (
+        update(Task)
+        .where(Task.id == task_id, Task.user_id == user_uuid, Task.deleted_at.is_(None))
+        .values(completed=not_(Task.completed), updated_at=utc_now(), change_seq=seq)
+        .returning(Task)
     )
-    task = session.exec(statement).first()
+    task = (await session.exec(statement)).scalars().first()
 
     if task is None:
         raise not_found_error("Task", task_id)
 
-    task.completed = not task.completed
-    task.updated_at = utc_now()
-    session.add(task)
-    session.commit()
-    session.refresh(task)
+    await task_events.publish(session, user_uuid, [task_event("updated", task)])
+    await session.commit()
     return task
@@ -2,7 +2,19 @@
 Pydantic schemas for request/response validation.
 """
 from app.schemas.user import UserBase, UserCreate, UserResponse
-from app.schemas.task import TaskBase, TaskCreate, TaskUpdate, TaskResponse
+from app.schemas.task import (
+    TaskBase,
+    TaskCreate,
+    TaskUpdate,
+    TaskResponse,
+    TaskFieldsResponse,
+    TaskBatchUpdate,
+    TaskBatchRequest,
+    TaskBatchResult,
+    TaskBatchResponse,
+    TaskSearchHit,
+    TaskSearchResponse,
+)
 
 __all__ = [
     "UserBase",
@@ -12,4 +24,11 @@ __all__ = [
     "TaskCreate",
     "TaskUpdate",
     "TaskResponse",
+    "TaskFieldsResponse",
+    "TaskBatchUpdate",
+    "TaskBatchRequest",
+    "TaskBatchResult",
+    "TaskBatchResponse",
+    "TaskSearchHit",
+    "TaskSearchResponse",
 ]
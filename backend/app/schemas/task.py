@@ -6,7 +6,7 @@ Requirements: Requirement 11 (Error Handling)
 - Validates description length (max 1000 chars)
 - Provides clear validation error messages
 """
-from typing import Optional
+from typing import List, Literal, Optional
 from datetime import datetime
 from pydantic import BaseModel, Field, field_validator
 
@@ -104,3 +104,111 @@ class TaskResponse(TaskBase):
 
     class Config:
         from_attributes = True
+
+
+class TaskFieldsResponse(BaseModel):
+    """
+    A task in the list response.
+
+    Every field is present unless the client asked for a sparse fieldset
+    (?fields=title,completed); then only the requested fields and id are.
+    """
+    id: int
+    user_id: Optional[str] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+    completed: Optional[bool] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    @field_validator('user_id', mode='before')
+    @classmethod
+    def convert_uuid_to_str(cls, v):
+        """Convert UUID to string for serialization."""
+        from uuid import UUID
+        if isinstance(v, UUID):
+            return str(v)
+        return v
+
+    class Config:
+        from_attributes = True
+
+
+class TaskBatchUpdate(TaskUpdate):
+    """A single update inside a batch request."""
+    id: int
+
+
+class TaskBatchRequest(BaseModel):
+    """
+    Batch of task operations applied in one transaction.
+
+    Operations run in the order create, update, complete, delete.
+    """
+    create: List[TaskCreate] = []
+    update: List[TaskBatchUpdate] = []
+    complete: List[int] = []
+    delete: List[int] = []
+
+    def operation_count(self) -> int:
+        return len(self.create) + len(self.update) + len(self.complete) + len(self.delete)
+
+
+class TaskBatchResult(BaseModel):
+    """
+    Outcome of one operation in a batch.
+
+    Results are grouped by operation (create, update, complete, delete);
+    `index` is the operation's position in its array of the request.
+    """
+    op: Literal["create", "update", "complete", "delete"]
+    index: int
+    id: Optional[int] = None
+    status: Literal["created", "updated", "completed", "deleted", "not_found"]
+    task: Optional[TaskResponse] = None
+
+
+class TaskBatchResponse(BaseModel):
+    """Per-item results of a batch request."""
+    results: List[TaskBatchResult]
+
+
+class TaskSearchHit(BaseModel):
+    """One search result: the task and its relevance (higher is better)."""
+    task: TaskResponse
+    rank: float
+
+
+class TaskSearchResponse(BaseModel):
+    """A page of search results, best match first."""
+    query: str
+    results: List[TaskSearchHit]
+    next_offset: Optional[int] = None
+
+
+class TaskChange(BaseModel):
+    """
+    One entry of the change feed.
+
+    A created or updated task carries its current state; a deleted one is
+    a tombstone with `deleted` set and no task.
+    """
+    id: int
+    seq: int
+    deleted: bool = False
+    deleted_at: Optional[datetime] = None
+    task: Optional[TaskResponse] = None
+
+
+class TaskChangesResponse(BaseModel):
+    """
+    A page of task changes, oldest first.
+
+    Pass `cursor` as ?since= on the next request. When `reset` is true the
+    page starts a full snapshot of live tasks and the client must discard
+    its local copy first.
+    """
+    changes: List[TaskChange]
+    cursor: str
+    has_more: bool
+    reset: bool
@@ -0,0 +1,188 @@
+"""
+Token-budgeted conversation context for the chat agent.
+
+The agent receives the conversation as one prompt: a summary of older
+turns, the most recent turns verbatim, then the new message. ContextBuilder
+fits that prompt into a token budget:
+
+- every message is clipped to a per-message limit, cutting the middle so a
+  long paste keeps its beginning and end
+- recent turns are kept verbatim, newest first, while they fit
+- turns that no longer fit are folded into a rolling summary, one short
+  line each; past the summary limit its oldest lines are dropped
+
+The summary is cached per conversation in the shared cache backend together
+with the ID of the last message it covers, so each turn only folds the
+messages that have just left the verbatim window.
+
+Token counts come from a pluggable counter: a fast character-based estimate
+by default, or tiktoken's real BPE counts (optional `tiktoken` package).
+"""
+import json
+from typing import Callable, List, Optional, Tuple
+
+from app.cache import CacheBackend
+from app.metrics import registry
+
+
+TokenCounter = Callable[[str], int]
+
+context_tokens = registry.histogram(
+    "chat_context_tokens",
+    "Estimated tokens in the agent prompt built from a conversation",
+    buckets=(64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+)
+summary_folds = registry.counter(
+    "chat_context_summary_folds_total",
+    "Messages folded into a conversation's rolling summary"
+)
+
+CLIP_MARKER = " [...] "
+
+# Words of each folded message kept in the summary
+SUMMARY_WORDS = 16
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count: about four characters per token for English text."""
+    return (len(text) + 3) // 4
+
+
+def tiktoken_counter(encoding: str = "cl100k_base") -> TokenCounter:
+    """Exact BPE token counts through tiktoken (requires the optional `tiktoken` package)."""
+    try:
+        import tiktoken
+    except ImportError as e:
+        raise RuntimeError(
+            "The tiktoken tokenizer requires the 'tiktoken' package (pip install tiktoken)"
+        ) from e
+    bpe = tiktoken.get_encoding(encoding)
+    return lambda text: len(bpe.encode(text, disallowed_special=()))
+
+
+def create_token_counter(name: str) -> TokenCounter:
+    """
+    Build a token counter from a setting.
+
+    Args:
+        name: "estimate", "tiktoken" or "tiktoken:<encoding>"
+
+    Raises:
+        ValueError: If the tokenizer is not supported
+    """
+    if name == "estimate":
+        return estimate_tokens
+    if name == "tiktoken" or name.startswith("tiktoken:"):
+        return tiktoken_counter(name.partition(":")[2] or "cl100k_base")
+    raise ValueError(f"Unsupported tokenizer: {name}")
+
+
+def _gist(content: str) -> str:
+    """First words of a message, for its summary line."""
+    words = content.split()
+    if len(words) <= SUMMARY_WORDS:
+        return " ".join(words)
+    return " ".join(words[:SUMMARY_WORDS]) + " ..."
+
+
+class ContextBuilder:
+    """Builds the agent prompt for a conversation turn within a token budget."""
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        max_tokens: int,
+        message_max_tokens: int,
+        summary_max_tokens: int,
+        count_tokens: TokenCounter = estimate_tokens,
+        summary_ttl: Optional[float] = None
+    ) -> None:
+        self.backend = backend
+        self.max_tokens = max_tokens
+        self.message_max_tokens = message_max_tokens
+        self.summary_max_tokens = summary_max_tokens
+        self.count_tokens = count_tokens
+        self.summary_ttl = summary_ttl
+
+    def clip(self, text: str, max_tokens: int) -> str:
+        """Shorten text to at most max_tokens by cutting out its middle."""
+        if self.count_tokens(text) <= max_tokens:
+            return text
+        # Characters to keep, shrunk until the clipped text fits
+        keep = len(text) * max_tokens // self.count_tokens(text) - len(CLIP_MARKER)
+        while keep > 0:
+            head = keep * 2 // 3
+            clipped = text[:head].rstrip() + CLIP_MARKER + text[len(text) - (keep - head):].lstrip()
+            if self.count_tokens(clipped) <= max_tokens:
+                return clipped
+            keep = keep * 9 // 10
+        return CLIP_MARKER.strip()
+
+    def fit(
+        self,
+        history: List[dict],
+        message: str,
+        summary: Tuple[int, List[str]] = (0, [])
+    ) -> Tuple[str, Tuple[int, List[str]]]:
+        """
+        Build the prompt from history and the summary covering older messages.
+
+        Args:
+            history: Recent messages ({"id", "role", "content"}), oldest first
+            message: The new user message
+            summary: (ID of the last message summarized, summary lines)
+
+        Returns:
+            Tuple of (prompt, updated summary)
+        """
+        through, lines = summary
+        message = self.clip(message, self.message_max_tokens)
+        budget = self.max_tokens - self.count_tokens(f"User: {message}") - self.summary_max_tokens
+
+        # Newest turns first, while they fit; messages already summarized are skipped
+        pending = [m for m in history if m["id"] > through]
+        recent: List[str] = []
+        for m in reversed(pending):
+            line = f"{m['role'].capitalize()}: {self.clip(m['content'], self.message_max_tokens)}"
+            cost = self.count_tokens(line) + 1
+            if cost > budget:
+                break
+            recent.insert(0, line)
+            budget -= cost
+
+        folded = pending[:len(pending) - len(recent)]
+        if folded:
+            summary_folds.inc(len(folded))
+            lines = lines + [f"{m['role'].capitalize()}: {_gist(m['content'])}" for m in folded]
+            while lines and self.count_tokens("\n".join(lines)) > self.summary_max_tokens:
+                lines = lines[1:]
+            through = folded[-1]["id"]
+
+        parts = []
+        if lines:
+            parts.append("Summary of earlier conversation:\n" + "\n".join(lines))
+        if recent:
+            parts.append("Previous conversation:\n" + "\n".join(recent))
+        prompt = "\n\n".join(parts) + f"\n\nUser: {message}" if parts else message
+        return prompt, (through, lines)
+
+    async def build(self, conversation_id: int, history: List[dict], message: str) -> str:
+        """
+        Build the prompt for a conversation turn, updating its cached summary.
+
+        Args:
+            conversation_id: Conversation the turn belongs to
+            history: Recent messages ({"id", "role", "content"}), oldest first
+            message: The new user message
+
+        Returns:
+            str: The agent input
+        """
+        key = f"chat-summary:{conversation_id}"
+        raw = await self.backend.get(key)
+        summary = tuple(json.loads(raw)) if raw is not None else (0, [])
+        prompt, updated = self.fit(history, message, summary)
+        if updated != summary:
+            await self.backend.set(key, json.dumps(updated), ttl=self.summary_ttl)
+        context_tokens.observe(self.count_tokens(prompt))
+        return prompt
@@ -5,81 +5,120 @@ Supports Groq, OpenAI, Anthropic, and other LLM providers via LiteLLM.
 import json
 import asyncio
 import os
-from typing import Optional, List
+import time
+from typing import AsyncIterator, Optional, List, Tuple
 from uuid import UUID
-from agents import Agent, Runner, function_tool, RunContextWrapper, set_tracing_disabled
-from agents.extensions.models.litellm_model import LitellmModel
-from sqlmodel import Session, select
-from app.database import engine
+from agents import Agent, ModelSettings, Runner, function_tool, RunContextWrapper, set_tracing_disabled
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import case, update
+from sqlmodel import select, func, or_, and_
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.config import settings
+from app.database import async_engine
+from app.metrics import registry
 from app.models.conversation import Conversation, Message
 from app.models.task import Task
+from app.pagination import encode_cursor, decode_cursor, resolve_page_size
+from app.schemas.task import TaskUpdate
+from app.services.chat_context import ContextBuilder, create_token_counter
+from app.services.intent_router import IntentRouter, render_reply
+from app.services.llm_pool import create_provider_pool
+from app.services.message_writer import message_writer
+from app.services.response_cache import ResponseCache
+from app.services.task_events import task_event
+from app.services.task_search import search_tasks as run_task_search
+from app.services.task_state import cache_backend, get_task_version
+from app.services.tool_output import encode_task_result
+from app.services.unit_of_work import TaskUnitOfWork, unit_scope
 from datetime import datetime, UTC
 
 # Disable tracing for non-OpenAI models
 set_tracing_disabled(disabled=True)
 
+FALLBACK_REPLY = "I'm sorry, I couldn't process that request."
+
+chat_turn_seconds = registry.histogram(
+    "chat_turn_seconds",
+    "Time to produce a chat reply, by path (fast = intent router, cache = cached reply, llm = agent run)"
+)
+
 
 def utc_now():
     return datetime.now(UTC)
 
 
-# ============ MCP Function Tools ============
-# These tools use RunContextWrapper to access user_id
+# ============ Task Actions ============
+# Plain coroutines behind the agent tools. They are also called directly by
+# the intent fast-path, so they return dicts rather than JSON strings. Inside
+# an agent run they share the run's TaskUnitOfWork (one transaction,
+# committed when the run ends); called without one, each commits on its own.
 
-@function_tool
-def add_task(ctx: RunContextWrapper[dict], title: str, description: str | None = None) -> str:
-    """
-    Create a new task for the user.
-    
-    Args:
-        title: The title of the task (required)
-        description: Optional description of the task
-    """
-    user_id = ctx.context.get("user_id")
+async def create_task_action(
+    user_id: str,
+    title: str,
+    description: Optional[str] = None,
+    unit: Optional[TaskUnitOfWork] = None
+) -> dict:
+    """Create a task for the user."""
     try:
-        with Session(engine) as session:
-            task = Task(
-                user_id=UUID(user_id),
-                title=title,
-                description=description,
-                completed=False,
-                created_at=utc_now(),
-                updated_at=utc_now()
-            )
-            session.add(task)
-            session.commit()
-            session.refresh(task)
+        async with unit_scope(unit, user_id, async_engine) as unit:
+            async with unit.session() as session:
+                task = Task(
+                    user_id=UUID(user_id),
+                    title=title,
+                    description=description,
+                    completed=False,
+                    created_at=utc_now(),
+                    updated_at=utc_now()
+                )
+                session.add(task)
+                await session.flush()
+                unit.changed(task.id)
+                unit.publish_after_commit(task_event("created", task))
             
-            return json.dumps({
+            return {
                 "task_id": task.id,
                 "status": "created",
                 "title": task.title,
                 "message": f"Task '{task.title}' created successfully!"
-            })
+            }
     except Exception as e:
-        return json.dumps({"error": str(e), "status": "failed"})
+        return {"error": str(e), "status": "failed"}
 
 
-@function_tool
-def list_tasks(ctx: RunContextWrapper[dict], status: str = "all") -> str:
+async def list_tasks_action(
+    user_id: str,
+    status: str = "all",
+    limit: Optional[int] = None,
+    unit: Optional[TaskUnitOfWork] = None
+) -> dict:
     """
-    List tasks for the user.
-    
-    Args:
-        status: Filter by status - "all", "pending", or "completed"
+    List the user's tasks, newest first, optionally filtered by status.
+
+    With a limit only that many rows are loaded; "count" is still the total,
+    counted separately when more tasks exist.
     """
-    user_id = ctx.context.get("user_id")
     try:
-        with Session(engine) as session:
-            query = select(Task).where(Task.user_id == UUID(user_id))
+        async with unit_scope(unit, user_id, async_engine) as unit:
+            conditions = [Task.user_id == UUID(user_id), Task.deleted_at.is_(None)]
             
             if status == "pending":
-                query = query.where(Task.completed == False)
+                conditions.append(Task.completed == False)
             elif status == "completed":
-                query = query.where(Task.completed == True)
+                conditions.append(Task.completed == True)
             
-            query = query.order_by(Task.created_at.desc())
-            tasks = session.exec(query).all()
+            query = select(Task).where(*conditions).order_by(Task.created_at.desc())
+            if limit is not None:
+                # One extra row tells whether the list was cut short
+                query = query.limit(limit + 1)
+            async with unit.session() as session:
+                tasks = (await session.exec(query)).all()
+                count = len(tasks)
+                if limit is not None and count > limit:
+                    tasks = tasks[:limit]
+                    count = (await session.exec(
+                        select(func.count()).select_from(Task).where(*conditions)
+                    )).one()
             
             task_list = [
                 {
@@ -92,88 +131,422 @@ def list_tasks(ctx: RunContextWrapper[dict], status: str = "all") -> str:
                 for t in tasks
             ]
             
-            return json.dumps({
+            return {
                 "tasks": task_list,
-                "count": len(tasks),
+                "count": count,
                 "status": "success"
-            })
+            }
     except Exception as e:
-        return json.dumps({"error": str(e), "status": "failed", "tasks": []})
+        return {"error": str(e), "status": "failed", "tasks": []}
 
 
-@function_tool
-def complete_task(ctx: RunContextWrapper[dict], task_id: int) -> str:
-    """
-    Mark a task as complete.
-    
-    Args:
-        task_id: The ID of the task to mark as complete
-    """
-    user_id = ctx.context.get("user_id")
+async def search_tasks_action(
+    user_id: str,
+    query: str,
+    limit: int = 10,
+    unit: Optional[TaskUnitOfWork] = None
+) -> dict:
+    """Find the user's tasks matching free text, best match first."""
     try:
-        with Session(engine) as session:
-            task = session.exec(
-                select(Task).where(
-                    Task.id == task_id,
-                    Task.user_id == UUID(user_id)
+        async with unit_scope(unit, user_id, async_engine) as unit:
+            async with unit.session() as session:
+                hits = await run_task_search(
+                    session, UUID(user_id), query, max(1, min(limit, settings.page_size_max))
                 )
-            ).first()
+
+            task_list = [
+                {
+                    "id": t.id,
+                    "title": t.title,
+                    "description": t.description,
+                    "completed": t.completed,
+                    "rank": round(rank, 4)
+                }
+                for t, rank in hits
+            ]
+
+            return {
+                "tasks": task_list,
+                "count": len(task_list),
+                "status": "success"
+            }
+    except Exception as e:
+        return {"error": str(e), "status": "failed", "tasks": []}
+
+
+async def complete_task_action(
+    user_id: str,
+    task_id: int,
+    unit: Optional[TaskUnitOfWork] = None
+) -> dict:
+    """Mark one of the user's tasks as complete."""
+    try:
+        async with unit_scope(unit, user_id, async_engine) as unit:
+            async with unit.session() as session:
+                task = (await session.exec(
+                    update(Task)
+                    .where(Task.id == task_id, Task.user_id == UUID(user_id), Task.deleted_at.is_(None))
+                    .values(completed=True, updated_at=utc_now())
+                    .returning(Task)
+                )).scalars().first()
+                if task:
+                    unit.changed(task.id)
+                    unit.publish_after_commit(task_event("updated", task))
             
             if not task:
-                return json.dumps({"error": "Task not found", "status": "failed"})
+                return {"error": "Task not found", "status": "failed"}
             
-            task.completed = True
-            task.updated_at = utc_now()
-            session.add(task)
-            session.commit()
-            
-            return json.dumps({
+            return {
                 "task_id": task.id,
                 "status": "completed",
                 "title": task.title,
                 "message": f"Task '{task.title}' marked as complete!"
-            })
+            }
     except Exception as e:
-        return json.dumps({"error": str(e), "status": "failed"})
+        return {"error": str(e), "status": "failed"}
 
 
-@function_tool
-def delete_task(ctx: RunContextWrapper[dict], task_id: int) -> str:
-    """
-    Delete a task.
-    
-    Args:
-        task_id: The ID of the task to delete
-    """
-    user_id = ctx.context.get("user_id")
+async def delete_task_action(
+    user_id: str,
+    task_id: int,
+    unit: Optional[TaskUnitOfWork] = None
+) -> dict:
+    """Delete one of the user's tasks (leaving a tombstone for the change feed)."""
     try:
-        with Session(engine) as session:
-            task = session.exec(
-                select(Task).where(
-                    Task.id == task_id,
-                    Task.user_id == UUID(user_id)
-                )
-            ).first()
-            
-            if not task:
-                return json.dumps({"error": "Task not found", "status": "failed"})
+        async with unit_scope(unit, user_id, async_engine) as unit:
+            now = utc_now()
+            async with unit.session() as session:
+                title = (await session.exec(
+                    update(Task)
+                    .where(Task.id == task_id, Task.user_id == UUID(user_id), Task.deleted_at.is_(None))
+                    .values(deleted_at=now, updated_at=now)
+                    .returning(Task.title)
+                )).scalars().first()
+                if title is not None:
+                    unit.changed(task_id)
+                    unit.publish_after_commit(task_event("deleted", task_id=task_id))
             
-            title = task.title
-            session.delete(task)
-            session.commit()
+            if title is None:
+                return {"error": "Task not found", "status": "failed"}
             
-            return json.dumps({
+            return {
                 "task_id": task_id,
                 "status": "deleted",
                 "title": title,
                 "message": f"Task '{title}' deleted successfully!"
-            })
+            }
+    except Exception as e:
+        return {"error": str(e), "status": "failed"}
+
+
+async def update_task_action(
+    user_id: str,
+    task_id: int,
+    title: Optional[str] = None,
+    description: Optional[str] = None,
+    unit: Optional[TaskUnitOfWork] = None
+) -> dict:
+    """Update the title and/or description of one of the user's tasks."""
+    changes = {"updated_at": utc_now()}
+    if title is not None:
+        changes["title"] = title
+    if description is not None:
+        changes["description"] = description
+
+    try:
+        async with unit_scope(unit, user_id, async_engine) as unit:
+            async with unit.session() as session:
+                task = (await session.exec(
+                    update(Task)
+                    .where(Task.id == task_id, Task.user_id == UUID(user_id), Task.deleted_at.is_(None))
+                    .values(**changes)
+                    .returning(Task)
+                )).scalars().first()
+                if task:
+                    unit.changed(task.id)
+                    unit.publish_after_commit(task_event("updated", task))
+            
+            if not task:
+                return {"error": "Task not found", "status": "failed"}
+            
+            return {
+                "task_id": task.id,
+                "status": "updated",
+                "title": task.title,
+                "message": f"Task '{task.title}' updated successfully!"
+            }
     except Exception as e:
-        return json.dumps({"error": str(e), "status": "failed"})
+        return {"error": str(e), "status": "failed"}
+
+
+# Set-based actions: one UPDATE ... RETURNING however many tasks they touch,
+# so "delete all completed tasks" is a single tool call instead of N.
+
+def _too_many(count: int) -> Optional[dict]:
+    if count > settings.batch_max_operations:
+        return {
+            "error": f"Too many tasks: at most {settings.batch_max_operations} per call",
+            "status": "failed"
+        }
+    return None
+
+
+async def complete_tasks_action(
+    user_id: str,
+    task_ids: List[int],
+    unit: Optional[TaskUnitOfWork] = None
+) -> dict:
+    """Mark several of the user's tasks as complete in one statement."""
+    task_ids = list(dict.fromkeys(task_ids))
+    too_many = _too_many(len(task_ids))
+    if too_many:
+        return too_many
+    try:
+        async with unit_scope(unit, user_id, async_engine) as unit:
+            async with unit.session() as session:
+                tasks = (await session.exec(
+                    update(Task)
+                    .where(Task.id.in_(task_ids), Task.user_id == UUID(user_id), Task.deleted_at.is_(None))
+                    .values(completed=True, updated_at=utc_now())
+                    .returning(Task)
+                )).scalars().all()
+                unit.changed(*(task.id for task in tasks))
+                unit.publish_after_commit(*(task_event("updated", task) for task in tasks))
+
+            done = {task.id for task in tasks}
+            return {
+                "status": "completed",
+                "count": len(tasks),
+                "tasks": [{"id": task.id, "title": task.title} for task in tasks],
+                "not_found": [task_id for task_id in task_ids if task_id not in done],
+                "message": f"Marked {len(tasks)} task(s) as complete."
+            }
+    except Exception as e:
+        return {"error": str(e), "status": "failed"}
+
+
+async def delete_tasks_action(
+    user_id: str,
+    task_ids: Optional[List[int]] = None,
+    status: Optional[str] = None,
+    unit: Optional[TaskUnitOfWork] = None
+) -> dict:
+    """
+    Delete several of the user's tasks in one statement.
+
+    Tasks are selected by ID, by status ("completed", "pending" or "all"),
+    or both (the listed IDs that also have the status). A call with neither
+    is rejected, but status="all" without IDs deletes every one of the
+    user's tasks.
+    """
+    if not task_ids and status is None:
+        return {"error": "Give task_ids or a status to delete", "status": "failed"}
+    if status not in (None, "all", "pending", "completed"):
+        return {"error": f"Unknown status: {status}", "status": "failed"}
+    too_many = _too_many(len(task_ids or ()))
+    if too_many:
+        return too_many
+
+    conditions = [Task.user_id == UUID(user_id), Task.deleted_at.is_(None)]
+    if task_ids:
+        conditions.append(Task.id.in_(task_ids))
+    if status in ("pending", "completed"):
+        conditions.append(Task.completed == (status == "completed"))
+
+    try:
+        async with unit_scope(unit, user_id, async_engine) as unit:
+            now = utc_now()
+            async with unit.session() as session:
+                rows = (await session.exec(
+                    update(Task)
+                    .where(*conditions)
+                    .values(deleted_at=now, updated_at=now)
+                    .returning(Task.id, Task.title)
+                )).all()
+                unit.changed(*(task_id for task_id, _ in rows))
+                unit.publish_after_commit(*(task_event("deleted", task_id=task_id) for task_id, _ in rows))
+
+            deleted = {task_id for task_id, _ in rows}
+            return {
+                "status": "deleted",
+                "count": len(rows),
+                "tasks": [{"id": task_id, "title": title} for task_id, title in rows],
+                "not_found": [task_id for task_id in task_ids or () if task_id not in deleted],
+                "message": f"Deleted {len(rows)} task(s)."
+            }
+    except Exception as e:
+        return {"error": str(e), "status": "failed"}
+
+
+async def bulk_update_action(
+    user_id: str,
+    updates: List[dict],
+    unit: Optional[TaskUnitOfWork] = None
+) -> dict:
+    """
+    Apply different changes to several of the user's tasks in one statement.
+
+    Each update is {"id", and any of "title", "description", "completed"},
+    checked like a TaskUpdate request; updates that fail are skipped and
+    reported under "invalid". The rest become CASE expressions on the task
+    ID, so the whole set is a single UPDATE ... RETURNING.
+    """
+    changes, invalid = {}, []
+    for item in updates:
+        try:
+            task_id = int(item["id"])
+            fields = TaskUpdate.model_validate({
+                key: item[key] for key in ("title", "description", "completed") if item.get(key) is not None
+            }).model_dump(exclude_unset=True)
+        except ValidationError as e:
+            invalid.append({"id": item.get("id"), "error": "; ".join(
+                f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors()
+            )})
+            continue
+        except (KeyError, TypeError, ValueError, AttributeError):
+            invalid.append({"id": item.get("id") if isinstance(item, dict) else None, "error": "Invalid task ID"})
+            continue
+        if fields:
+            changes.setdefault(task_id, {}).update(fields)
+    if not changes:
+        error = {"error": "No valid changes given" if invalid else "No changes given", "status": "failed"}
+        return {**error, "invalid": invalid} if invalid else error
+    too_many = _too_many(len(changes))
+    if too_many:
+        return too_many
+
+    values = {"updated_at": utc_now()}
+    for name in ("title", "description", "completed"):
+        per_task = {task_id: fields[name] for task_id, fields in changes.items() if name in fields}
+        if per_task:
+            column = getattr(Task, name)
+            values[name] = case(per_task, value=Task.id, else_=column)
+
+    try:
+        async with unit_scope(unit, user_id, async_engine) as unit:
+            async with unit.session() as session:
+                tasks = (await session.exec(
+                    update(Task)
+                    .where(Task.id.in_(list(changes)), Task.user_id == UUID(user_id), Task.deleted_at.is_(None))
+                    .values(**values)
+                    .returning(Task)
+                )).scalars().all()
+                unit.changed(*(task.id for task in tasks))
+                unit.publish_after_commit(*(task_event("updated", task) for task in tasks))
+
+            updated = {task.id for task in tasks}
+            return {
+                "status": "updated",
+                "count": len(tasks),
+                "tasks": [{"id": task.id, "title": task.title, "completed": task.completed} for task in tasks],
+                "not_found": [task_id for task_id in changes if task_id not in updated],
+                "invalid": invalid,
+                "message": f"Updated {len(tasks)} task(s)."
+            }
+    except Exception as e:
+        return {"error": str(e), "status": "failed"}
+
+
+# Tool name -> action, used by the intent fast-path
+TASK_ACTIONS = {
+    "add_task": create_task_action,
+    "list_tasks": list_tasks_action,
+    "search_tasks": search_tasks_action,
+    "complete_task": complete_task_action,
+    "delete_task": delete_task_action,
+    "update_task": update_task_action,
+    "complete_tasks": complete_tasks_action,
+    "delete_tasks": delete_tasks_action,
+    "bulk_update": bulk_update_action,
+}
+
+
+# ============ MCP Function Tools ============
+# These tools use RunContextWrapper to access user_id
+
+def _task_list_output(result: dict) -> str:
+    """Tool output for a task list, in the configured (compact by default) encoding."""
+    return encode_task_result(
+        result,
+        settings.chat_tool_output,
+        settings.chat_tool_output_max_tasks,
+        settings.chat_tool_output_description_chars
+    )
+
+
+@function_tool
+async def add_task(ctx: RunContextWrapper[dict], title: str, description: str | None = None) -> str:
+    """
+    Create a new task for the user.
+    
+    Args:
+        title: The title of the task (required)
+        description: Optional description of the task
+    """
+    return json.dumps(await create_task_action(
+        ctx.context.get("user_id"), title, description, unit=ctx.context.get("unit")
+    ))
 
 
 @function_tool
-def update_task(
+async def list_tasks(ctx: RunContextWrapper[dict], status: str = "all") -> str:
+    """
+    List tasks for the user.
+    
+    Args:
+        status: Filter by status - "all", "pending", or "completed"
+    """
+    # The compact encoding shows at most chat_tool_output_max_tasks; load no more
+    limit = settings.chat_tool_output_max_tasks if settings.chat_tool_output == "compact" else None
+    return _task_list_output(await list_tasks_action(
+        ctx.context.get("user_id"), status, limit, unit=ctx.context.get("unit")
+    ))
+
+
+@function_tool
+async def search_tasks(ctx: RunContextWrapper[dict], query: str, limit: int = 10) -> str:
+    """
+    Find tasks whose title or description matches some words, best match first.
+    Use this to locate a specific task (e.g. "the groceries task") instead of listing every task.
+    Every word must match, so pass only the distinctive words (e.g. "groceries").
+    
+    Args:
+        query: Words to look for
+        limit: Maximum number of tasks to return (default 10)
+    """
+    return _task_list_output(await search_tasks_action(
+        ctx.context.get("user_id"), query, limit, unit=ctx.context.get("unit")
+    ))
+
+
+@function_tool
+async def complete_task(ctx: RunContextWrapper[dict], task_id: int) -> str:
+    """
+    Mark a task as complete.
+    
+    Args:
+        task_id: The ID of the task to mark as complete
+    """
+    return json.dumps(await complete_task_action(
+        ctx.context.get("user_id"), task_id, unit=ctx.context.get("unit")
+    ))
+
+
+@function_tool
+async def delete_task(ctx: RunContextWrapper[dict], task_id: int) -> str:
+    """
+    Delete a task.
+    
+    Args:
+        task_id: The ID of the task to delete
+    """
+    return json.dumps(await delete_task_action(
+        ctx.context.get("user_id"), task_id, unit=ctx.context.get("unit")
+    ))
+
+
+@function_tool
+async def update_task(
     ctx: RunContextWrapper[dict], 
     task_id: int, 
     title: str | None = None, 
@@ -187,37 +560,67 @@ def update_task(
         title: New title for the task (optional)
         description: New description for the task (optional)
     """
-    user_id = ctx.context.get("user_id")
-    try:
-        with Session(engine) as session:
-            task = session.exec(
-                select(Task).where(
-                    Task.id == task_id,
-                    Task.user_id == UUID(user_id)
-                )
-            ).first()
-            
-            if not task:
-                return json.dumps({"error": "Task not found", "status": "failed"})
-            
-            if title is not None:
-                task.title = title
-            if description is not None:
-                task.description = description
-            task.updated_at = utc_now()
-            
-            session.add(task)
-            session.commit()
-            session.refresh(task)
-            
-            return json.dumps({
-                "task_id": task.id,
-                "status": "updated",
-                "title": task.title,
-                "message": f"Task '{task.title}' updated successfully!"
-            })
-    except Exception as e:
-        return json.dumps({"error": str(e), "status": "failed"})
+    return json.dumps(await update_task_action(
+        ctx.context.get("user_id"), task_id, title, description, unit=ctx.context.get("unit")
+    ))
+
+
+class TaskChanges(BaseModel):
+    """Changes to one task in a bulk_update call; omitted fields stay as they are."""
+    id: int
+    title: Optional[str] = None
+    description: Optional[str] = None
+    completed: Optional[bool] = None
+
+
+@function_tool
+async def complete_tasks(ctx: RunContextWrapper[dict], task_ids: List[int]) -> str:
+    """
+    Mark several tasks as complete in one step.
+    Prefer this over calling complete_task repeatedly.
+    
+    Args:
+        task_ids: IDs of the tasks to mark as complete
+    """
+    return json.dumps(await complete_tasks_action(
+        ctx.context.get("user_id"), task_ids, unit=ctx.context.get("unit")
+    ))
+
+
+@function_tool
+async def delete_tasks(
+    ctx: RunContextWrapper[dict],
+    task_ids: List[int] | None = None,
+    status: str | None = None
+) -> str:
+    """
+    Delete several tasks in one step, by ID and/or by status.
+    "Delete all completed tasks" is status="completed" - no need to list them first.
+    
+    Args:
+        task_ids: IDs of the tasks to delete (optional)
+        status: Delete tasks with this status: "completed", "pending" or "all" (optional).
+            "all" without task_ids deletes every task - only when the user asked for that
+    """
+    return json.dumps(await delete_tasks_action(
+        ctx.context.get("user_id"), task_ids, status, unit=ctx.context.get("unit")
+    ))
+
+
+@function_tool
+async def bulk_update(ctx: RunContextWrapper[dict], updates: List[TaskChanges]) -> str:
+    """
+    Change several tasks in one step (titles, descriptions or completion status).
+    Prefer this over calling update_task repeatedly.
+    
+    Args:
+        updates: One entry per task: its id and the fields to change
+    """
+    return json.dumps(await bulk_update_action(
+        ctx.context.get("user_id"),
+        [item.model_dump() for item in updates],
+        unit=ctx.context.get("unit")
+    ))
 
 
 # ============ Chat Service ============
@@ -233,13 +636,21 @@ class ChatService:
         self.api_key = os.environ.get("LLM_API_KEY", os.environ.get("GROQ_API_KEY", ""))
         self.model_name = os.environ.get("LLM_MODEL", "groq/llama-3.3-70b-versatile")
         
-        # Create LiteLLM model for multi-provider support
+        # Pool of LiteLLM models for multi-provider support: LLM_MODEL first, then
+        # the fallbacks, with timeouts, hedging and circuit breakers ("fake" runs offline)
         # Groq models: groq/llama-3.3-70b-versatile, groq/mixtral-8x7b-32768
         # OpenAI models: gpt-4o-mini, gpt-4o
         # Anthropic models: anthropic/claude-3-5-sonnet-20240620
-        self.model = LitellmModel(
-            model=self.model_name,
-            api_key=self.api_key
+        self.model = create_provider_pool(
+            self.model_name,
+            self.api_key,
+            settings.llm_fallback_models_list,
+            max_concurrency=settings.llm_max_concurrency,
+            timeout_seconds=settings.llm_timeout_seconds,
+            hedge_enabled=settings.llm_hedge_enabled,
+            hedge_min_seconds=settings.llm_hedge_min_seconds,
+            breaker_failures=settings.llm_breaker_failures,
+            breaker_reset_seconds=settings.llm_breaker_reset_seconds,
         )
         
         # Create the task management agent with function tools
@@ -251,31 +662,54 @@ You help users add, view, update, complete, and delete their tasks through natur
 When users want to:
 - Add/create/remember something → use add_task
 - See/show/list/view tasks → use list_tasks  
+- Find a particular task by its words ("the groceries task") → use search_tasks, then act on its ID
 - Mark done/complete/finish → use complete_task
 - Delete/remove/cancel → use delete_task
 - Change/update/rename/modify → use update_task
 
+When an action applies to more than one task, make ONE call with the set
+version instead of repeating the single-task tool:
+- complete several tasks → complete_tasks with all their IDs
+- delete several tasks, or all completed/pending tasks → delete_tasks
+  (by IDs, or by status without listing the tasks first)
+- change several tasks → bulk_update with one entry per task
+
 Always be friendly and confirm actions. If a task operation fails, explain the error helpfully.
 When listing tasks, format them nicely for the user with task IDs so they can reference them.
 Keep responses concise but helpful.""",
             model=self.model,
-            tools=[add_task, list_tasks, complete_task, delete_task, update_task],
+            tools=[
+                add_task, list_tasks, search_tasks, complete_task, delete_task, update_task,
+                complete_tasks, delete_tasks, bulk_update,
+            ],
+            # Independent tool calls of one step run concurrently, sharing the run's unit of work
+            model_settings=ModelSettings(parallel_tool_calls=True),
+        )
+        self.intent_router = IntentRouter()
+        self.response_cache = ResponseCache(cache_backend, ttl=settings.chat_cache_ttl_seconds)
+        self.context_builder = ContextBuilder(
+            cache_backend,
+            max_tokens=settings.chat_context_max_tokens,
+            message_max_tokens=settings.chat_context_message_max_tokens,
+            summary_max_tokens=settings.chat_context_summary_max_tokens,
+            count_tokens=create_token_counter(settings.chat_context_tokenizer),
+            summary_ttl=settings.chat_summary_ttl_seconds,
         )
 
-    def _get_or_create_conversation(
+    async def _get_or_create_conversation(
         self, 
-        db_session: Session, 
+        db_session: AsyncSession, 
         user_id: UUID, 
         conversation_id: Optional[int]
     ) -> Conversation:
         """Get existing conversation or create a new one in our database."""
         if conversation_id:
-            conversation = db_session.exec(
+            conversation = (await db_session.exec(
                 select(Conversation).where(
                     Conversation.id == conversation_id,
                     Conversation.user_id == user_id
                 )
-            ).first()
+            )).first()
             if conversation:
                 return conversation
         
@@ -287,40 +721,46 @@ Keep responses concise but helpful.""",
             updated_at=utc_now()
         )
         db_session.add(conversation)
-        db_session.commit()
-        db_session.refresh(conversation)
+        await db_session.commit()
+        await db_session.refresh(conversation)
         return conversation
 
-    def _get_conversation_history(
+    async def _get_conversation_history(
         self, 
-        db_session: Session, 
+        db_session: AsyncSession, 
         conversation_id: int,
-        limit: int = 10
+        limit: Optional[int] = None
     ) -> List[dict]:
-        """Get recent messages from conversation history."""
-        messages = db_session.exec(
+        """Get recent messages from conversation history, oldest first."""
+        await message_writer.sync(conversation_id)
+        messages = (await db_session.exec(
             select(Message)
             .where(Message.conversation_id == conversation_id)
-            .order_by(Message.created_at.desc())
-            .limit(limit)
-        ).all()
+            .order_by(Message.created_at.desc(), Message.id.desc())
+            .limit(limit or settings.chat_history_messages)
+        )).all()
         
         # Reverse to get chronological order
         return list(reversed([
-            {"role": msg.role, "content": msg.content}
+            {"id": msg.id, "role": msg.role, "content": msg.content}
             for msg in messages
         ]))
 
-    def _save_message(
+    async def _save_message(
         self,
-        db_session: Session,
+        db_session: AsyncSession,
         conversation_id: int,
         user_id: UUID,
         role: str,
         content: str,
         tool_calls: Optional[str] = None
     ) -> Message:
-        """Save a message to our database for history display."""
+        """
+        Save a message to our database for history display.
+
+        Written behind by message_writer while it runs, so the returned
+        message has no ID yet.
+        """
         message = Message(
             conversation_id=conversation_id,
             user_id=user_id,
@@ -329,11 +769,151 @@ Keep responses concise but helpful.""",
             tool_calls=tool_calls,
             created_at=utc_now()
         )
-        db_session.add(message)
-        db_session.commit()
-        db_session.refresh(message)
+        await message_writer.add_message(db_session, message)
         return message
 
+    async def _prepare_turn(
+        self,
+        db_session: AsyncSession,
+        user_uuid: UUID,
+        message: str,
+        conversation_id: Optional[int]
+    ) -> Tuple[Conversation, Optional[Tuple[str, List[dict]]], Optional[str]]:
+        """
+        Resolve the conversation, try the fast path, persist the user message
+        and build agent input.
+
+        A fast-path hit needs no prompt, so the history is not read and the
+        conversation's rolling summary is left as it is.
+
+        Returns:
+            Tuple of (conversation, fast-path reply or None, agent input or None)
+        """
+        # Get or create conversation in our database
+        conversation = await self._get_or_create_conversation(
+            db_session, user_uuid, conversation_id
+        )
+
+        fast = await self._try_fast_path(str(user_uuid), message)
+        
+        # Get conversation history for context
+        history = None if fast else await self._get_conversation_history(db_session, conversation.id)
+        
+        # Save user message to our database
+        await self._save_message(
+            db_session, conversation.id, user_uuid, "user", message
+        )
+        
+        # Build input with history context, within the token budget
+        full_input = None if fast else await self.context_builder.build(conversation.id, history, message)
+
+        # End the read transaction: with the message written behind nothing
+        # else commits it, and it would hold a pooled connection for the
+        # whole agent run
+        await db_session.commit()
+
+        return conversation, fast, full_input
+
+    @staticmethod
+    def _extract_tool_calls(items) -> List[dict]:
+        """Collect function calls made by the agent from a run's new items."""
+        tool_calls_made = []
+        for item in items:
+            if hasattr(item, 'raw_item'):
+                raw = item.raw_item
+                if hasattr(raw, 'type') and raw.type == 'function_call':
+                    tool_calls_made.append({
+                        "tool_name": getattr(raw, 'name', 'unknown'),
+                        "arguments": json.loads(raw.arguments) if hasattr(raw, 'arguments') and raw.arguments else {},
+                        "result": {}
+                    })
+        return tool_calls_made
+
+    async def _finish_turn(
+        self,
+        db_session: AsyncSession,
+        conversation: Conversation,
+        user_uuid: UUID,
+        final_output: str,
+        tool_calls_made: List[dict]
+    ) -> None:
+        """Persist the assistant reply and bump the conversation timestamp."""
+        # Save assistant response to our database
+        await self._save_message(
+            db_session,
+            conversation.id,
+            user_uuid,
+            "assistant",
+            final_output,
+            json.dumps(tool_calls_made) if tool_calls_made else None
+        )
+        
+        # Update conversation timestamp
+        await message_writer.touch_conversation(db_session, conversation, utc_now())
+
+    async def _try_fast_path(
+        self,
+        user_id: str,
+        message: str
+    ) -> Optional[Tuple[str, List[dict]]]:
+        """
+        Answer a trivial task command directly, skipping the LLM.
+
+        Returns:
+            Tuple of (reply, tool_calls) on a router hit, None to fall back to the agent
+        """
+        if not settings.chat_intent_router_enabled:
+            return None
+        intent = self.intent_router.match(message)
+        if intent is None:
+            return None
+
+        max_tasks = settings.chat_tool_output_max_tasks
+        # A listing shows at most max_tasks; load no more
+        extra = {"limit": max_tasks} if intent.tool == "list_tasks" else {}
+        result = await TASK_ACTIONS[intent.tool](user_id, **intent.arguments, **extra)
+        tool_calls_made = [{
+            "tool_name": intent.tool,
+            "arguments": intent.arguments,
+            "result": result
+        }]
+        return render_reply(intent, result, max_tasks), tool_calls_made
+
+    async def _lookup_cached_reply(
+        self,
+        user_id: str,
+        full_input: str
+    ) -> Tuple[Optional[str], Optional[dict]]:
+        """
+        Look up a cached LLM reply for this prompt at the current task-state version.
+
+        Returns:
+            Tuple of (cache_key, cached reply); cache_key is None when caching is disabled
+        """
+        if not settings.chat_cache_enabled:
+            return None, None
+        async with AsyncSession(async_engine) as session:
+            version = await get_task_version(session, user_id)
+        cache_key = self.response_cache.make_key(user_id, full_input, version)
+        return cache_key, await self.response_cache.get(cache_key)
+
+    async def _store_cached_reply(
+        self,
+        user_id: str,
+        full_input: str,
+        cache_key: Optional[str],
+        final_output: str,
+        tool_calls_made: List[dict]
+    ) -> None:
+        """Cache a fresh LLM reply if it was read-only and tasks did not change meanwhile."""
+        if cache_key is None or not self.response_cache.is_cacheable(tool_calls_made):
+            return
+        async with AsyncSession(async_engine) as session:
+            version = await get_task_version(session, user_id)
+        if self.response_cache.make_key(user_id, full_input, version) != cache_key:
+            return
+        await self.response_cache.put(cache_key, final_output, tool_calls_made)
+
     async def chat_async(
         self,
         user_id: str,
@@ -352,75 +932,147 @@ Keep responses concise but helpful.""",
             dict with conversation_id, response, and tool_calls
         """
         user_uuid = UUID(user_id)
-        tool_calls_made = []
         
-        with Session(engine) as db_session:
-            # Get or create conversation in our database
-            conversation = self._get_or_create_conversation(
-                db_session, user_uuid, conversation_id
+        async with AsyncSession(async_engine, expire_on_commit=False) as db_session:
+            started = time.perf_counter()
+            conversation, fast, full_input = await self._prepare_turn(
+                db_session, user_uuid, message, conversation_id
             )
             
-            # Get conversation history for context
-            history = self._get_conversation_history(db_session, conversation.id)
-            
-            # Save user message to our database
-            self._save_message(
-                db_session, conversation.id, user_uuid, "user", message
+            cache_key, cached = (None, None) if fast else await self._lookup_cached_reply(
+                user_id, full_input
             )
-            
-            # Build input with history context
-            if history:
-                context_str = "\n".join([
-                    f"{m['role'].capitalize()}: {m['content']}" 
-                    for m in history[-6:]  # Last 6 messages for context
-                ])
-                full_input = f"Previous conversation:\n{context_str}\n\nUser: {message}"
+            if fast is not None:
+                final_output, tool_calls_made = fast
+                path = "fast"
+            elif cached is not None:
+                final_output, tool_calls_made = cached["response"], cached["tool_calls"]
+                path = "cache"
             else:
-                full_input = message
-            
-            # Run the agent with user context
-            context = {"user_id": user_id}
-            result = await Runner.run(
-                self.agent, 
-                input=full_input,
-                context=context
-            )
-            
-            # Extract tool calls from the result
-            if hasattr(result, 'new_items'):
-                for item in result.new_items:
-                    if hasattr(item, 'raw_item'):
-                        raw = item.raw_item
-                        if hasattr(raw, 'type') and raw.type == 'function_call':
-                            tool_calls_made.append({
-                                "tool_name": getattr(raw, 'name', 'unknown'),
-                                "arguments": json.loads(raw.arguments) if hasattr(raw, 'arguments') and raw.arguments else {},
-                                "result": {}
-                            })
-            
-            final_output = result.final_output or "I'm sorry, I couldn't process that request."
+                # Run the agent with user context; its task changes commit
+                # together when the run succeeds and roll back if it fails
+                async with TaskUnitOfWork(user_uuid, async_engine) as unit:
+                    result = await Runner.run(
+                        self.agent, 
+                        input=full_input,
+                        context={"user_id": user_id, "unit": unit}
+                    )
+                
+                tool_calls_made = self._extract_tool_calls(getattr(result, 'new_items', []))
+                final_output = result.final_output or FALLBACK_REPLY
+                path = "llm"
+                await self._store_cached_reply(
+                    user_id, full_input, cache_key, final_output, tool_calls_made
+                )
+            chat_turn_seconds.observe(time.perf_counter() - started, path=path)
             
-            # Save assistant response to our database
-            self._save_message(
-                db_session,
-                conversation.id,
-                user_uuid,
-                "assistant",
-                final_output,
-                json.dumps(tool_calls_made) if tool_calls_made else None
+            await self._finish_turn(
+                db_session, conversation, user_uuid, final_output, tool_calls_made
             )
             
-            # Update conversation timestamp
-            conversation.updated_at = utc_now()
-            db_session.add(conversation)
-            db_session.commit()
-            
             return {
                 "conversation_id": conversation.id,
                 "response": final_output,
                 "tool_calls": tool_calls_made
             }
 
+    async def chat_stream(
+        self,
+        user_id: str,
+        message: str,
+        conversation_id: Optional[int] = None
+    ) -> AsyncIterator[dict]:
+        """
+        Process a chat message and yield events as the agent produces them.
+
+        Yields dicts of the form {"event": name, "data": payload}:
+        - "start": conversation_id, sent before the model is called
+        - "token": a text delta of the assistant reply
+        - "tool_call" / "tool_result": agent tool invocations and their outputs
+        - "done": the final reply and tool calls, after the reply is persisted
+
+        If the consumer stops iterating early (client disconnect), the
+        upstream agent run is cancelled and no assistant message is saved.
+        """
+        user_uuid = UUID(user_id)
+
+        async with AsyncSession(async_engine, expire_on_commit=False) as db_session:
+            conversation, fast, full_input = await self._prepare_turn(
+                db_session, user_uuid, message, conversation_id
+            )
+            yield {"event": "start", "data": {"conversation_id": conversation.id}}
+
+            cache_key, cached = (None, None) if fast else await self._lookup_cached_reply(
+                user_id, full_input
+            )
+            if fast is not None or cached is not None:
+                if fast is not None:
+                    final_output, tool_calls_made = fast
+                    for call in tool_calls_made:
+                        yield {"event": "tool_call", "data": {
+                            "tool_name": call["tool_name"], "arguments": call["arguments"]
+                        }}
+                        yield {"event": "tool_result", "data": {"output": json.dumps(call["result"])}}
+                else:
+                    final_output, tool_calls_made = cached["response"], cached["tool_calls"]
+                yield {"event": "token", "data": {"delta": final_output}}
+                await self._finish_turn(
+                    db_session, conversation, user_uuid, final_output, tool_calls_made
+                )
+                yield {"event": "done", "data": {
+                    "conversation_id": conversation.id,
+                    "response": final_output,
+                    "tool_calls": tool_calls_made
+                }}
+                return
+
+            unit = TaskUnitOfWork(user_uuid, async_engine)
+            result = Runner.run_streamed(
+                self.agent,
+                input=full_input,
+                context={"user_id": user_id, "unit": unit}
+            )
+            finished = False
+            try:
+                async for event in result.stream_events():
+                    if event.type == "raw_response_event":
+                        if getattr(event.data, "type", None) == "response.output_text.delta":
+                            yield {"event": "token", "data": {"delta": event.data.delta}}
+                    elif event.type == "run_item_stream_event":
+                        if event.name == "tool_called":
+                            raw = event.item.raw_item
+                            yield {"event": "tool_call", "data": {
+                                "tool_name": getattr(raw, "name", "unknown"),
+                                "arguments": json.loads(raw.arguments) if getattr(raw, "arguments", None) else {}
+                            }}
+                        elif event.name == "tool_output":
+                            yield {"event": "tool_result", "data": {"output": str(event.item.output)}}
+                finished = True
+                await unit.commit()
+            finally:
+                if not finished:
+                    # Consumer went away (or the stream failed): stop the upstream
+                    # run and discard its task changes
+                    result.cancel()
+                    await unit.rollback()
+                await unit.close()
+
+            tool_calls_made = self._extract_tool_calls(result.new_items)
+            final_output = result.final_output or FALLBACK_REPLY
+            await self._store_cached_reply(
+                user_id, full_input, cache_key, final_output, tool_calls_made
+            )
+
+            await self._finish_turn(
+                db_session, conversation, user_uuid, final_output, tool_calls_made
+            )
+
+            yield {"event": "done", "data": {
+                "conversation_id": conversation.id,
+                "response": final_output,
+                "tool_calls": tool_calls_made
+            }}
+
     def chat(
         self,
         user_id: str,
@@ -430,52 +1082,108 @@ Keep responses concise but helpful.""",
         """Synchronous wrapper for chat_async."""
         return asyncio.run(self.chat_async(user_id, message, conversation_id))
 
-    def get_conversations(self, user_id: str) -> List[dict]:
-        """Get all conversations for a user from our database."""
-        with Session(engine) as db_session:
-            conversations = db_session.exec(
-                select(Conversation)
-                .where(Conversation.user_id == UUID(user_id))
-                .order_by(Conversation.updated_at.desc())
-            ).all()
-            
-            result = []
-            for conv in conversations:
-                msg_count = len(db_session.exec(
-                    select(Message).where(Message.conversation_id == conv.id)
-                ).all())
-                
-                result.append({
-                    "id": conv.id,
-                    "title": conv.title,
-                    "created_at": conv.created_at.isoformat(),
-                    "message_count": msg_count
-                })
-            
-            return result
+    async def get_conversations(
+        self,
+        user_id: str,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """
+        Get one page of a user's conversations, most recently updated first.
+
+        Message counts come from a single grouped aggregate instead of
+        loading every message of every conversation.
+
+        Returns:
+            Tuple of (conversations, next_cursor); next_cursor is None on the last page
+        """
+        page_size = resolve_page_size(limit)
+        message_count = func.count(Message.id)
+        await message_writer.sync(user_id=UUID(user_id))
+
+        statement = (
+            select(Conversation, message_count)
+            .outerjoin(Message, Message.conversation_id == Conversation.id)
+            .where(Conversation.user_id == UUID(user_id))
+            .group_by(Conversation.id)
+        )
+        if cursor is not None:
+            before_updated_at, before_id = decode_cursor(cursor)
+            statement = statement.where(or_(
+                Conversation.updated_at < before_updated_at,
+                and_(Conversation.updated_at == before_updated_at, Conversation.id < before_id)
+            ))
+        statement = statement.order_by(
+            Conversation.updated_at.desc(), Conversation.id.desc()
+        ).limit(page_size + 1)
+
+        async with AsyncSession(async_engine, expire_on_commit=False) as db_session:
+            rows = (await db_session.exec(statement)).all()
+
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            last = rows[-1][0]
+            next_cursor = encode_cursor(last.updated_at, last.id)
+
+        conversations = [
+            {
+                "id": conv.id,
+                "title": conv.title,
+                "created_at": conv.created_at.isoformat(),
+                "message_count": msg_count
+            }
+            for conv, msg_count in rows
+        ]
+        return conversations, next_cursor
+
+    async def get_conversation_fingerprint(
+        self,
+        user_id: str,
+        conversation_id: int
+    ) -> Optional[tuple]:
+        """
+        Cheap state fingerprint of a conversation for ETags.
+
+        Returns:
+            (updated_at, message count, highest message id), or None if the
+            conversation does not exist or belongs to another user
+        """
+        await message_writer.sync(conversation_id)
+        async with AsyncSession(async_engine, expire_on_commit=False) as db_session:
+            return (await db_session.exec(
+                select(Conversation.updated_at, func.count(Message.id), func.max(Message.id))
+                .outerjoin(Message, Message.conversation_id == Conversation.id)
+                .where(
+                    Conversation.id == conversation_id,
+                    Conversation.user_id == UUID(user_id)
+                )
+                .group_by(Conversation.id, Conversation.updated_at)
+            )).first()
 
-    def get_conversation_messages(
+    async def get_conversation_messages(
         self, 
         user_id: str, 
         conversation_id: int
     ) -> Optional[dict]:
         """Get a conversation with all its messages from our database."""
-        with Session(engine) as db_session:
-            conversation = db_session.exec(
+        await message_writer.sync(conversation_id)
+        async with AsyncSession(async_engine, expire_on_commit=False) as db_session:
+            conversation = (await db_session.exec(
                 select(Conversation).where(
                     Conversation.id == conversation_id,
                     Conversation.user_id == UUID(user_id)
                 )
-            ).first()
+            )).first()
             
             if not conversation:
                 return None
             
-            messages = db_session.exec(
+            messages = (await db_session.exec(
                 select(Message)
                 .where(Message.conversation_id == conversation_id)
                 .order_by(Message.created_at)
-            ).all()
+            )).all()
             
             return {
                 "id": conversation.id,
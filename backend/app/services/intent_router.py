@@ -0,0 +1,183 @@
+"""
+Rule-based intent router for trivial chat commands.
+
+Messages such as "list my tasks", "complete task 12" or "delete 7" map
+unambiguously onto a single task action. Matching them with anchored
+regular expressions lets ChatService answer without an LLM round trip.
+Anything that does not match a rule in full falls through to the agent.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Pattern
+
+from app.metrics import registry
+
+
+intent_requests = registry.counter(
+    "chat_intent_router_requests_total",
+    "Chat messages seen by the intent router, by outcome (hit/miss) and intent"
+)
+
+
+@dataclass
+class Intent:
+    """A high-confidence mapping of a message onto one task action."""
+    tool: str
+    arguments: dict = field(default_factory=dict)
+
+
+@dataclass
+class IntentRule:
+    """An anchored pattern and a function turning its match into tool arguments."""
+    tool: str
+    pattern: Pattern[str]
+    extract: Callable[[re.Match], Optional[dict]]
+
+
+# Filler that does not change meaning: "please", "can you", trailing punctuation
+_POLITE_PREFIX = re.compile(r"^(?:(?:please|pls|can you|could you|would you)\s+)+", re.IGNORECASE)
+_POLITE_SUFFIX = re.compile(r"(?:\s+please)?[\s.!?]*$", re.IGNORECASE)
+
+_STATUS_WORDS = {
+    "pending": "pending", "incomplete": "pending", "open": "pending",
+    "unfinished": "pending", "todo": "pending",
+    "completed": "completed", "complete": "completed", "done": "completed",
+    "finished": "completed",
+}
+
+# Titles that start like a clause ("to buy milk", "that says ...") are ambiguous
+_AMBIGUOUS_TITLE = re.compile(r"^(?:to|that|for|which|about|with)\b", re.IGNORECASE)
+
+
+def _list_arguments(match: re.Match) -> dict:
+    status = match.group("status")
+    return {"status": _STATUS_WORDS[status.lower()] if status else "all"}
+
+
+def _task_id_arguments(match: re.Match) -> dict:
+    return {"task_id": int(match.group("id"))}
+
+
+def _add_arguments(match: re.Match) -> Optional[dict]:
+    title = match.group("title").strip().strip("\"'").strip()
+    if not title or len(title) > 200 or _AMBIGUOUS_TITLE.match(title):
+        return None
+    return {"title": title}
+
+
+def _rename_arguments(match: re.Match) -> Optional[dict]:
+    title = match.group("title").strip().strip("\"'").strip()
+    if not title or len(title) > 200:
+        return None
+    return {"task_id": int(match.group("id")), "title": title}
+
+
+_STATUS = r"(?:(?P<status>" + "|".join(_STATUS_WORDS) + r")\s+)?"
+_TASK_ID = r"(?:task\s+)?(?:number\s+|no\.?\s*)?#?(?P<id>\d+)"
+
+DEFAULT_RULES: List[IntentRule] = [
+    IntentRule(
+        "list_tasks",
+        re.compile(
+            r"^(?:(?:show|list|view|display|see|get)(?:\s+me)?(?:\s+all)?\s+(?:of\s+)?"
+            r"|what\s+are\s+)?(?:my\s+|the\s+)?" + _STATUS + r"(?:tasks|todos|to-dos)$",
+            re.IGNORECASE
+        ),
+        _list_arguments,
+    ),
+    IntentRule(
+        "complete_task",
+        re.compile(
+            r"^(?:complete|finish|check\s+off|mark)\s+" + _TASK_ID
+            + r"(?:\s+(?:as\s+)?(?:done|complete|completed|finished))?$",
+            re.IGNORECASE
+        ),
+        _task_id_arguments,
+    ),
+    IntentRule(
+        "delete_task",
+        re.compile(r"^(?:delete|remove)\s+" + _TASK_ID + r"$", re.IGNORECASE),
+        _task_id_arguments,
+    ),
+    IntentRule(
+        "update_task",
+        re.compile(
+            r"^(?:rename|retitle)\s+" + _TASK_ID + r"\s+(?:to|as)\s+(?P<title>.+)$", re.IGNORECASE
+        ),
+        _rename_arguments,
+    ),
+    IntentRule(
+        "add_task",
+        re.compile(
+            r"^(?:add|create|new)\s+(?:a\s+)?(?:new\s+)?task\s*[:\-]?\s+(?P<title>.+)$", re.IGNORECASE
+        ),
+        _add_arguments,
+    ),
+]
+
+
+class IntentRouter:
+    """Matches whole messages against ordered rules; the first full match wins."""
+
+    def __init__(self, rules: Optional[List[IntentRule]] = None) -> None:
+        self.rules = rules if rules is not None else DEFAULT_RULES
+
+    @staticmethod
+    def normalize(message: str) -> str:
+        """Collapse whitespace and strip politeness and trailing punctuation."""
+        text = " ".join(message.strip().split())
+        text = _POLITE_PREFIX.sub("", text)
+        return _POLITE_SUFFIX.sub("", text)
+
+    def match(self, message: str) -> Optional[Intent]:
+        """
+        Route a message to a task action if a rule matches it in full.
+
+        Matching is case-insensitive; extracted titles keep their original casing.
+
+        Returns:
+            Optional[Intent]: The intent, or None when the LLM should handle it
+        """
+        text = self.normalize(message)
+        for rule in self.rules:
+            found = rule.pattern.match(text)
+            if not found:
+                continue
+            arguments = rule.extract(found)
+            if arguments is None:
+                # The rule recognised the command but the details are ambiguous
+                break
+            intent_requests.inc(outcome="hit", intent=rule.tool)
+            return Intent(tool=rule.tool, arguments=arguments)
+
+        intent_requests.inc(outcome="miss", intent="none")
+        return None
+
+
+def render_reply(intent: Intent, result: dict, max_tasks: int = 50) -> str:
+    """
+    Turn a task action result into the assistant's reply text.
+
+    A task list shows at most `max_tasks` tasks, then how many were left out.
+    """
+    if result.get("status") == "failed":
+        if result.get("error") == "Task not found":
+            return f"I couldn't find task {intent.arguments.get('task_id')}."
+        return f"Sorry, that didn't work: {result.get('error', 'unknown error')}"
+
+    if intent.tool == "list_tasks":
+        tasks = result.get("tasks", [])
+        status = intent.arguments.get("status", "all")
+        label = "" if status == "all" else f"{status} "
+        if not tasks:
+            return f"You have no {label}tasks."
+        count = max(result.get("count", 0), len(tasks))
+        lines = [f"You have {count} {label}task(s):"]
+        for task in tasks[:max_tasks]:
+            mark = "x" if task["completed"] else " "
+            lines.append(f"- [{mark}] #{task['id']} {task['title']}")
+        if count > max_tasks:
+            lines.append(f"…and {count - max_tasks} more")
+        return "\n".join(lines)
+
+    return result.get("message", "Done!")
@@ -0,0 +1,404 @@
+"""
+LLM provider pool for the chat agent.
+
+The agent used to call one LiteLLM model with no timeout or fallback, so a
+slow provider stalled every chat request. ProviderPool is an agents SDK
+Model over an ordered list of providers (LLM_MODEL first, then
+LLM_FALLBACK_MODELS):
+
+- per-provider concurrency limit; a provider with no free slot is tried
+  after those that have one
+- per-request timeout; a timed-out or failed request fails over to the next
+  provider
+- hedging: if a provider has not answered after its p95 latency (at least
+  llm_hedge_min_seconds), the same request also goes to the next provider
+  and the first answer wins
+- a circuit breaker per provider: after breaker_failures consecutive
+  failures it is skipped for breaker_reset_seconds, then tried again with a
+  single probe request
+
+Streamed responses fail over only until the first event arrives; they are
+not hedged.
+
+FakeModel is an offline stand-in (LLM_MODEL=fake) that echoes the user's
+message, for local development and tests.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Deque, List, Optional
+
+from agents.items import ModelResponse
+from agents.models.interface import Model
+from agents.usage import Usage
+from openai.types.responses import (
+    Response,
+    ResponseCompletedEvent,
+    ResponseOutputMessage,
+    ResponseOutputText,
+    ResponseTextDeltaEvent,
+)
+
+from app.metrics import registry
+
+
+logger = logging.getLogger(__name__)
+
+llm_requests = registry.counter(
+    "llm_requests_total",
+    "LLM provider requests by provider and outcome (success/error/timeout/cancelled)"
+)
+llm_request_seconds = registry.histogram(
+    "llm_request_seconds",
+    "Latency of successful LLM provider requests, by provider"
+)
+llm_hedges = registry.counter(
+    "llm_hedged_requests_total",
+    "Requests also sent to a fallback provider because the first was slow"
+)
+llm_breaker_opens = registry.counter(
+    "llm_circuit_breaker_opens_total",
+    "Times a provider's circuit breaker opened, by provider"
+)
+
+# Latency samples needed before the p95 replaces the hedge floor
+MIN_LATENCY_SAMPLES = 20
+
+
+class AllProvidersFailed(RuntimeError):
+    """No provider in the pool produced a response."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a half-open probe."""
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_seconds: float,
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self.clock() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a request may go to the provider; half-open lets one probe through."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> bool:
+        """Count a failure; returns True if this opened the breaker."""
+        self.failures += 1
+        reopened = self._probing
+        self._probing = False
+        if reopened or (self.opened_at is None and self.failures >= self.failure_threshold):
+            self.opened_at = self.clock()
+            return True
+        return False
+
+    def release(self) -> None:
+        """A probe ended without a verdict (cancelled): let another one through."""
+        self._probing = False
+
+
+@dataclass
+class Provider:
+    """One model in the pool with its own limits and health."""
+    name: str
+    model: Model
+    max_concurrency: int
+    timeout_seconds: float
+    breaker: CircuitBreaker
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=200))
+
+    def __post_init__(self) -> None:
+        self.slots = asyncio.Semaphore(self.max_concurrency)
+        # Requests sent to the provider, counted from launch (before they get a slot)
+        self.in_flight = 0
+
+    @property
+    def saturated(self) -> bool:
+        return self.in_flight >= self.max_concurrency
+
+    def p95(self) -> Optional[float]:
+        if len(self.latencies) < MIN_LATENCY_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[int(len(ordered) * 0.95) - 1]
+
+
+class ProviderPool(Model):
+    """Model that spreads requests over ordered providers with failover and hedging."""
+
+    def __init__(
+        self,
+        providers: List[Provider],
+        hedge_enabled: bool = True,
+        hedge_min_seconds: float = 2.0
+    ) -> None:
+        if not providers:
+            raise ValueError("A provider pool needs at least one provider")
+        self.providers = providers
+        self.hedge_enabled = hedge_enabled
+        self.hedge_min_seconds = hedge_min_seconds
+
+    def _candidates(self) -> List[Provider]:
+        """Providers to try in order: healthy ones with free slots, then saturated ones."""
+        healthy = [p for p in self.providers if p.breaker.state != "open"]
+        return [p for p in healthy if not p.saturated] + [p for p in healthy if p.saturated]
+
+    def _hedge_delay(self, provider: Provider) -> float:
+        p95 = provider.p95()
+        return self.hedge_min_seconds if p95 is None else max(self.hedge_min_seconds, p95)
+
+    async def _call(self, provider: Provider, *args, **kwargs) -> ModelResponse:
+        """One request to one provider, under its slot limit, timeout and breaker."""
+        async def attempt() -> ModelResponse:
+            async with provider.slots:
+                return await provider.model.get_response(*args, **kwargs)
+
+        started = time.perf_counter()
+        try:
+            # The timeout includes waiting for a slot
+            response = await asyncio.wait_for(attempt(), provider.timeout_seconds)
+        except asyncio.CancelledError:
+            llm_requests.inc(provider=provider.name, outcome="cancelled")
+            provider.breaker.release()
+            raise
+        except Exception as e:
+            outcome = "timeout" if isinstance(e, asyncio.TimeoutError) else "error"
+            llm_requests.inc(provider=provider.name, outcome=outcome)
+            if provider.breaker.record_failure():
+                llm_breaker_opens.inc(provider=provider.name)
+                logger.warning(f"LLM provider {provider.name} circuit opened: {e!r}")
+            raise
+        elapsed = time.perf_counter() - started
+        provider.latencies.append(elapsed)
+        provider.breaker.record_success()
+        llm_requests.inc(provider=provider.name, outcome="success")
+        llm_request_seconds.observe(elapsed, provider=provider.name)
+        return response
+
+    async def get_response(self, *args, **kwargs) -> ModelResponse:
+        """
+        Get a response from the first provider that answers.
+
+        A failed request moves on to the next provider; a slow one is hedged
+        with the next provider while it keeps running.
+        """
+        queue = iter(self._candidates())
+        running = {}
+        errors: List[BaseException] = []
+
+        def launch() -> bool:
+            for provider in queue:
+                if provider.breaker.allow():
+                    task = asyncio.ensure_future(self._call(provider, *args, **kwargs))
+                    provider.in_flight += 1
+                    task.add_done_callback(lambda _, p=provider: setattr(p, "in_flight", p.in_flight - 1))
+                    running[task] = provider
+                    return True
+            return False
+
+        launch()
+        hedging = self.hedge_enabled
+        try:
+            while running:
+                newest = list(running.values())[-1]
+                done, _ = await asyncio.wait(
+                    running,
+                    timeout=self._hedge_delay(newest) if hedging else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    if launch():
+                        llm_hedges.inc()
+                    else:
+                        # No provider left to hedge with; wait for the running ones
+                        hedging = False
+                    continue
+                for task in done:
+                    del running[task]
+                    if task.exception() is None:
+                        return task.result()
+                    errors.append(task.exception())
+                if not running:
+                    launch()
+        finally:
+            for task in running:
+                task.cancel()
+        raise AllProvidersFailed(
+            "No LLM provider is available" if not errors else f"All LLM providers failed: {errors[-1]!r}"
+        ) from (errors[-1] if errors else None)
+
+    async def stream_response(self, *args, **kwargs) -> AsyncIterator:
+        """
+        Stream from the first provider that starts answering.
+
+        Fails over while no event has arrived (within the provider's timeout);
+        once the stream has started, errors are passed on.
+        """
+        last_error: Optional[BaseException] = None
+        for provider in self._candidates():
+            if not provider.breaker.allow():
+                continue
+            provider.in_flight += 1
+            try:
+                async with provider.slots:
+                    stream = provider.model.stream_response(*args, **kwargs)
+                    try:
+                        first = await asyncio.wait_for(anext(stream), provider.timeout_seconds)
+                    except StopAsyncIteration:
+                        provider.breaker.record_success()
+                        return
+                    except asyncio.CancelledError:
+                        provider.breaker.release()
+                        await stream.aclose()
+                        raise
+                    except Exception as e:
+                        last_error = e
+                        outcome = "timeout" if isinstance(e, asyncio.TimeoutError) else "error"
+                        llm_requests.inc(provider=provider.name, outcome=outcome)
+                        if provider.breaker.record_failure():
+                            llm_breaker_opens.inc(provider=provider.name)
+                        await stream.aclose()
+                        continue
+                    provider.breaker.record_success()
+                    llm_requests.inc(provider=provider.name, outcome="success")
+                    yield first
+                    async for event in stream:
+                        yield event
+                    return
+            finally:
+                provider.in_flight -= 1
+        raise AllProvidersFailed(
+            f"All LLM providers failed: {last_error!r}" if last_error else "No LLM provider is available"
+        ) from last_error
+
+    async def close(self) -> None:
+        for provider in self.providers:
+            await provider.model.close()
+
+
+class FakeModel(Model):
+    """
+    Offline stand-in for an LLM provider.
+
+    Replies with a fixed text, or echoes the last user message, after an
+    optional delay; with fail=True every request raises instead.
+    """
+
+    def __init__(self, reply: Optional[str] = None, delay: float = 0.0, fail: bool = False) -> None:
+        self.reply = reply
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    def _reply_to(self, input) -> str:
+        if self.reply is not None:
+            return self.reply
+        if isinstance(input, str):
+            return f"(fake) {input.splitlines()[-1] if input else ''}"
+        for item in reversed(input):
+            if isinstance(item, dict) and item.get("role") == "user":
+                content = item.get("content")
+                return f"(fake) {content if isinstance(content, str) else ''}"
+        return "(fake)"
+
+    async def _respond(self, input) -> ResponseOutputMessage:
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("fake provider failure")
+        return ResponseOutputMessage(
+            id="fake-message",
+            type="message",
+            role="assistant",
+            status="completed",
+            content=[ResponseOutputText(type="output_text", text=self._reply_to(input), annotations=[])],
+        )
+
+    async def get_response(self, system_instructions, input, *args, **kwargs) -> ModelResponse:
+        message = await self._respond(input)
+        return ModelResponse(output=[message], usage=Usage(requests=1), response_id=None)
+
+    async def stream_response(self, system_instructions, input, *args, **kwargs) -> AsyncIterator:
+        message = await self._respond(input)
+        yield ResponseTextDeltaEvent(
+            type="response.output_text.delta", item_id=message.id, output_index=0,
+            content_index=0, delta=message.content[0].text, logprobs=[], sequence_number=0,
+        )
+        yield ResponseCompletedEvent(
+            type="response.completed", sequence_number=1,
+            response=Response(
+                id="fake-response", created_at=time.time(), model="fake", object="response",
+                output=[message], parallel_tool_calls=False, tool_choice="auto", tools=[],
+            ),
+        )
+
+
+def create_model(name: str, api_key: Optional[str] = None) -> Model:
+    """A model for a provider name: "fake" or a LiteLLM model name."""
+    if name == "fake" or name.startswith("fake/"):
+        return FakeModel()
+    from agents.extensions.models.litellm_model import LitellmModel
+    return LitellmModel(model=name, api_key=api_key)
+
+
+def create_provider_pool(
+    primary: str,
+    primary_api_key: Optional[str],
+    fallbacks: List[str],
+    max_concurrency: int,
+    timeout_seconds: float,
+    hedge_enabled: bool,
+    hedge_min_seconds: float,
+    breaker_failures: int,
+    breaker_reset_seconds: float
+) -> ProviderPool:
+    """
+    Build the pool from settings: the primary model, then its fallbacks.
+
+    Fallbacks get their API keys from the provider's usual environment
+    variable (OPENAI_API_KEY, ANTHROPIC_API_KEY, ...) through LiteLLM.
+    """
+    names = [primary] + [name for name in fallbacks if name != primary]
+    return ProviderPool(
+        [
+            Provider(
+                name=name,
+                model=create_model(name, primary_api_key if name == primary else None),
+                max_concurrency=max_concurrency,
+                timeout_seconds=timeout_seconds,
+                breaker=CircuitBreaker(breaker_failures, breaker_reset_seconds),
+            )
+            for name in names
+        ],
+        hedge_enabled=hedge_enabled,
+        hedge_min_seconds=hedge_min_seconds,
+    )
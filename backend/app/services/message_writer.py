@@ -0,0 +1,267 @@
+"""
+Write-behind persistence of chat messages.
+
+Every chat turn stores the user message, the assistant reply and the
+conversation's new updated_at. Written inline, that is three commits on the
+turn's critical path. While its background loop runs, MessageWriter instead
+buffers those writes and flushes them every flush_interval_seconds, across
+all requests, in one transaction: a multi-row INSERT of the messages and one
+UPDATE per touched conversation.
+
+- the buffer is bounded: when max_pending messages are waiting, the writer
+  flushes inline before accepting more, so a slow database pushes back on
+  chat requests instead of growing memory
+- reads of a conversation (history, messages, ETag fingerprints) and of a
+  user's conversation list call sync() first, which flushes pending writes
+  they would see - a client always reads its own messages
+- stop() flushes what is left on shutdown
+- a failed flush keeps its writes buffered for the next attempt; after
+  max_retries failed batches they are written one per transaction, and
+  messages the database rejects (e.g. a deleted conversation) are logged
+  and dropped so one bad row cannot block everyone else's. A database that
+  cannot be reached still keeps everything buffered
+
+Without the loop (disabled, or outside the app's lifespan) writes go
+straight through on the caller's session. Buffered writes are per process:
+another worker sees them after the next flush.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import bindparam, insert, update
+from sqlalchemy.exc import InterfaceError, OperationalError, StatementError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.database import async_engine
+from app.metrics import registry
+from app.models.conversation import Conversation, Message
+
+
+logger = logging.getLogger(__name__)
+
+messages_written = registry.counter(
+    "chat_messages_written_total",
+    "Chat messages persisted, by mode (write_behind/write_through)"
+)
+flush_batch_size = registry.histogram(
+    "chat_message_flush_batch_size",
+    "Messages written per write-behind flush",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500)
+)
+messages_dropped = registry.counter(
+    "chat_messages_dropped_total",
+    "Buffered chat messages the database rejected after retries"
+)
+
+
+class MessageWriter:
+    """Buffers chat message inserts and conversation touches into periodic batches."""
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        flush_interval_seconds: float,
+        max_pending: int,
+        max_retries: int = 3
+    ) -> None:
+        self.engine = engine
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        # Consecutive failed batch flushes
+        self._failures = 0
+        self._messages: List[dict] = []
+        # conversation_id -> (user_id, latest updated_at)
+        self._touched: Dict[int, Tuple[UUID, datetime]] = {}
+        self._lock = asyncio.Lock()
+        self._runner: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._runner is not None
+
+    @property
+    def pending(self) -> int:
+        return len(self._messages)
+
+    async def add_message(self, db_session: AsyncSession, message: Message) -> None:
+        """Persist a message, buffered while the writer runs."""
+        if not self.running:
+            db_session.add(message)
+            await db_session.commit()
+            messages_written.inc(mode="write_through")
+            return
+        if len(self._messages) >= self.max_pending:
+            await self.flush()
+        self._messages.append(message.model_dump(exclude={"id"}))
+
+    async def touch_conversation(
+        self,
+        db_session: AsyncSession,
+        conversation: Conversation,
+        at: datetime
+    ) -> None:
+        """Set a conversation's updated_at, buffered while the writer runs."""
+        conversation.updated_at = at
+        if not self.running:
+            db_session.add(conversation)
+            await db_session.commit()
+            return
+        previous = self._touched.get(conversation.id)
+        if previous is None or previous[1] < at:
+            self._touched[conversation.id] = (conversation.user_id, at)
+
+    def _has_pending(self, conversation_id: Optional[int], user_id: Optional[UUID]) -> bool:
+        if conversation_id is not None:
+            return conversation_id in self._touched or any(
+                m["conversation_id"] == conversation_id for m in self._messages
+            )
+        return any(u == user_id for u, _ in self._touched.values()) or any(
+            m["user_id"] == user_id for m in self._messages
+        )
+
+    async def sync(
+        self,
+        conversation_id: Optional[int] = None,
+        user_id: Optional[UUID] = None
+    ) -> None:
+        """
+        Make buffered writes of a conversation (or of a user) visible to reads.
+
+        Waits for a flush in progress, which may hold the writes being asked for.
+        """
+        if not self._lock.locked() and not self._has_pending(conversation_id, user_id):
+            return
+        async with self._lock:
+            if self._has_pending(conversation_id, user_id):
+                await self._flush()
+
+    async def flush(self) -> int:
+        """Write everything buffered in one transaction; returns the messages written."""
+        async with self._lock:
+            return await self._flush()
+
+    def _restore(self, messages: List[dict], touched: Dict[int, Tuple[UUID, datetime]]) -> None:
+        """Put unwritten writes back, in order, ahead of those buffered since."""
+        self._messages = messages + self._messages
+        for cid, entry in touched.items():
+            newer = self._touched.get(cid)
+            if newer is None or newer[1] < entry[1]:
+                self._touched[cid] = entry
+
+    async def _write(
+        self,
+        messages: List[dict],
+        touched: Dict[int, Tuple[UUID, datetime]]
+    ) -> None:
+        async with self.engine.begin() as conn:
+            if messages:
+                await conn.execute(insert(Message.__table__), messages)
+            if touched:
+                await conn.execute(
+                    update(Conversation.__table__)
+                    .where(Conversation.__table__.c.id == bindparam("conversation_id"))
+                    .values(updated_at=bindparam("at")),
+                    [{"conversation_id": cid, "at": at} for cid, (_, at) in touched.items()]
+                )
+
+    async def _flush(self) -> int:
+        messages, self._messages = self._messages, []
+        touched, self._touched = self._touched, {}
+        if not messages and not touched:
+            return 0
+        if self._failures >= self.max_retries:
+            return await self._flush_rows(messages, touched)
+        try:
+            await self._write(messages, touched)
+        except BaseException as e:
+            # Keep the writes for the next attempt (also when cancelled)
+            self._restore(messages, touched)
+            if isinstance(e, Exception):
+                self._failures += 1
+            raise
+        self._failures = 0
+        if messages:
+            messages_written.inc(len(messages), mode="write_behind")
+            flush_batch_size.observe(len(messages))
+        return len(messages)
+
+    async def _flush_rows(
+        self,
+        messages: List[dict],
+        touched: Dict[int, Tuple[UUID, datetime]]
+    ) -> int:
+        """
+        Write each message in its own transaction, dropping those the database rejects.
+
+        Stops at the first error reaching the database itself and keeps what is
+        left buffered: that is not the row's fault.
+        """
+        written = 0
+        for i, message in enumerate(messages):
+            try:
+                await self._write([message], {})
+            except (OperationalError, InterfaceError):
+                self._restore(messages[i:], touched)
+                raise
+            except StatementError as e:
+                messages_dropped.inc()
+                logger.error(
+                    f"Dropping chat message of conversation {message['conversation_id']} "
+                    f"({message['role']}) after {self._failures} failed flushes: {e}"
+                )
+                continue
+            except BaseException:
+                self._restore(messages[i:], touched)
+                raise
+            written += 1
+        try:
+            await self._write([], touched)
+        except BaseException:
+            self._restore([], touched)
+            raise
+        self._failures = 0
+        if written:
+            messages_written.inc(written, mode="write_behind")
+        return written
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval_seconds)
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Chat message flush failed, will retry: {e}")
+
+    async def start(self) -> None:
+        """Start buffering writes (disabled when the interval is 0)."""
+        if self.flush_interval_seconds > 0 and self._runner is None:
+            self._runner = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write what is still buffered."""
+        if self._runner is not None:
+            # Not in the middle of a flush
+            async with self._lock:
+                self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+        await self.flush()
+
+
+message_writer = MessageWriter(
+    async_engine,
+    flush_interval_seconds=settings.chat_write_behind_interval_seconds,
+    max_pending=settings.chat_write_behind_max_pending,
+    max_retries=settings.chat_write_behind_max_retries,
+)
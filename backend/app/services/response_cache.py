@@ -0,0 +1,65 @@
+"""
+Cache of LLM chat replies.
+
+Entries are keyed on the user, the normalized agent input (which includes
+the conversation context window) and the user's task-state version, which
+is their change sequence in the database. Any task change, made by any
+worker, moves it on, so replies that describe the task list are never
+served stale. Only replies whose tool calls were read-only are cached.
+"""
+import hashlib
+import json
+import re
+from typing import List, Optional
+
+from app.cache import CacheBackend
+from app.metrics import registry
+
+
+response_cache_requests = registry.counter(
+    "chat_response_cache_requests_total",
+    "Chat response cache lookups by result (hit/miss)"
+)
+
+# Tools that do not change task state; replies using only these are cacheable
+READ_ONLY_TOOLS = {"list_tasks", "search_tasks"}
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = re.compile(r"[\s.!?]+$")
+
+
+class ResponseCache:
+    """TTL cache of chat replies on top of a pluggable CacheBackend."""
+
+    def __init__(self, backend: CacheBackend, ttl: float) -> None:
+        self.backend = backend
+        self.ttl = ttl
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Case-fold, collapse whitespace and drop trailing punctuation."""
+        text = _WHITESPACE.sub(" ", text.strip().lower())
+        return _TRAILING_PUNCTUATION.sub("", text)
+
+    def make_key(self, user_id: str, agent_input: str, task_version: int) -> str:
+        """Build the cache key for a prompt at a given task-state version."""
+        digest = hashlib.sha256(
+            json.dumps([user_id, self.normalize(agent_input), task_version]).encode()
+        ).hexdigest()
+        return f"chat-reply:{digest}"
+
+    @staticmethod
+    def is_cacheable(tool_calls: List[dict]) -> bool:
+        """A reply is cacheable only if every tool call it made was read-only."""
+        return all(call.get("tool_name") in READ_ONLY_TOOLS for call in tool_calls)
+
+    async def get(self, key: str) -> Optional[dict]:
+        """Return the cached reply ({"response", "tool_calls"}) or None."""
+        raw = await self.backend.get(key)
+        response_cache_requests.inc(result="hit" if raw is not None else "miss")
+        return json.loads(raw) if raw is not None else None
+
+    async def put(self, key: str, response: str, tool_calls: List[dict]) -> None:
+        await self.backend.set(
+            key, json.dumps({"response": response, "tool_calls": tool_calls}), ttl=self.ttl
+        )
@@ -0,0 +1,213 @@
+"""
+Per-user task change feed.
+
+Every task mutation publishes created/updated/deleted events in the
+transaction that makes it; they are delivered only if it commits.
+Subscribers (the SSE endpoint) receive them through an in-process broker
+holding one bounded queue per open stream.
+
+With PostgreSQL, events travel through NOTIFY on a shared channel, sent on
+the writing session itself, and each worker LISTENs on one dedicated
+connection, so a change made by any worker (or by the chat agent's tools)
+reaches streams open on every worker. Other databases (SQLite in
+development and tests) deliver in-process only.
+"""
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Literal, Optional, Set, Union
+from uuid import UUID
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, SessionTransaction
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.database import async_engine
+from app.metrics import registry
+from app.models.task import Task
+from app.schemas.task import TaskResponse
+
+
+logger = logging.getLogger(__name__)
+
+EventType = Literal["created", "updated", "deleted", "resync"]
+
+# NOTIFY payloads are limited to 8000 bytes; larger batches become a resync hint
+MAX_NOTIFY_PAYLOAD = 7900
+
+task_events_published = registry.counter(
+    "task_events_published_total",
+    "Task change events published, by type"
+)
+task_events_dropped = registry.counter(
+    "task_events_dropped_total",
+    "Task change streams reset to resync because their queue overflowed"
+)
+
+
+def task_event(
+    event_type: EventType,
+    task: Optional[Task] = None,
+    task_id: Optional[int] = None
+) -> dict:
+    """
+    Build a change event.
+
+    Args:
+        event_type: created, updated, deleted or resync
+        task: The task after the change (omitted for deletes)
+        task_id: ID of the task when `task` is not given
+    """
+    return {
+        "type": event_type,
+        "task_id": task.id if task is not None else task_id,
+        "task": TaskResponse.model_validate(task).model_dump(mode="json") if task is not None else None,
+    }
+
+
+def _user_key(user_id: Union[str, UUID]) -> str:
+    return str(UUID(str(user_id)))
+
+
+# Session.info key of the events published in the session's transaction:
+# (broker, user key, events, deliver in-process)
+_PENDING = "task_events"
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed(session: Session) -> None:
+    for broker, key, events, in_process in session.info.pop(_PENDING, ()):
+        for e in events:
+            task_events_published.inc(type=e["type"])
+        if in_process:
+            broker.deliver(key, events)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_uncommitted(session: Session, transaction: SessionTransaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(_PENDING, None)
+
+
+class TaskEventBroker:
+    """Fans task change events out to the open streams of each user."""
+
+    def __init__(self, channel: str, queue_size: int, use_notify: bool) -> None:
+        self.channel = channel
+        self.queue_size = queue_size
+        self.use_notify = use_notify
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._listener: Optional[asyncio.Task] = None
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: Union[str, UUID]) -> AsyncIterator[asyncio.Queue]:
+        """Register a stream for a user's events for the duration of the block."""
+        key = _user_key(user_id)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(key, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            queues = self._subscribers.get(key)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[key]
+
+    def subscriber_count(self, user_id: Union[str, UUID]) -> int:
+        return len(self._subscribers.get(_user_key(user_id), ()))
+
+    def deliver(self, user_id: str, events: List[dict]) -> None:
+        """Hand events to this process's subscribers of the user."""
+        for queue in self._subscribers.get(user_id, ()):
+            for event in events:
+                try:
+                    queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    # A slow client missed events: replace the backlog with one resync hint
+                    while not queue.empty():
+                        queue.get_nowait()
+                    queue.put_nowait(task_event("resync"))
+                    task_events_dropped.inc()
+                    break
+
+    async def publish(
+        self,
+        session: AsyncSession,
+        user_id: Union[str, UUID],
+        events: List[dict]
+    ) -> None:
+        """
+        Publish events for a user with the transaction that made the change.
+
+        Call before committing it. On PostgreSQL the NOTIFY is sent on the
+        session, so every worker receives the events if - and only if - the
+        transaction commits; on other databases this process's streams get
+        them once it commits.
+        """
+        if not events:
+            return
+        key = _user_key(user_id)
+        notify = session.bind.dialect.name == "postgresql"
+        session.sync_session.info.setdefault(_PENDING, []).append((self, key, events, not notify))
+        if not notify:
+            return
+
+        payload = json.dumps({"user_id": key, "events": events})
+        if len(payload.encode()) > MAX_NOTIFY_PAYLOAD:
+            payload = json.dumps({"user_id": key, "events": [task_event("resync")]})
+        await session.exec(
+            text("SELECT pg_notify(:channel, :payload)").bindparams(channel=self.channel, payload=payload)
+        )
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+            self.deliver(message["user_id"], message["events"])
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring malformed task event notification: {e}")
+
+    async def _listen(self) -> None:
+        """Hold a LISTEN connection open, reconnecting after failures."""
+        while True:
+            lost = asyncio.Event()
+            try:
+                async with async_engine.connect() as conn:
+                    raw = await conn.get_raw_connection()
+                    pg = raw.driver_connection
+                    pg.add_termination_listener(lambda _conn: lost.set())
+                    await pg.add_listener(self.channel, self._on_notify)
+                    logger.info(f"Listening for task events on '{self.channel}'")
+                    await lost.wait()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Task event listener failed: {e}")
+            # Events may have been missed while disconnected
+            for user_id in list(self._subscribers):
+                self.deliver(user_id, [task_event("resync")])
+            await asyncio.sleep(settings.task_events_reconnect_seconds)
+
+    async def start(self) -> None:
+        """Start the LISTEN loop (PostgreSQL only)."""
+        if self.use_notify and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+
+task_events = TaskEventBroker(
+    channel=settings.task_events_channel,
+    queue_size=settings.task_events_queue_size,
+    use_notify=make_url(settings.database_url).get_backend_name() == "postgresql",
+)
@@ -0,0 +1,213 @@
+"""
+Full-text search over a user's task titles and descriptions.
+
+PostgreSQL: the stored `search_vector` column (see task_search_ddl) is
+matched with websearch_to_tsquery - so quotes, OR and -exclusions work -
+through its GIN index, and hits are ranked with ts_rank_cd. Title words
+carry weight A and description words weight B.
+
+Other databases (SQLite in development and tests) fall back to an
+in-process inverted index per user, built from the user's tasks on first
+search and rebuilt when the task set's fingerprint (count, newest update,
+highest id) changes - the same fingerprint the list ETag uses, so every
+worker notices every change. Hits are ranked with BM25, title terms
+counting double. Query terms must all match, as with websearch_to_tsquery.
+"""
+import math
+import re
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import column, func
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.metrics import registry
+from app.models.task import Task
+
+
+search_requests = registry.counter(
+    "task_search_requests_total",
+    "Task searches, by backend (postgres or fallback)"
+)
+search_index_builds = registry.counter(
+    "task_search_index_builds_total",
+    "Fallback inverted indexes (re)built because a user's tasks changed"
+)
+
+_WORD = re.compile(r"\w+")
+
+# Common words PostgreSQL's english configuration drops as well
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have i in is it its my of on or "
+    "our so that the their this to was we were will with".split()
+)
+
+TITLE_WEIGHT = 2.0
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def _stem(word: str) -> str:
+    """Light English suffix stripping: groceries/grocery, tasks/task, emails/email."""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 4 and word.endswith(("sses", "shes", "ches", "xes")):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Split text into normalized search terms."""
+    if not text:
+        return []
+    return [
+        _stem(word)
+        for word in _WORD.findall(text.casefold())
+        if word not in STOPWORDS
+    ]
+
+
+@dataclass
+class InvertedIndex:
+    """Term -> {task id: weighted term frequency}, with BM25 ranking."""
+    postings: Dict[str, Dict[int, float]] = field(default_factory=lambda: defaultdict(dict))
+    lengths: Dict[int, float] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, rows: List[Tuple[int, str, Optional[str]]]) -> "InvertedIndex":
+        index = cls()
+        for task_id, title, description in rows:
+            weights: Dict[str, float] = defaultdict(float)
+            for term in tokenize(title):
+                weights[term] += TITLE_WEIGHT
+            for term in tokenize(description):
+                weights[term] += 1.0
+            for term, weight in weights.items():
+                index.postings[term][task_id] = weight
+            index.lengths[task_id] = sum(weights.values())
+        return index
+
+    def search(self, query: str) -> List[Tuple[int, float]]:
+        """Return (task id, score) for tasks containing every query term, best first."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self.lengths:
+            return []
+        postings = [self.postings.get(term, {}) for term in terms]
+        if not all(postings):
+            return []
+
+        # Intersect starting from the rarest term
+        postings.sort(key=len)
+        matches = set(postings[0])
+        for posting in postings[1:]:
+            matches &= posting.keys()
+            if not matches:
+                return []
+
+        total = len(self.lengths)
+        average = sum(self.lengths.values()) / total
+        scores = []
+        for task_id in matches:
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[task_id] / average)
+            score = 0.0
+            for posting in postings:
+                idf = math.log(1 + (total - len(posting) + 0.5) / (len(posting) + 0.5))
+                tf = posting[task_id]
+                score += idf * tf * (BM25_K1 + 1) / (tf + norm)
+            scores.append((task_id, score))
+        scores.sort(key=lambda hit: (-hit[1], -hit[0]))
+        return scores
+
+
+class FallbackSearchIndexes:
+    """Per-user inverted indexes, LRU-bounded, rebuilt when the user's tasks change."""
+
+    def __init__(self, max_users: int) -> None:
+        self.max_users = max_users
+        self._indexes: "OrderedDict[UUID, Tuple[tuple, InvertedIndex]]" = OrderedDict()
+
+    async def get(self, session: AsyncSession, user_id: UUID) -> InvertedIndex:
+        fingerprint = tuple((await session.exec(
+            select(func.count(Task.id), func.max(Task.updated_at), func.max(Task.id))
+            .where(Task.user_id == user_id)
+        )).one())
+        cached = self._indexes.get(user_id)
+        if cached is not None and cached[0] == fingerprint:
+            self._indexes.move_to_end(user_id)
+            return cached[1]
+
+        rows = (await session.exec(
+            select(Task.id, Task.title, Task.description)
+            .where(Task.user_id == user_id, Task.deleted_at.is_(None))
+        )).all()
+        index = InvertedIndex.build(rows)
+        search_index_builds.inc()
+        self._indexes[user_id] = (fingerprint, index)
+        self._indexes.move_to_end(user_id)
+        while len(self._indexes) > self.max_users:
+            self._indexes.popitem(last=False)
+        return index
+
+    def clear(self) -> None:
+        self._indexes.clear()
+
+
+fallback_indexes = FallbackSearchIndexes(settings.search_fallback_max_users)
+
+
+async def search_tasks(
+    session: AsyncSession,
+    user_id: UUID,
+    query: str,
+    limit: int,
+    offset: int = 0
+) -> List[Tuple[Task, float]]:
+    """
+    Search a user's tasks.
+
+    Args:
+        session: Database session
+        user_id: Owner of the tasks
+        query: Free-text query (web search syntax on PostgreSQL)
+        limit: Maximum number of hits
+        offset: Number of hits to skip (pagination)
+
+    Returns:
+        List of (task, rank) pairs, best match first
+    """
+    if session.bind.dialect.name == "postgresql":
+        search_requests.inc(backend="postgres")
+        tsquery = func.websearch_to_tsquery(settings.search_language, query)
+        vector = column("search_vector")
+        rank = func.ts_rank_cd(vector, tsquery)
+        rows = (await session.exec(
+            select(Task, rank.label("rank"))
+            .where(Task.user_id == user_id, Task.deleted_at.is_(None), vector.op("@@")(tsquery))
+            .order_by(rank.desc(), Task.id.desc())
+            .offset(offset)
+            .limit(limit)
+        )).all()
+        return [(task, float(score)) for task, score in rows]
+
+    search_requests.inc(backend="fallback")
+    index = await fallback_indexes.get(session, user_id)
+    hits = index.search(query)[offset:offset + limit]
+    if not hits:
+        return []
+    tasks = {
+        task.id: task
+        for task in (await session.exec(
+            select(Task).where(
+                Task.user_id == user_id,
+                Task.deleted_at.is_(None),
+                Task.id.in_([task_id for task_id, _ in hits])
+            )
+        )).all()
+    }
+    return [(tasks[task_id], score) for task_id, score in hits if task_id in tasks]
@@ -0,0 +1,31 @@
+"""
+Per-user task-state version.
+
+A user's version is their task change sequence (see task_sync): every task
+mutation - REST routes and agent tools alike - takes the next number in the
+same transaction as its write, so every worker reads the same version as
+soon as the change is visible. Anything derived from a user's task list
+(such as cached chat replies) includes the version in its key, so a single
+change invalidates all of it at once.
+"""
+from uuid import UUID
+from typing import Union
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.cache import CacheBackend, create_cache_backend
+from app.config import settings
+from app.models.task import TaskChangeCounter
+
+
+# Shared by the chat response cache and the chat context builder
+cache_backend: CacheBackend = create_cache_backend(settings.cache_url, settings.cache_max_entries)
+
+
+async def get_task_version(session: AsyncSession, user_id: Union[str, UUID]) -> int:
+    """Return the user's current task-state version (0 before the first change)."""
+    seq = (await session.exec(
+        select(TaskChangeCounter.seq).where(TaskChangeCounter.user_id == UUID(str(user_id)))
+    )).first()
+    return seq or 0
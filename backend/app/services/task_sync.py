@@ -0,0 +1,230 @@
+"""
+Incremental task sync: per-user change sequence, tombstones and compaction.
+
+Every write transaction takes the next number of its user's change sequence
+(next_change_seq) and stamps it on each task it creates, updates or
+deletes. Deletes are soft: the row stays as a tombstone with `deleted_at`
+set, so a client syncing later still learns about it.
+
+Allocation is an upsert on the user's counter row, which holds that row
+locked until the transaction ends. A user's writers therefore commit in
+sequence order, and once the counter reads N every change numbered N or
+less is visible - a client that has read up to N has missed nothing.
+
+Tombstones are kept for `tombstone_retention_days`. Compaction deletes older
+ones and records the highest sequence it removed (`purged_seq`); a cursor
+behind that may have missed deletes, so its client must resync in full.
+
+A full resync is a snapshot of the live tasks, paged by task ID and marked
+as such in its cursors. It remembers the counter it started at; once the
+last page is out, the feed carries on incrementally from there, so changes
+made while the client paged through are not lost.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import delete, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import and_, func, or_, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.database import async_engine
+from app.metrics import registry
+from app.models.task import Task, TaskChangeCounter, utc_now
+
+
+logger = logging.getLogger(__name__)
+
+tombstones_purged = registry.counter(
+    "task_tombstones_purged_total",
+    "Deleted-task tombstones removed by compaction"
+)
+sync_resets = registry.counter(
+    "task_sync_resets_total",
+    "Change feed requests answered with a full resync (no cursor, or cursor too old)"
+)
+
+_INSERTS = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+
+
+async def next_change_seq(session: AsyncSession, user_id: UUID) -> int:
+    """
+    Allocate the user's next change sequence number for this transaction.
+
+    Call before writing the user's tasks, in the same transaction; the
+    counter row stays locked until it commits or rolls back.
+    """
+    insert = _INSERTS[session.bind.dialect.name]
+    statement = (
+        insert(TaskChangeCounter)
+        .values(user_id=user_id, seq=1, purged_seq=0)
+        .on_conflict_do_update(
+            index_elements=[TaskChangeCounter.user_id],
+            set_={"seq": TaskChangeCounter.seq + 1}
+        )
+        .returning(TaskChangeCounter.seq)
+    )
+    return (await session.exec(statement)).scalar_one()
+
+
+@dataclass
+class ChangePage:
+    """One page of a user's task changes."""
+    tasks: List[Task]  # in (change_seq, id) order, or id order in a snapshot; tombstones have deleted_at set
+    position: Tuple[int, Optional[int], bool]  # where the next page starts
+    has_more: bool
+    reset: bool  # starts a full snapshot: the client must drop what it has
+
+
+async def read_changes(
+    session: AsyncSession,
+    user_id: UUID,
+    since: Optional[Tuple[int, Optional[int], bool]],
+    limit: int
+) -> ChangePage:
+    """
+    Read the user's task changes after a sync position.
+
+    Args:
+        session: Database session
+        user_id: Owner of the tasks
+        since: (sequence, id, snapshot) position from a sync cursor, or None
+        limit: Maximum number of changes
+
+    Returns:
+        ChangePage: Changed tasks and tombstones, or - without a position,
+        or with one older than the last compaction - the first page of a
+        full snapshot of live tasks
+    """
+    counter = (await session.exec(
+        select(TaskChangeCounter).where(TaskChangeCounter.user_id == user_id)
+    )).first()
+    current, purged = (counter.seq, counter.purged_seq) if counter else (0, 0)
+
+    if since is None:
+        reset = True
+    elif since[2]:
+        # A snapshot continues unless compaction passed its starting point
+        reset = since[0] < purged
+    else:
+        # A position inside sequence `purged` has not seen all of its (now purged) changes
+        reset = since[0] < purged or (since[0] == purged and since[1] is not None)
+
+    snapshot = reset or since[2]
+    statement = select(Task).where(Task.user_id == user_id)
+    if snapshot:
+        if reset:
+            sync_resets.inc()
+            start, after = current, None
+        else:
+            start, after = since[0], since[1]
+        statement = statement.where(Task.deleted_at.is_(None))
+        if after is not None:
+            statement = statement.where(Task.id > after)
+        order = (Task.id,)
+    else:
+        seq, row_id = since[0], since[1]
+        if row_id is None:
+            statement = statement.where(Task.change_seq > seq)
+        else:
+            statement = statement.where(or_(
+                Task.change_seq > seq,
+                and_(Task.change_seq == seq, Task.id > row_id)
+            ))
+        order = (Task.change_seq, Task.id)
+
+    # Fetch one extra row to learn whether another page exists
+    rows = (await session.exec(statement.order_by(*order).limit(limit + 1))).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    if snapshot:
+        # Page on through the snapshot, then read the changes made since it started
+        position = (start, rows[-1].id, True) if has_more else (start, None, False)
+    elif has_more or (rows and rows[-1].change_seq > current):
+        position = (rows[-1].change_seq, rows[-1].id, False)
+    else:
+        # Everything up to the counter read above has been returned
+        position = (current, None, False)
+    return ChangePage(tasks=rows, position=position, has_more=has_more, reset=reset)
+
+
+async def compact_tombstones(session: AsyncSession, older_than) -> int:
+    """
+    Delete tombstones of tasks deleted before `older_than`.
+
+    Each affected user's `purged_seq` is raised to the highest sequence
+    removed first, in the same transaction, so no cursor can skip a delete
+    unnoticed.
+
+    Returns:
+        int: Number of tombstones removed
+    """
+    expired = and_(Task.deleted_at.is_not(None), Task.deleted_at < older_than)
+    highest_purged = (
+        select(func.max(Task.change_seq))
+        .where(Task.user_id == TaskChangeCounter.user_id, expired)
+        .scalar_subquery()
+    )
+    await session.exec(
+        update(TaskChangeCounter)
+        .where(highest_purged > TaskChangeCounter.purged_seq)
+        .values(purged_seq=highest_purged)
+    )
+    removed = (await session.exec(delete(Task).where(expired))).rowcount
+    await session.commit()
+    tombstones_purged.inc(removed)
+    return removed
+
+
+class TombstoneCompactor:
+    """Runs compact_tombstones periodically in the background."""
+
+    def __init__(self, interval_seconds: int, retention_days: int) -> None:
+        self.interval_seconds = interval_seconds
+        self.retention_days = retention_days
+        self._runner: Optional[asyncio.Task] = None
+
+    async def run_once(self) -> int:
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            return await compact_tombstones(
+                session, utc_now() - timedelta(days=self.retention_days)
+            )
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                removed = await self.run_once()
+                if removed:
+                    logger.info(f"Compacted {removed} task tombstones")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Tombstone compaction failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    async def start(self) -> None:
+        """Start the compaction loop (disabled when the interval is 0)."""
+        if self.interval_seconds > 0 and self._runner is None:
+            self._runner = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+
+
+tombstone_compactor = TombstoneCompactor(
+    interval_seconds=settings.tombstone_compaction_interval_seconds,
+    retention_days=settings.tombstone_retention_days,
+)
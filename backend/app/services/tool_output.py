@@ -0,0 +1,121 @@
+"""
+Encoding of task tool results for the chat agent.
+
+Whatever a tool returns, the model reads back as prompt tokens on its next
+step. The full JSON of a task list - every description, ISO timestamps,
+long key names - makes one list_tasks call for a user with hundreds of
+tasks cost a large part of the context window. The compact encoding keeps
+what the model needs to answer and act:
+
+- one-letter keys, explained once by a "keys" legend
+- descriptions truncated at a word boundary, with "…(+N)" marking N more
+  characters the model can get by searching for the task
+- relative ages ("5m", "3h", "2d") instead of ISO timestamps
+- at most max_tasks tasks, plus how many were left out; the result's
+  "count" may exceed its list when the action already loaded fewer
+
+Results without a task list (single-task actions, errors) are short
+already and are passed through as JSON.
+"""
+import json
+from datetime import datetime, UTC
+from typing import Optional
+
+
+TOOL_OUTPUT_STYLES = ("compact", "json")
+
+# Full field name -> compact key, in output order
+COMPACT_KEYS = {
+    "id": "i",
+    "title": "t",
+    "completed": "c",
+    "description": "d",
+    "created_at": "a",
+    "rank": "r",
+}
+
+LEGEND = "i=id t=title c=1 if completed d=description a=age r=rank; …(+N) = N more characters"
+
+# (seconds, suffix) from the largest unit down
+_AGE_UNITS = ((365 * 86400, "y"), (30 * 86400, "mo"), (7 * 86400, "w"), (86400, "d"), (3600, "h"), (60, "m"))
+
+
+def relative_age(timestamp: str, now: datetime) -> str:
+    """Age of an ISO timestamp in its largest whole unit, e.g. "3d"."""
+    then = datetime.fromisoformat(timestamp)
+    if then.tzinfo is None:
+        then = then.replace(tzinfo=UTC)
+    seconds = (now - then).total_seconds()
+    for size, suffix in _AGE_UNITS:
+        if seconds >= size:
+            return f"{int(seconds // size)}{suffix}"
+    return "now"
+
+
+def truncate(text: str, max_chars: int) -> str:
+    """Cut text to about max_chars at a word boundary, noting how much was left out."""
+    text = " ".join(text.split())
+    if len(text) <= max_chars:
+        return text
+    kept = text[:max_chars].rsplit(" ", 1)[0] if " " in text[:max_chars] else text[:max_chars]
+    return f"{kept}…(+{len(text) - len(kept)})"
+
+
+def compact_task(task: dict, description_chars: int, now: datetime) -> dict:
+    """One task with short keys; empty and default fields are left out."""
+    out = {}
+    for field, key in COMPACT_KEYS.items():
+        value = task.get(field)
+        if value is None or value is False or value == "":
+            continue
+        if field == "completed":
+            value = 1
+        elif field == "description":
+            value = truncate(value, description_chars)
+        elif field == "created_at":
+            value = relative_age(value, now)
+        out[key] = value
+    return out
+
+
+def encode_task_result(
+    result: dict,
+    style: str = "compact",
+    max_tasks: int = 50,
+    description_chars: int = 80,
+    now: Optional[datetime] = None
+) -> str:
+    """
+    Encode a task action result as the tool output the model reads.
+
+    Args:
+        result: Result of a task action
+        style: "compact", or "json" for the full result
+        max_tasks: Most tasks included in a compact list
+        description_chars: Description length kept in a compact list
+        now: Reference time for relative ages (default: current time)
+
+    Raises:
+        ValueError: If the style is not supported
+    """
+    if style not in TOOL_OUTPUT_STYLES:
+        raise ValueError(f"Unsupported tool output style: {style}")
+    tasks = result.get("tasks")
+    if style == "json" or result.get("status") == "failed" or not tasks:
+        return json.dumps(result)
+
+    now = now or datetime.now(UTC)
+    shown = tasks[:max_tasks]
+    count = max(result.get("count", len(tasks)), len(tasks))
+    compact = {key: value for key, value in result.items() if key not in ("tasks", "count")}
+    compact.update({
+        "count": count,
+        "keys": LEGEND,
+        "tasks": [compact_task(task, description_chars, now) for task in shown],
+    })
+    if count > len(shown):
+        compact["more"] = count - len(shown)
+        compact["hint"] = (
+            f"Only the first {len(shown)} are shown; use search_tasks or a status filter to find others"
+        )
+    return json.dumps(compact, ensure_ascii=False, separators=(",", ":"))
@@ -0,0 +1,131 @@
+"""
+Per-run unit of work for the chat agent's task tools.
+
+One agent turn may call several task tools - "complete tasks 3, 4 and 5" is
+three complete_task calls, which the agents SDK runs concurrently. Instead
+of a session, transaction and commit each, the tools of a run share one
+TaskUnitOfWork (passed through the run context):
+
+- one AsyncSession and transaction, opened on first use; tools take turns
+  on it through a lock, so their other work still overlaps
+- created tasks get their IDs from a flush, and later tools of the run read
+  the run's own changes
+- the single commit at the end of the run takes the user's next change
+  sequence number (see task_sync), stamps it on every task the run touched
+  and publishes the run's task events with it; the counter row, which
+  every writer of the user waits on, is locked only for that final step
+
+If the run fails, or a tool's statement raises, everything the run wrote
+is rolled back and its events are dropped. Rows the run changed stay
+locked until it finishes.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional, Set, Union
+from uuid import UUID
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.task import Task
+from app.services.task_events import task_events
+from app.services.task_sync import next_change_seq
+
+
+class UnitOfWorkFailed(RuntimeError):
+    """An earlier statement of the unit failed; its changes will be rolled back."""
+
+
+class TaskUnitOfWork:
+    """One transaction shared by the task tools of an agent run."""
+
+    def __init__(self, user_id: Union[str, UUID], engine: AsyncEngine) -> None:
+        self.user_id = UUID(str(user_id))
+        self.engine = engine
+        self.failed = False
+        self._session: Optional[AsyncSession] = None
+        self._lock = asyncio.Lock()
+        self._changed: Set[int] = set()
+        self._events: List[dict] = []
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[AsyncSession]:
+        """Exclusive use of the shared session for a group of statements."""
+        async with self._lock:
+            if self.failed:
+                raise UnitOfWorkFailed("An earlier task change in this turn failed and was rolled back")
+            if self._session is None:
+                self._session = AsyncSession(self.engine, expire_on_commit=False)
+            try:
+                yield self._session
+            except Exception:
+                self.failed = True
+                raise
+
+    def changed(self, *task_ids: int) -> None:
+        """Record tasks the run wrote; the commit stamps their change sequence."""
+        self._changed.update(task_ids)
+
+    def publish_after_commit(self, *events: dict) -> None:
+        """Queue task events to publish with the unit's commit."""
+        self._events.extend(events)
+
+    async def commit(self) -> None:
+        """Stamp the run's change sequence on the tasks it touched, publish and commit."""
+        if self.failed:
+            await self.rollback()
+            return
+        async with self._lock:
+            if self._session is not None:
+                if self._changed:
+                    seq = await next_change_seq(self._session, self.user_id)
+                    await self._session.exec(
+                        update(Task).where(Task.id.in_(self._changed)).values(change_seq=seq)
+                    )
+                await task_events.publish(self._session, self.user_id, self._events)
+                await self._session.commit()
+            self._changed, self._events = set(), []
+
+    async def rollback(self) -> None:
+        """Discard the run's changes and events."""
+        async with self._lock:
+            if self._session is not None:
+                await self._session.rollback()
+            self._changed, self._events = set(), []
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> "TaskUnitOfWork":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        try:
+            if exc_type is None:
+                await self.commit()
+            else:
+                await self.rollback()
+        finally:
+            await self.close()
+
+
+@asynccontextmanager
+async def unit_scope(
+    unit: Optional[TaskUnitOfWork],
+    user_id: Union[str, UUID],
+    engine: AsyncEngine
+) -> AsyncIterator[TaskUnitOfWork]:
+    """
+    Join the caller's unit of work, or run in a unit of its own.
+
+    Without a unit (the intent fast-path, direct calls) the block gets a
+    fresh one that commits when the block exits without error.
+    """
+    if unit is not None:
+        yield unit
+        return
+    async with TaskUnitOfWork(user_id, engine) as own:
+        yield own
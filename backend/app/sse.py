@@ -0,0 +1,16 @@
+"""
+Server-Sent Events helpers shared by the streaming endpoints.
+"""
+import json
+
+
+# Disable proxy buffering (nginx) and caching so frames reach the client immediately
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+# Comment frame sent on idle streams so proxies do not time the connection out
+KEEPALIVE = ": keepalive\n\n"
+
+
+def format_sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Events frame."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
@@ -0,0 +1,56 @@
+"""
+Fixtures shared by the backend tests.
+
+Each test gets a fresh SQLite database file. The sync session seeds and
+inspects rows; the async engine on the same file serves the API (through
+the get_async_session override of `client`) and ChatService alike.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel import Session, create_engine, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.main import app
+from app.database import get_async_session
+from app.services import chat_service
+
+
+@pytest.fixture(name="db_path")
+def db_path_fixture(tmp_path):
+    """Path of a fresh SQLite database with all tables created."""
+    path = tmp_path / "test.db"
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine)
+    engine.dispose()
+    return path
+
+
+@pytest.fixture(name="session")
+def session_fixture(db_path):
+    """Sync session used to seed and inspect rows."""
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+@pytest.fixture(name="async_engine")
+def async_engine_fixture(db_path, monkeypatch):
+    """Async engine on the test database, also used by ChatService."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+    monkeypatch.setattr(chat_service, "async_engine", engine)
+    return engine
+
+
+@pytest.fixture(name="client")
+def client_fixture(async_engine):
+    """API client whose requests use the test database."""
+    async def get_async_session_override():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield session
+
+    app.dependency_overrides[get_async_session] = get_async_session_override
+    yield TestClient(app)
+    app.dependency_overrides.clear()
@@ -1,12 +1,21 @@
 """
 Test JWT authentication middleware with mock tokens.
 """
+import asyncio
 from datetime import datetime, timedelta, UTC
 from uuid import uuid4
 from jose import jwt
 from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
 from app.config import settings
-from app.middleware.auth import verify_jwt_token, validate_user_id
+from app.middleware import auth
+from app.middleware.auth import (
+    verify_jwt_token,
+    validate_user_id,
+    get_current_user,
+    invalidate_user,
+    auth_cache_requests,
+)
 from app.models.user import User
 
 
@@ -150,6 +159,73 @@ def test_validate_invalid_user_id_format():
         print("✓ Invalid user ID format rejection passed")
 
 
+def test_verified_claims_are_cached():
+    """A second verification of the same token is served from the claims cache."""
+    token = create_mock_jwt_token(str(uuid4()))
+    hits = auth_cache_requests.value(cache="token", result="hit")
+
+    first = verify_jwt_token(token)
+    second = verify_jwt_token(token)
+
+    assert second == first
+    assert auth_cache_requests.value(cache="token", result="hit") == hits + 1
+    print("✓ Token claims cache passed")
+
+
+def test_expired_token_is_not_cached():
+    """Tokens that fail verification never enter the claims cache."""
+    token = create_mock_jwt_token(str(uuid4()), expired=True)
+    size = len(auth.token_cache)
+
+    for _ in range(2):
+        try:
+            verify_jwt_token(token)
+            assert False, "Expected HTTPException but none was raised"
+        except HTTPException as exc:
+            assert exc.status_code == 401
+
+    assert len(auth.token_cache) == size
+    print("✓ Expired token not cached passed")
+
+
+class FakeSession:
+    """Async session stand-in that returns a fixed user and counts queries."""
+
+    def __init__(self, user):
+        self.user = user
+        self.queries = 0
+
+    async def exec(self, statement):
+        self.queries += 1
+        user = self.user
+
+        class Result:
+            def first(self):
+                return user
+
+        return Result()
+
+
+def test_user_lookup_is_cached_until_invalidated():
+    """get_current_user hits the database once, then again after invalidation."""
+    user = User(id=uuid4(), email="cached@example.com", password_hash="hashed_password")
+    session = FakeSession(user)
+    credentials = HTTPAuthorizationCredentials(
+        scheme="Bearer", credentials=create_mock_jwt_token(str(user.id))
+    )
+
+    first = asyncio.run(get_current_user(credentials, session))
+    second = asyncio.run(get_current_user(credentials, session))
+    assert first.id == second.id == user.id
+    assert second.email == user.email
+    assert session.queries == 1
+
+    invalidate_user(user.id)
+    asyncio.run(get_current_user(credentials, session))
+    assert session.queries == 2
+    print("✓ User cache and invalidation passed")
+
+
 if __name__ == "__main__":
     print("\n=== Testing JWT Authentication Middleware ===\n")
 
@@ -161,5 +237,8 @@ if __name__ == "__main__":
     test_validate_matching_user_id()
     test_validate_mismatched_user_id()
     test_validate_invalid_user_id_format()
+    test_verified_claims_are_cached()
+    test_expired_token_is_not_cached()
+    test_user_lookup_is_cached_until_invalidated()
 
     print("\n=== All middleware tests passed! ===\n")
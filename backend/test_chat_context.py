@@ -0,0 +1,104 @@
+"""
+Tests for the token-budgeted chat context builder.
+"""
+import asyncio
+import json
+import pytest
+
+from app.cache import InMemoryCache
+from app.services.chat_context import ContextBuilder, create_token_counter, estimate_tokens
+
+
+def word_count(text: str) -> int:
+    """Token counter stand-in: one token per word, easy to reason about."""
+    return len(text.split())
+
+
+def make_history(*contents: str) -> list[dict]:
+    return [
+        {"id": i + 1, "role": "user" if i % 2 == 0 else "assistant", "content": content}
+        for i, content in enumerate(contents)
+    ]
+
+
+@pytest.fixture(name="builder")
+def builder_fixture() -> ContextBuilder:
+    return ContextBuilder(
+        InMemoryCache(),
+        max_tokens=40,
+        message_max_tokens=10,
+        summary_max_tokens=12,
+        count_tokens=word_count,
+    )
+
+
+def test_short_history_is_kept_verbatim(builder: ContextBuilder):
+    prompt, summary = builder.fit(make_history("hi there", "hello, how can I help?"), "list my tasks")
+
+    assert prompt == (
+        "Previous conversation:\nUser: hi there\nAssistant: hello, how can I help?\n\n"
+        "User: list my tasks"
+    )
+    assert summary == (0, [])
+    assert builder.fit([], "list my tasks")[0] == "list my tasks"
+
+
+def test_long_messages_are_clipped_in_the_middle(builder: ContextBuilder):
+    paste = " ".join(f"w{i}" for i in range(100))
+    clipped = builder.clip(paste, 10)
+
+    assert word_count(clipped) <= 10
+    assert clipped.startswith("w0 w1") and clipped.endswith("w98 w99")
+    assert "[...]" in clipped
+    prompt, _ = builder.fit(make_history(paste), paste)
+    assert word_count(prompt) <= builder.max_tokens
+
+
+def test_older_turns_are_folded_into_the_summary(builder: ContextBuilder):
+    history = make_history(*(f"message number {i} with some words" for i in range(10)))
+    prompt, (through, lines) = builder.fit(history, "what next?")
+
+    assert word_count(prompt) <= builder.max_tokens
+    assert prompt.startswith("Summary of earlier conversation:\n")
+    assert prompt.endswith("Assistant: message number 9 with some words\n\nUser: what next?")
+    # Everything up to the verbatim window is covered by the summary
+    verbatim = prompt.split("Previous conversation:\n")[1]
+    assert through == min(m["id"] for m in history if m["content"] in verbatim) - 1
+    assert lines[-1] == f"{history[through - 1]['role'].capitalize()}: {history[through - 1]['content']}"
+
+
+def test_summary_is_cached_and_only_new_messages_are_folded():
+    counted = []
+
+    def counting(text: str) -> int:
+        counted.append(text)
+        return word_count(text)
+
+    backend = InMemoryCache()
+    builder = ContextBuilder(backend, max_tokens=40, message_max_tokens=10, summary_max_tokens=12,
+                             count_tokens=counting)
+    history = make_history(*(f"message number {i} with some words" for i in range(10)))
+
+    first = asyncio.run(builder.build(7, history, "what next?"))
+    through, lines = json.loads(backend.get_sync("chat-summary:7"))
+    assert through > 0 and all(line in first for line in lines)
+
+    # Next turn: two more messages; the summary only grows by what left the window
+    history += [
+        {"id": 11, "role": "user", "content": "another question with several words in it"},
+        {"id": 12, "role": "assistant", "content": "another answer with several words in it"},
+    ]
+    counted.clear()
+    asyncio.run(builder.build(7, history, "and then?"))
+    new_through, _ = json.loads(backend.get_sync("chat-summary:7"))
+    assert new_through > through
+    # Messages summarized on the previous turn were not measured again
+    summarized = {f"message number {i} with some words" for i in range(through)}
+    assert summarized.isdisjoint(counted)
+
+
+def test_create_token_counter():
+    assert create_token_counter("estimate") is estimate_tokens
+    assert estimate_tokens("abcd" * 10) == 10
+    with pytest.raises(ValueError):
+        create_token_counter("words")
@@ -0,0 +1,113 @@
+"""
+Tests for the streaming chat endpoint, using a fake agent runner (no LLM calls).
+"""
+import asyncio
+import json
+import pytest
+from types import SimpleNamespace
+from uuid import uuid4
+from fastapi.testclient import TestClient
+from sqlmodel import Session, create_engine, select
+
+from app.main import app
+from app.models.conversation import Message
+from app.services import chat_service
+from app.services.chat_service import ChatService
+
+
+class FakeStreamingResult:
+    """Mimics agents.RunResultStreaming for a canned reply with one tool call."""
+
+    def __init__(self):
+        self.cancelled = False
+        self.final_output = "Hello there"
+        call = SimpleNamespace(type="function_call", name="list_tasks", arguments='{"status": "all"}')
+        self.new_items = [SimpleNamespace(raw_item=call)]
+
+    async def stream_events(self):
+        yield SimpleNamespace(
+            type="run_item_stream_event", name="tool_called", item=self.new_items[0]
+        )
+        yield SimpleNamespace(
+            type="run_item_stream_event", name="tool_output", item=SimpleNamespace(output='{"count": 0}')
+        )
+        for delta in ("Hello", " there"):
+            yield SimpleNamespace(
+                type="raw_response_event",
+                data=SimpleNamespace(type="response.output_text.delta", delta=delta)
+            )
+
+    def cancel(self, mode="immediate"):
+        self.cancelled = True
+
+
+class FakeRunner:
+    """Stand-in for agents.Runner that records the streamed result it hands out."""
+    last_result = None
+
+    @classmethod
+    def run_streamed(cls, agent, input, context=None):
+        cls.last_result = FakeStreamingResult()
+        return cls.last_result
+
+
+@pytest.fixture(autouse=True)
+def fake_runner(async_engine, monkeypatch):
+    """ChatService on the test database, with a fake runner."""
+    monkeypatch.setattr(chat_service, "Runner", FakeRunner)
+
+
+def saved_messages(db_path) -> list[Message]:
+    engine = create_engine(f"sqlite:///{db_path}")
+    with Session(engine) as session:
+        messages = session.exec(select(Message).order_by(Message.id)).all()
+    engine.dispose()
+    return messages
+
+
+def parse_sse(body: str) -> list[tuple[str, dict]]:
+    """Split an SSE body into (event, data) pairs."""
+    events = []
+    for frame in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in frame.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_stream_emits_tokens_tools_and_persists(db_path):
+    """Tokens and tool events are streamed, then the reply is saved."""
+    client = TestClient(app)
+    user_id = str(uuid4())
+
+    response = client.post(f"/api/{user_id}/chat/stream", json={"message": "what should I do first?"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = parse_sse(response.text)
+    names = [name for name, _ in events]
+    assert names == ["start", "tool_call", "tool_result", "token", "token", "done"]
+    assert events[1][1] == {"tool_name": "list_tasks", "arguments": {"status": "all"}}
+    assert "".join(data["delta"] for name, data in events if name == "token") == "Hello there"
+    assert events[-1][1]["response"] == "Hello there"
+
+    messages = saved_messages(db_path)
+    assert [(m.role, m.content) for m in messages] == [
+        ("user", "what should I do first?"), ("assistant", "Hello there")
+    ]
+
+
+def test_early_close_cancels_run(db_path):
+    """Closing the stream mid-reply cancels the agent run and saves no reply."""
+    service = ChatService()
+
+    async def consume_first_token():
+        events = service.chat_stream(str(uuid4()), "hi")
+        async for event in events:
+            if event["event"] == "token":
+                break
+        await events.aclose()
+
+    asyncio.run(consume_first_token())
+
+    assert FakeRunner.last_result.cancelled is True
+    assert [m.role for m in saved_messages(db_path)] == ["user"]
@@ -0,0 +1,72 @@
+"""
+Tests for the conversation list endpoint: aggregate message counts and pagination.
+"""
+from datetime import datetime, timedelta, UTC
+from uuid import uuid4
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session
+
+from app.models.conversation import Conversation, Message
+
+
+def seed_conversations(session: Session, user_id, message_counts: list[int]) -> list[Conversation]:
+    """Create one conversation per entry, each with the given number of messages."""
+    base = datetime.now(UTC)
+    conversations = []
+    for i, count in enumerate(message_counts):
+        conv = Conversation(user_id=user_id, title=f"Chat {i}", updated_at=base + timedelta(minutes=i))
+        session.add(conv)
+        session.commit()
+        session.refresh(conv)
+        session.add_all(
+            Message(conversation_id=conv.id, user_id=user_id, role="user", content=f"m{j}")
+            for j in range(count)
+        )
+        session.commit()
+        conversations.append(conv)
+    return conversations
+
+
+def test_message_counts_single_query(client: TestClient, session: Session, async_engine):
+    """Counts are correct and come from one SELECT regardless of conversation count."""
+    user_id = uuid4()
+    seed_conversations(session, user_id, [0, 3, 1])
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    response = client.get(f"/api/{user_id}/conversations")
+    event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    data = response.json()
+    # Most recently updated first
+    assert [c["title"] for c in data["conversations"]] == ["Chat 2", "Chat 1", "Chat 0"]
+    assert [c["message_count"] for c in data["conversations"]] == [1, 3, 0]
+    assert data["next_cursor"] is None
+    assert len(statements) == 1
+
+
+def test_conversation_pagination(client: TestClient, session: Session):
+    """next_cursor walks every conversation exactly once."""
+    user_id = uuid4()
+    created = seed_conversations(session, user_id, [1, 1, 1, 1, 1])
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        data = client.get(f"/api/{user_id}/conversations", params=params).json()
+        seen.extend(c["id"] for c in data["conversations"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == [c.id for c in reversed(created)]
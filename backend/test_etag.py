@@ -0,0 +1,103 @@
+"""
+Tests for ETag / If-None-Match handling on task and conversation reads.
+"""
+from uuid import uuid4
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session
+
+from app.etag import make_etag, etag_matches
+from app.models.conversation import Conversation, Message
+from app.models.task import Task
+
+
+def test_etag_matching():
+    etag = make_etag("tasks", 1)
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"other"', etag)
+
+
+def test_unchanged_task_list_is_304_after_one_query(client: TestClient, session: Session, async_engine):
+    user_id = uuid4()
+    session.add(Task(user_id=user_id, title="Buy milk"))
+    session.commit()
+
+    first = client.get(f"/api/{user_id}/tasks")
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    second = client.get(f"/api/{user_id}/tasks", headers={"If-None-Match": etag})
+    event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["ETag"] == etag
+    assert len(statements) == 1 and "task_change_counters" in statements[0]
+
+
+def test_task_changes_and_pages_change_the_list_etag(client: TestClient, session: Session):
+    user_id = uuid4()
+    task = Task(user_id=user_id, title="Buy milk")
+    session.add(task)
+    session.commit()
+    session.refresh(task)
+    url = f"/api/{user_id}/tasks"
+
+    etag = client.get(url).headers["ETag"]
+    assert client.get(url, params={"limit": 1}).headers["ETag"] != etag
+
+    client.patch(f"{url}/{task.id}/complete")
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()[0]["completed"] is True
+
+    client.delete(f"{url}/{task.id}")
+    after_delete = client.get(url, headers={"If-None-Match": response.headers["ETag"]})
+    assert after_delete.status_code == 200
+    assert after_delete.json() == []
+
+
+def test_task_detail_etag(client: TestClient, session: Session):
+    task = Task(user_id=uuid4(), title="Buy milk")
+    session.add(task)
+    session.commit()
+    session.refresh(task)
+    url = f"/api/{task.user_id}/tasks/{task.id}"
+
+    etag = client.get(url).headers["ETag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    client.put(url, json={"title": "Buy oat milk"})
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["title"] == "Buy oat milk"
+
+
+def test_conversation_detail_etag(client: TestClient, session: Session):
+    user_id = uuid4()
+    conversation = Conversation(user_id=user_id, title="Chat")
+    session.add(conversation)
+    session.commit()
+    session.refresh(conversation)
+    url = f"/api/{user_id}/conversations/{conversation.id}"
+
+    etag = client.get(url).headers["ETag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    session.add(Message(conversation_id=conversation.id, user_id=user_id, role="user", content="hi"))
+    session.commit()
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert [m["content"] for m in response.json()["messages"]] == ["hi"]
+
+    assert client.get(f"/api/{uuid4()}/conversations/{conversation.id}").status_code == 404
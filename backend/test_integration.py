@@ -16,42 +16,13 @@ from datetime import datetime, timedelta, UTC
 from uuid import uuid4
 from fastapi.testclient import TestClient
 from jose import jwt
-from sqlmodel import Session, create_engine, SQLModel, select
-from sqlmodel.pool import StaticPool
+from sqlmodel import Session, select
 
-from app.main import app
-from app.database import get_session
 from app.models.user import User
 from app.models.task import Task
 from app.config import settings
 
 
-# Create in-memory SQLite database for testing
-@pytest.fixture(name="session")
-def session_fixture():
-    """Create a fresh database session for each test."""
-    engine = create_engine(
-        "sqlite:///:memory:",
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-    )
-    SQLModel.metadata.create_all(engine)
-    with Session(engine) as session:
-        yield session
-
-
-@pytest.fixture(name="client")
-def client_fixture(session: Session):
-    """Create a test client with overridden database session."""
-    def get_session_override():
-        return session
-
-    app.dependency_overrides[get_session] = get_session_override
-    client = TestClient(app)
-    yield client
-    app.dependency_overrides.clear()
-
-
 def create_test_user(session: Session, email: str = "test@example.com") -> User:
     """Helper function to create a test user in the database."""
     user = User(
@@ -464,8 +435,8 @@ class TestTaskDeletion:
 
         assert response.status_code == 204
 
-        # Verify task is deleted
-        statement = select(Task).where(Task.id == task_id)
+        # Verify task is deleted (kept as a tombstone for incremental sync)
+        statement = select(Task).where(Task.id == task_id, Task.deleted_at.is_(None))
         deleted_task = session.exec(statement).first()
         assert deleted_task is None
 
@@ -663,6 +634,80 @@ class TestEndToEndFlow:
         assert len(list_response.json()) == 0
 
 
+# Test 8: Bulk Task Operations
+class TestBatchOperations:
+    """Test the single-transaction batch endpoint."""
+
+    def test_batch_create(self, client: TestClient, session: Session):
+        """Many tasks are created in one request, results in request order."""
+        user = create_test_user(session)
+        token = create_jwt_token(str(user.id))
+        headers = {"Authorization": f"Bearer {token}"}
+
+        response = client.post(
+            f"/api/{user.id}/tasks/batch",
+            json={"create": [{"title": f"Task {i}"} for i in range(250)]},
+            headers=headers
+        )
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [r["task"]["title"] for r in results] == [f"Task {i}" for i in range(250)]
+        assert all(r["op"] == "create" and r["status"] == "created" for r in results)
+        assert len(session.exec(select(Task).where(Task.user_id == user.id)).all()) == 250
+
+    def test_batch_mixed_operations_and_ownership(self, client: TestClient, session: Session):
+        """Update, complete and delete apply only to the user's own tasks."""
+        user = create_test_user(session, "batch1@example.com")
+        other = create_test_user(session, "batch2@example.com")
+        mine = [Task(user_id=user.id, title=f"Mine {i}") for i in range(3)]
+        theirs = Task(user_id=other.id, title="Theirs")
+        session.add_all(mine + [theirs])
+        session.commit()
+        for task in mine + [theirs]:
+            session.refresh(task)
+
+        token = create_jwt_token(str(user.id))
+        headers = {"Authorization": f"Bearer {token}"}
+        response = client.post(
+            f"/api/{user.id}/tasks/batch",
+            json={
+                "update": [{"id": mine[0].id, "title": "Renamed"}, {"id": theirs.id, "title": "Hijacked"}],
+                "complete": [mine[1].id, theirs.id],
+                "delete": [mine[2].id, theirs.id],
+            },
+            headers=headers
+        )
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [(r["op"], r["index"], r["status"]) for r in results] == [
+            ("update", 0, "updated"), ("update", 1, "not_found"),
+            ("complete", 0, "completed"), ("complete", 1, "not_found"),
+            ("delete", 0, "deleted"), ("delete", 1, "not_found"),
+        ]
+        assert results[0]["task"]["title"] == "Renamed"
+        assert results[2]["task"]["completed"] is True
+
+        deleted_id, their_id = mine[2].id, theirs.id
+        session.expunge_all()
+        assert session.get(Task, their_id).title == "Theirs"
+        assert session.get(Task, their_id).completed is False
+        assert session.get(Task, deleted_id).deleted_at is not None
+
+    def test_batch_validation_rejects_whole_request(self, client: TestClient, session: Session):
+        """An invalid item fails validation before anything is written."""
+        user = create_test_user(session)
+        token = create_jwt_token(str(user.id))
+        headers = {"Authorization": f"Bearer {token}"}
+
+        response = client.post(
+            f"/api/{user.id}/tasks/batch",
+            json={"create": [{"title": "Fine"}, {"title": ""}]},
+            headers=headers
+        )
+        assert response.status_code == 400
+        assert session.exec(select(Task)).all() == []
+
+
 if __name__ == "__main__":
     # Run tests with pytest
     pytest.main([__file__, "-v", "--tb=short"])
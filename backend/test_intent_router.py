@@ -0,0 +1,108 @@
+"""
+Tests for the deterministic intent fast-path in front of the chat agent.
+"""
+import asyncio
+import pytest
+from uuid import uuid4
+from sqlmodel import Session, create_engine, select
+
+from app.models.task import Task
+from app.services import chat_service
+from app.services.chat_service import ChatService
+from app.services.intent_router import IntentRouter, Intent, intent_requests
+
+
+@pytest.mark.parametrize("message, expected", [
+    ("list my tasks", Intent("list_tasks", {"status": "all"})),
+    ("Show me all pending tasks.", Intent("list_tasks", {"status": "pending"})),
+    ("what are my completed tasks?", Intent("list_tasks", {"status": "completed"})),
+    ("complete task 12", Intent("complete_task", {"task_id": 12})),
+    ("Mark task #3 as done", Intent("complete_task", {"task_id": 3})),
+    ("delete 7", Intent("delete_task", {"task_id": 7})),
+    ("please remove task 7", Intent("delete_task", {"task_id": 7})),
+    ("rename task 4 to Buy Oat Milk", Intent("update_task", {"task_id": 4, "title": "Buy Oat Milk"})),
+    ("add task: Call Mom", Intent("add_task", {"title": "Call Mom"})),
+])
+def test_router_hits(message, expected):
+    assert IntentRouter().match(message) == expected
+
+
+@pytest.mark.parametrize("message", [
+    "hello",
+    "add a task to buy milk tomorrow",
+    "complete tasks 3, 4 and 5",
+    "delete all completed tasks",
+    "what should I focus on today?",
+])
+def test_router_falls_back_to_llm(message):
+    assert IntentRouter().match(message) is None
+
+
+def test_router_counts_hits_and_misses():
+    router = IntentRouter()
+    hits = intent_requests.value(outcome="hit", intent="delete_task")
+    misses = intent_requests.value(outcome="miss", intent="none")
+    router.match("delete 1")
+    router.match("tell me a joke")
+    assert intent_requests.value(outcome="hit", intent="delete_task") == hits + 1
+    assert intent_requests.value(outcome="miss", intent="none") == misses + 1
+
+
+class ExplodingRunner:
+    """Fails the test if the LLM agent is invoked."""
+
+    @staticmethod
+    async def run(*args, **kwargs):
+        raise AssertionError("LLM should not be called for a fast-path command")
+
+
+@pytest.fixture(name="service")
+def service_fixture(async_engine, monkeypatch) -> ChatService:
+    """ChatService on the test database that fails the test if the LLM is called."""
+    monkeypatch.setattr(chat_service, "Runner", ExplodingRunner)
+    return ChatService()
+
+
+def test_fast_path_completes_task_without_llm(service, db_path):
+    """'complete task N' runs the action directly and records the tool call."""
+    user_id = uuid4()
+    engine = create_engine(f"sqlite:///{db_path}")
+    with Session(engine) as session:
+        task = Task(user_id=user_id, title="Buy milk")
+        session.add(task)
+        session.commit()
+        session.refresh(task)
+        task_id = task.id
+
+    result = asyncio.run(service.chat_async(str(user_id), f"complete task {task_id}"))
+
+    assert result["response"] == "Task 'Buy milk' marked as complete!"
+    assert result["tool_calls"][0]["tool_name"] == "complete_task"
+    with Session(engine) as session:
+        assert session.exec(select(Task)).one().completed is True
+    engine.dispose()
+
+
+def test_fast_path_lists_tasks(service):
+    result = asyncio.run(service.chat_async(str(uuid4()), "list my tasks"))
+    assert result["response"] == "You have no tasks."
+
+
+def test_fast_path_list_is_capped_and_skips_the_context(service, db_path, monkeypatch):
+    user_id = uuid4()
+    engine = create_engine(f"sqlite:///{db_path}")
+    with Session(engine) as session:
+        session.add_all([Task(user_id=user_id, title=f"Task {i}") for i in range(5)])
+        session.commit()
+    engine.dispose()
+    monkeypatch.setattr(chat_service.settings, "chat_tool_output_max_tasks", 3)
+
+    async def build(*args):
+        raise AssertionError("fast-path turns need no prompt")
+
+    monkeypatch.setattr(service.context_builder, "build", build)
+    result = asyncio.run(service.chat_async(str(user_id), "list my tasks"))
+
+    lines = result["response"].splitlines()
+    assert lines[0] == "You have 5 task(s):"
+    assert len(lines) == 5 and lines[-1] == "…and 2 more"
@@ -0,0 +1,109 @@
+"""
+Tests for the LLM provider pool, using the offline fake provider.
+"""
+import asyncio
+import time
+import pytest
+from agents import Agent, Runner, set_tracing_disabled
+
+from app.services.llm_pool import (
+    AllProvidersFailed, CircuitBreaker, FakeModel, Provider, ProviderPool, create_provider_pool
+)
+
+set_tracing_disabled(disabled=True)
+
+
+def provider(name: str, model: FakeModel, timeout: float = 5.0, max_concurrency: int = 4,
+             breaker: CircuitBreaker | None = None) -> Provider:
+    return Provider(name=name, model=model, max_concurrency=max_concurrency, timeout_seconds=timeout,
+                    breaker=breaker or CircuitBreaker(failure_threshold=3, reset_seconds=30))
+
+
+def reply(pool: ProviderPool, message: str = "hello") -> str:
+    result = asyncio.run(Runner.run(Agent(name="Test", instructions="Be brief.", model=pool), input=message))
+    return result.final_output
+
+
+def test_failed_or_timed_out_provider_fails_over():
+    failing = FakeModel(fail=True)
+    slow = FakeModel(reply="slow", delay=1.0)
+    fallback = FakeModel(reply="fallback")
+
+    assert reply(ProviderPool([provider("a", failing), provider("b", fallback)])) == "fallback"
+    pool = ProviderPool([provider("a", slow, timeout=0.05), provider("b", fallback)], hedge_enabled=False)
+    assert reply(pool) == "fallback"
+
+    with pytest.raises(AllProvidersFailed):
+        reply(ProviderPool([provider("a", FakeModel(fail=True)), provider("b", FakeModel(fail=True))]))
+
+
+def test_slow_request_is_hedged_to_the_next_provider():
+    slow, fast = FakeModel(reply="slow", delay=0.5), FakeModel(reply="fast")
+    pool = ProviderPool([provider("a", slow), provider("b", fast)], hedge_min_seconds=0.05)
+
+    started = time.perf_counter()
+    assert reply(pool) == "fast"
+    assert time.perf_counter() - started < 0.4
+    assert slow.calls == 1 and fast.calls == 1
+
+
+def test_hedge_waits_for_the_providers_p95():
+    primary, fallback = FakeModel(reply="primary", delay=0.1), FakeModel(reply="fallback")
+    a = provider("a", primary)
+    a.latencies.extend([0.3] * 20)
+    pool = ProviderPool([a, provider("b", fallback)], hedge_min_seconds=0.01)
+
+    assert reply(pool) == "primary"
+    assert fallback.calls == 0
+
+
+def test_circuit_breaker_skips_a_failing_provider_until_reset():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=10, clock=lambda: now[0])
+    primary, fallback = FakeModel(reply="primary", fail=True), FakeModel(reply="fallback")
+    pool = ProviderPool([provider("a", primary, breaker=breaker), provider("b", fallback)])
+
+    for _ in range(3):
+        assert reply(pool) == "fallback"
+    assert primary.calls == 2 and breaker.state == "open"
+
+    # After the reset period one probe goes through; success closes the breaker
+    now[0] = 11
+    primary.fail = False
+    assert breaker.state == "half_open"
+    assert reply(pool) == "primary"
+    assert breaker.state == "closed" and primary.calls == 3
+
+
+def test_saturated_provider_is_tried_last():
+    primary, fallback = FakeModel(reply="primary", delay=0.2), FakeModel(reply="fallback")
+    pool = ProviderPool([provider("a", primary, max_concurrency=1), provider("b", fallback)],
+                        hedge_enabled=False)
+    agent = Agent(name="Test", instructions="Be brief.", model=pool)
+
+    async def run():
+        return await asyncio.gather(Runner.run(agent, input="one"), Runner.run(agent, input="two"))
+
+    assert sorted(result.final_output for result in asyncio.run(run())) == ["fallback", "primary"]
+
+
+def test_stream_fails_over_before_the_first_event():
+    pool = create_provider_pool(
+        "fake", None, ["fake/backup"], max_concurrency=4, timeout_seconds=5, hedge_enabled=True,
+        hedge_min_seconds=2, breaker_failures=3, breaker_reset_seconds=30,
+    )
+    pool.providers[0].model.fail = True
+    agent = Agent(name="Test", instructions="Be brief.", model=pool)
+
+    async def run():
+        result = Runner.run_streamed(agent, input="stream me")
+        deltas = [
+            event.data.delta async for event in result.stream_events()
+            if event.type == "raw_response_event" and event.data.type == "response.output_text.delta"
+        ]
+        return deltas, result.final_output
+
+    deltas, final_output = asyncio.run(run())
+    assert final_output == "(fake) stream me" and deltas == [final_output]
+    assert [p.name for p in pool.providers] == ["fake", "fake/backup"]
+    assert pool.providers[0].breaker.failures == 1
@@ -0,0 +1,208 @@
+"""
+Tests for write-behind persistence of chat messages.
+"""
+import asyncio
+import pytest
+from types import SimpleNamespace
+from uuid import uuid4
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel import Session, create_engine, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.conversation import Conversation, Message
+from app.services import chat_service
+from app.services.chat_service import ChatService
+from app.services.message_writer import MessageWriter
+
+
+@pytest.fixture(name="commits")
+def commits_fixture(async_engine) -> list:
+    """One entry per transaction committed through the async engine."""
+    commits = []
+
+    def record(conn):
+        commits.append(conn)
+
+    event.listen(async_engine.sync_engine, "commit", record)
+    yield commits
+    event.remove(async_engine.sync_engine, "commit", record)
+
+
+@pytest.fixture(name="writer")
+def writer_fixture(async_engine, monkeypatch) -> MessageWriter:
+    """A writer whose loop never fires on its own during a test; tests flush explicitly."""
+    writer = MessageWriter(async_engine, flush_interval_seconds=3600, max_pending=100)
+    monkeypatch.setattr(chat_service, "message_writer", writer)
+    return writer
+
+
+class EchoRunner:
+    open_connections: list = [0]
+    checked_out: list = []
+
+    @classmethod
+    async def run(cls, agent, input, context=None):
+        cls.checked_out.append(cls.open_connections[0])
+        return SimpleNamespace(final_output=f"echo: {input.splitlines()[-1]}", new_items=[])
+
+
+@pytest.fixture(autouse=True)
+def count_checkouts(async_engine, monkeypatch):
+    """Count connections checked out of the engine's pool while the agent runs."""
+    open_connections = [0]
+
+    def checkout(*args):
+        open_connections[0] += 1
+
+    def checkin(*args):
+        open_connections[0] -= 1
+
+    event.listen(async_engine.sync_engine, "checkout", checkout)
+    event.listen(async_engine.sync_engine, "checkin", checkin)
+    monkeypatch.setattr(EchoRunner, "open_connections", open_connections)
+    monkeypatch.setattr(EchoRunner, "checked_out", [])
+    yield
+    event.remove(async_engine.sync_engine, "checkout", checkout)
+    event.remove(async_engine.sync_engine, "checkin", checkin)
+
+
+@pytest.fixture(name="service")
+def service_fixture(monkeypatch) -> ChatService:
+    monkeypatch.setattr(chat_service, "Runner", EchoRunner)
+    monkeypatch.setattr(chat_service.settings, "chat_intent_router_enabled", False)
+    monkeypatch.setattr(chat_service.settings, "chat_cache_enabled", False)
+    return ChatService()
+
+
+def stored_messages(db_path) -> list[Message]:
+    engine = create_engine(f"sqlite:///{db_path}")
+    with Session(engine) as session:
+        messages = session.exec(select(Message).order_by(Message.id)).all()
+    engine.dispose()
+    return messages
+
+
+def test_turn_writes_are_buffered_and_read_back(service, writer, commits, db_path):
+    user_id = str(uuid4())
+
+    async def run():
+        await writer.start()
+        try:
+            reply = await service.chat_async(user_id, "hello")
+            # Creating the conversation and ending the read transaction
+            # committed; both messages are buffered
+            assert len(commits) == 2 and writer.pending == 2
+            assert stored_messages(db_path) == []
+
+            conversation = await service.get_conversation_messages(user_id, reply["conversation_id"])
+            return reply, conversation
+        finally:
+            await writer.stop()
+
+    reply, conversation = asyncio.run(run())
+
+    # The request held no connection while the agent ran
+    assert EchoRunner.checked_out == [0]
+    assert [m["role"] for m in conversation["messages"]] == ["user", "assistant"]
+    assert conversation["messages"][1]["content"] == reply["response"]
+    assert len(commits) == 3
+    assert [m.content for m in stored_messages(db_path)] == ["hello", reply["response"]]
+
+
+def test_turns_of_many_requests_flush_in_one_transaction(service, writer, commits, db_path):
+    users = [str(uuid4()) for _ in range(5)]
+
+    async def run():
+        await writer.start()
+        try:
+            replies = await asyncio.gather(*(service.chat_async(user, "hi") for user in users))
+            before = len(commits)
+            assert await writer.flush() == 10
+            assert len(commits) == before + 1
+            # A later turn of a conversation sees the earlier turn in its history
+            follow_up = await service.chat_async(users[0], "again", replies[0]["conversation_id"])
+            return replies, follow_up
+        finally:
+            await writer.stop()
+
+    replies, follow_up = asyncio.run(run())
+
+    assert len(stored_messages(db_path)) == 12
+    assert follow_up["conversation_id"] == replies[0]["conversation_id"]
+    conversations, _ = asyncio.run(service.get_conversations(users[0]))
+    assert conversations[0]["message_count"] == 4
+
+
+def test_full_buffer_flushes_inline(async_engine, db_path):
+    writer = MessageWriter(async_engine, flush_interval_seconds=3600, max_pending=2)
+    user_id = uuid4()
+
+    async def run():
+        await writer.start()
+        try:
+            async with AsyncSession(async_engine) as session:
+                for i in range(3):
+                    await writer.add_message(session, Message(
+                        conversation_id=1, user_id=user_id, role="user", content=f"m{i}"
+                    ))
+            assert writer.pending == 1
+        finally:
+            await writer.stop()
+
+    asyncio.run(run())
+    assert [m.content for m in stored_messages(db_path)] == ["m0", "m1", "m2"]
+
+
+def test_failed_flush_keeps_writes(tmp_path, db_path):
+    broken = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'empty.db'}", poolclass=NullPool)
+    writer = MessageWriter(broken, flush_interval_seconds=3600, max_pending=100, max_retries=1)
+    user_id = uuid4()
+    conversation = Conversation(id=1, user_id=user_id)
+
+    async def run():
+        await writer.start()
+        async with AsyncSession(broken) as session:
+            await writer.add_message(session, Message(
+                conversation_id=1, user_id=user_id, role="user", content="kept"
+            ))
+            await writer.touch_conversation(session, conversation, conversation.created_at)
+        # Past max_retries too: an unusable database is not the rows' fault
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                await writer.flush()
+            assert writer.pending == 1
+
+        writer.engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+        await writer.stop()
+
+    asyncio.run(run())
+    assert [m.content for m in stored_messages(db_path)] == ["kept"]
+
+
+def test_rejected_message_is_dropped_after_retries(async_engine, db_path):
+    writer = MessageWriter(async_engine, flush_interval_seconds=3600, max_pending=100, max_retries=2)
+    user_id = uuid4()
+
+    async def run():
+        await writer.start()
+        try:
+            async with AsyncSession(async_engine) as session:
+                for content in ("before", None, "after"):
+                    await writer.add_message(session, Message(
+                        conversation_id=1, user_id=user_id, role="user", content=content
+                    ))
+            for _ in range(2):
+                with pytest.raises(IntegrityError):
+                    await writer.flush()
+                assert writer.pending == 3
+            # Written one by one: the NULL content is dropped, the others kept
+            assert await writer.flush() == 2
+            assert writer.pending == 0
+        finally:
+            await writer.stop()
+
+    asyncio.run(run())
+    assert [m.content for m in stored_messages(db_path)] == ["before", "after"]
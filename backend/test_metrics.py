@@ -0,0 +1,111 @@
+"""
+Tests for the metrics registry, pool configuration and the /metrics endpoint.
+"""
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.main import app
+from app.config import settings
+from app.database import (
+    TimedAsyncAdaptedQueuePool, TimedQueuePool, engine_options, get_async_session,
+    pool_checkout_wait, to_async_url, wrap_connect_errors
+)
+from app.metrics import MetricsRegistry
+
+client = TestClient(app)
+
+
+def test_counter_and_histogram_render():
+    """Counters and histograms render in the Prometheus text format."""
+    registry = MetricsRegistry()
+    hits = registry.counter("cache_hits_total", "Cache hits")
+    hits.inc(kind="user")
+    hits.inc(2, kind="user")
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5.0)
+
+    text = registry.render()
+    assert 'cache_hits_total{kind="user"} 3' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "latency_seconds_count 3" in text
+    assert hits.value(kind="user") == 3
+    assert latency.count() == 3
+
+
+def test_pool_options_for_postgres(monkeypatch):
+    """Pool sizing and statement timeout come from settings for Postgres."""
+    monkeypatch.setattr(settings, "db_pool_size", 20)
+    monkeypatch.setattr(settings, "db_max_overflow", 5)
+    monkeypatch.setattr(settings, "db_statement_timeout_ms", 3000)
+
+    sync_options = engine_options("postgresql://u:p@localhost/db")
+    assert sync_options["pool_size"] == 20
+    assert sync_options["max_overflow"] == 5
+    assert sync_options["connect_args"] == {"options": "-c statement_timeout=3000"}
+
+    async_options = engine_options("postgresql://u:p@localhost/db", is_async=True)
+    assert async_options["connect_args"] == {"server_settings": {"statement_timeout": "3000"}}
+    assert (sync_options["poolclass"], async_options["poolclass"]) == (TimedQueuePool, TimedAsyncAdaptedQueuePool)
+
+
+def test_pool_times_checkouts(tmp_path):
+    """The timed pool records checkout wait; a session that never queries checks nothing out."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+                                 poolclass=TimedAsyncAdaptedQueuePool)
+    before = pool_checkout_wait.count(engine="async")
+
+    async def run():
+        dependency = get_async_session()
+        await anext(dependency)  # the app's engine is never connected to
+        await dependency.aclose()
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        await engine.dispose()
+
+    asyncio.run(run())
+    assert pool_checkout_wait.count(engine="async") == before + 1
+
+
+def test_pool_options_skipped_for_sqlite():
+    """SQLite engines keep the driver's default pool."""
+    options = engine_options("sqlite:///./todo.db")
+    assert "pool_size" not in options
+    assert "connect_args" not in options
+
+
+def test_async_url_translates_ssl_params():
+    """libpq-only query parameters are translated for asyncpg."""
+    url = to_async_url("postgresql://u:p@host/db?sslmode=require&channel_binding=require")
+    assert url == "postgresql+asyncpg://u:p@host/db?ssl=require"
+    assert to_async_url("sqlite:///./todo.db") == "sqlite+aiosqlite:///./todo.db"
+
+
+def test_metrics_endpoint():
+    """GET /metrics exposes pool metrics as plain text."""
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "db_pool_checkout_wait_seconds" in response.text
+    assert "db_pool_checkouts_total" in response.text
+
+
+
+def test_unreachable_database_is_a_database_error():
+    """A refused async connection surfaces as SQLAlchemy's OperationalError."""
+    engine = create_async_engine("postgresql+asyncpg://u:p@127.0.0.1:1/db")
+    wrap_connect_errors(engine.sync_engine)
+
+    async def run():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    with pytest.raises(OperationalError):
+        asyncio.run(run())
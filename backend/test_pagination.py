@@ -0,0 +1,80 @@
+"""
+Tests for keyset (cursor) pagination of the task list endpoint.
+"""
+from uuid import uuid4
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.config import settings
+from app.models.task import Task
+from app.pagination import encode_cursor, decode_cursor
+
+
+def create_tasks(session: Session, user_id, count: int) -> list[Task]:
+    """Insert `count` tasks for a user and return them in creation order."""
+    tasks = [Task(user_id=user_id, title=f"Task {i}") for i in range(count)]
+    session.add_all(tasks)
+    session.commit()
+    for task in tasks:
+        session.refresh(task)
+    return tasks
+
+
+def test_cursor_round_trip():
+    """Cursors decode back to the keyset position they were built from."""
+    task = Task(id=42, user_id=uuid4(), title="x")
+    cursor = encode_cursor(task.created_at, task.id)
+    assert decode_cursor(cursor) == (task.created_at, 42)
+
+
+def test_walks_all_pages_without_duplicates(client: TestClient, session: Session):
+    """Following X-Next-Cursor visits every task exactly once, in order."""
+    user_id = uuid4()
+    created = create_tasks(session, user_id, 7)
+
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(f"/api/{user_id}/tasks", params=params)
+        assert response.status_code == 200
+        seen.extend(t["id"] for t in response.json())
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert seen == [t.id for t in created]
+
+
+def test_page_size_is_capped(client: TestClient, session: Session, monkeypatch):
+    """Requested page sizes above the configured maximum are clamped."""
+    monkeypatch.setattr(settings, "page_size_max", 2)
+    user_id = uuid4()
+    create_tasks(session, user_id, 5)
+
+    response = client.get(f"/api/{user_id}/tasks", params={"limit": 100})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    assert "X-Next-Cursor" in response.headers
+
+
+def test_last_page_has_no_cursor(client: TestClient, session: Session):
+    """The final page omits the continuation header."""
+    user_id = uuid4()
+    create_tasks(session, user_id, 2)
+
+    response = client.get(f"/api/{user_id}/tasks")
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_invalid_cursor_rejected(client: TestClient):
+    """Garbage cursors produce a 400 instead of a server error."""
+    response = client.get(f"/api/{uuid4()}/tasks", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
@@ -0,0 +1,166 @@
+"""
+Tests for the cache backends and the chat response cache.
+"""
+import asyncio
+import pytest
+from types import SimpleNamespace
+from uuid import uuid4
+from sqlmodel import Session, create_engine
+
+from app.cache import InMemoryCache, RedisCache, create_cache_backend
+from app.services import chat_service
+from app.services.chat_service import ChatService
+from app.services.response_cache import ResponseCache
+from app.models.task import Task, TaskChangeCounter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_in_memory_cache_ttl():
+    clock = FakeClock()
+    cache = InMemoryCache(clock=clock)
+    cache.set_sync("a", "1", ttl=10)
+    assert cache.get_sync("a") == "1"
+    clock.now = 10
+    assert cache.get_sync("a") is None
+    assert len(cache) == 0
+
+
+def test_in_memory_cache_evicts_least_recently_used():
+    cache = InMemoryCache(max_entries=2)
+    cache.set_sync("a", "1")
+    cache.set_sync("b", "2")
+    cache.get_sync("a")
+    cache.set_sync("c", "3")
+    assert cache.get_sync("b") is None
+    assert cache.get_sync("a") == "1"
+    assert cache.get_sync("c") == "3"
+
+
+class FakeRedis:
+    """Minimal async stand-in for a redis.asyncio client."""
+
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, px=None):
+        self.data[key] = value
+        self.expiry[key] = px
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+
+def test_redis_cache_prefixes_keys_and_sets_ttl():
+    client = FakeRedis()
+    cache = RedisCache(client=client)
+
+    async def scenario():
+        await cache.set("k", "v", ttl=1.5)
+        return await cache.get("k")
+
+    assert asyncio.run(scenario()) == "v"
+    assert client.expiry["todo:k"] == 1500
+
+
+def test_create_cache_backend_rejects_unknown_scheme():
+    assert isinstance(create_cache_backend("memory://"), InMemoryCache)
+    with pytest.raises(ValueError):
+        create_cache_backend("memcached://localhost")
+
+
+def test_key_ignores_case_and_whitespace_but_not_version():
+    cache = ResponseCache(InMemoryCache(), ttl=60)
+    user_id = str(uuid4())
+    key = cache.make_key(user_id, "What should I do?", 1)
+    assert cache.make_key(user_id, "  what should   i do ", 1) == key
+    assert cache.make_key(user_id, "What should I do?", 2) != key
+    assert cache.make_key(str(uuid4()), "What should I do?", 1) != key
+
+
+def test_only_read_only_replies_are_cacheable():
+    assert ResponseCache.is_cacheable([])
+    assert ResponseCache.is_cacheable([{"tool_name": "list_tasks"}, {"tool_name": "search_tasks"}])
+    assert not ResponseCache.is_cacheable([{"tool_name": "list_tasks"}, {"tool_name": "add_task"}])
+
+
+class CountingRunner:
+    """Fake agents.Runner returning a canned reply and counting calls."""
+    calls = 0
+    tool_name = "list_tasks"
+
+    @classmethod
+    async def run(cls, agent, input, context=None):
+        cls.calls += 1
+        call = SimpleNamespace(type="function_call", name=cls.tool_name, arguments="{}")
+        return SimpleNamespace(
+            final_output=f"Reply {cls.calls}", new_items=[SimpleNamespace(raw_item=call)]
+        )
+
+
+@pytest.fixture(name="service")
+def service_fixture(async_engine, monkeypatch):
+    """ChatService on the test database with a counting fake runner and a private cache."""
+    monkeypatch.setattr(CountingRunner, "calls", 0)
+    monkeypatch.setattr(CountingRunner, "tool_name", "list_tasks")
+    monkeypatch.setattr(chat_service, "Runner", CountingRunner)
+    service = ChatService()
+    service.response_cache = ResponseCache(InMemoryCache(), ttl=60)
+    return service
+
+
+def ask_new_conversation(service: ChatService, user_id: str, message: str) -> dict:
+    return asyncio.run(service.chat_async(user_id, message))
+
+
+def test_repeated_prompt_is_served_from_cache(service):
+    user_id = str(uuid4())
+    first = ask_new_conversation(service, user_id, "What should I focus on?")
+    second = ask_new_conversation(service, user_id, "what should I focus on")
+    assert CountingRunner.calls == 1
+    assert second["response"] == first["response"] == "Reply 1"
+    assert second["conversation_id"] != first["conversation_id"]
+
+
+def test_task_change_invalidates_cached_reply(service):
+    user_id = str(uuid4())
+    ask_new_conversation(service, user_id, "What should I focus on?")
+    asyncio.run(chat_service.create_task_action(user_id, "Something new"))
+    result = ask_new_conversation(service, user_id, "What should I focus on?")
+    assert CountingRunner.calls == 2
+    assert result["response"] == "Reply 2"
+
+
+def test_task_change_by_another_worker_invalidates_cached_reply(service, db_path):
+    user_id = uuid4()
+    ask_new_conversation(service, str(user_id), "What should I focus on?")
+
+    # Another process writes a task and takes the user's next change number
+    engine = create_engine(f"sqlite:///{db_path}")
+    with Session(engine) as session:
+        session.add(Task(user_id=user_id, title="From elsewhere", change_seq=1))
+        session.add(TaskChangeCounter(user_id=user_id, seq=1, purged_seq=0))
+        session.commit()
+    engine.dispose()
+
+    result = ask_new_conversation(service, str(user_id), "What should I focus on?")
+    assert CountingRunner.calls == 2
+    assert result["response"] == "Reply 2"
+
+
+def test_replies_that_mutate_tasks_are_not_cached(service):
+    CountingRunner.tool_name = "add_task"
+    user_id = str(uuid4())
+    ask_new_conversation(service, user_id, "Add something useful")
+    ask_new_conversation(service, user_id, "Add something useful")
+    assert CountingRunner.calls == 2
@@ -0,0 +1,201 @@
+"""
+Tests for incremental sync: the change feed, soft-delete tombstones, the
+per-user change sequence and tombstone compaction.
+"""
+import asyncio
+from datetime import timedelta
+from uuid import uuid4
+from fastapi.testclient import TestClient
+from sqlalchemy import inspect, text
+from sqlmodel import create_engine, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database import add_missing_columns
+from app.models.task import Task, TaskChangeCounter, utc_now
+from app.services import chat_service
+from app.services.task_sync import compact_tombstones
+
+
+def changes(client: TestClient, user_id, since=None, **params) -> dict:
+    if since is not None:
+        params["since"] = since
+    response = client.get(f"/api/{user_id}/tasks/changes", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def compact(async_engine, older_than) -> int:
+    async def run():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            return await compact_tombstones(session, older_than)
+    return asyncio.run(run())
+
+
+def test_first_sync_is_a_paginated_snapshot(client: TestClient):
+    user_id = uuid4()
+    for i in range(5):
+        client.post(f"/api/{user_id}/tasks", json={"title": f"Task {i}"})
+    client.delete(f"/api/{user_id}/tasks/1")
+
+    seen, deleted, cursor = [], [], None
+    page = changes(client, user_id, limit=2)
+    assert page["reset"] is True
+    assert not any(change["deleted"] for change in page["changes"])
+    while True:
+        seen += [change["task"]["title"] for change in page["changes"] if not change["deleted"]]
+        deleted += [change["id"] for change in page["changes"] if change["deleted"]]
+        cursor = page["cursor"]
+        if not page["has_more"]:
+            break
+        page = changes(client, user_id, cursor, limit=2)
+        assert page["reset"] is False
+
+    assert seen == ["Task 1", "Task 2", "Task 3", "Task 4"]
+    # Every page of the snapshot holds live tasks only
+    assert deleted == []
+    assert changes(client, user_id, cursor) == {
+        "changes": [], "cursor": cursor, "has_more": False, "reset": False
+    }
+
+
+def test_delta_returns_each_changed_task_once_with_tombstones(client: TestClient):
+    user_id = uuid4()
+    ids = [client.post(f"/api/{user_id}/tasks", json={"title": f"Task {i}"}).json()["id"] for i in range(3)]
+    cursor = changes(client, user_id)["cursor"]
+
+    client.put(f"/api/{user_id}/tasks/{ids[0]}", json={"title": "Renamed"})
+    client.patch(f"/api/{user_id}/tasks/{ids[0]}/complete")
+    client.delete(f"/api/{user_id}/tasks/{ids[1]}")
+    new_id = client.post(f"/api/{user_id}/tasks", json={"title": "New"}).json()["id"]
+    client.post(f"/api/{uuid4()}/tasks", json={"title": "Someone else's"})
+
+    delta = changes(client, user_id, cursor)
+    assert delta["reset"] is False and delta["has_more"] is False
+    by_id = {change["id"]: change for change in delta["changes"]}
+    assert list(by_id) == [ids[0], ids[1], new_id]
+    assert by_id[ids[0]]["task"]["title"] == "Renamed"
+    assert by_id[ids[0]]["task"]["completed"] is True
+    assert by_id[ids[1]]["deleted"] is True and by_id[ids[1]]["task"] is None
+    assert by_id[ids[1]]["deleted_at"] is not None
+
+    seqs = [change["seq"] for change in delta["changes"]]
+    assert seqs == sorted(seqs) and len(set(seqs)) == 3
+
+
+def test_deleted_tasks_are_hidden_everywhere(client: TestClient):
+    user_id = uuid4()
+    task_id = client.post(f"/api/{user_id}/tasks", json={"title": "Buy milk"}).json()["id"]
+    client.post(f"/api/{user_id}/tasks", json={"title": "Pay rent"})
+    assert client.delete(f"/api/{user_id}/tasks/{task_id}").status_code == 204
+
+    assert [task["title"] for task in client.get(f"/api/{user_id}/tasks").json()] == ["Pay rent"]
+    assert client.get(f"/api/{user_id}/tasks/{task_id}").status_code == 404
+    assert client.put(f"/api/{user_id}/tasks/{task_id}", json={"title": "x"}).status_code == 404
+    assert client.patch(f"/api/{user_id}/tasks/{task_id}/complete").status_code == 404
+    assert client.get(f"/api/{user_id}/tasks/search", params={"q": "milk"}).json()["results"] == []
+
+    batch = client.post(f"/api/{user_id}/tasks/batch", json={"complete": [task_id], "delete": [task_id]})
+    assert [result["status"] for result in batch.json()["results"]] == ["not_found", "not_found"]
+
+    listed = asyncio.run(chat_service.list_tasks_action(str(user_id)))
+    assert [task["title"] for task in listed["tasks"]] == ["Pay rent"]
+
+
+def test_change_sequence_is_per_user_and_shared_by_a_batch(client: TestClient, session):
+    user_id, other_id = uuid4(), uuid4()
+    client.post(f"/api/{other_id}/tasks", json={"title": "Other"})
+    first = client.post(f"/api/{user_id}/tasks", json={"title": "First"}).json()["id"]
+    client.post(f"/api/{user_id}/tasks/batch", json={
+        "create": [{"title": "A"}, {"title": "B"}], "complete": [first]
+    })
+    asyncio.run(chat_service.create_task_action(str(user_id), "From chat"))
+
+    seqs = {task.title: task.change_seq for task in session.exec(select(Task).where(Task.user_id == user_id))}
+    assert seqs == {"First": 2, "A": 2, "B": 2, "From chat": 3}
+    counters = {row.user_id: row.seq for row in session.exec(select(TaskChangeCounter))}
+    assert counters == {other_id: 1, user_id: 3}
+
+
+def test_compaction_purges_old_tombstones_and_resets_stale_cursors(client: TestClient, session, async_engine):
+    user_id = uuid4()
+    ids = [client.post(f"/api/{user_id}/tasks", json={"title": f"Task {i}"}).json()["id"] for i in range(3)]
+    stale = changes(client, user_id)["cursor"]
+
+    client.delete(f"/api/{user_id}/tasks/{ids[0]}")
+    client.delete(f"/api/{user_id}/tasks/{ids[1]}")
+    session.exec(text("UPDATE tasks SET deleted_at = :old WHERE id = :id").bindparams(
+        old=utc_now() - timedelta(days=60), id=ids[0]
+    ))
+    session.commit()
+
+    assert compact(async_engine, utc_now() - timedelta(days=30)) == 1
+    assert compact(async_engine, utc_now() - timedelta(days=30)) == 0
+    assert session.get(Task, ids[0]) is None
+    assert session.get(Task, ids[1]).deleted_at is not None
+
+    # The stale cursor may have missed the purged delete: full resync
+    page = changes(client, user_id, stale)
+    assert page["reset"] is True
+    assert [change["task"]["title"] for change in page["changes"]] == ["Task 2"]
+
+    # A cursor taken after the purge keeps syncing incrementally
+    client.put(f"/api/{user_id}/tasks/{ids[2]}", json={"title": "Renamed"})
+    delta = changes(client, user_id, page["cursor"])
+    assert delta["reset"] is False
+    assert [change["id"] for change in delta["changes"]] == [ids[2]]
+
+
+def test_snapshot_after_compaction_pages_through_to_the_end(client: TestClient, session, async_engine):
+    user_id = uuid4()
+    ids = [client.post(f"/api/{user_id}/tasks", json={"title": f"Task {i}"}).json()["id"] for i in range(6)]
+    for task_id in ids[:3]:
+        client.delete(f"/api/{user_id}/tasks/{task_id}")
+    session.exec(text("UPDATE tasks SET deleted_at = :old WHERE id = :id").bindparams(
+        old=utc_now() - timedelta(days=60), id=ids[0]
+    ))
+    session.commit()
+    assert compact(async_engine, utc_now() - timedelta(days=30)) == 1
+
+    page = changes(client, user_id, limit=1)
+    assert page["reset"] is True
+    pages = [page]
+    while page["has_more"]:
+        page = changes(client, user_id, page["cursor"], limit=1)
+        pages.append(page)
+        assert len(pages) <= 4, "snapshot did not finish"
+
+    assert [page["reset"] for page in pages] == [True, False, False]
+    assert [change["id"] for page in pages for change in page["changes"]] == ids[3:]
+    assert not any(change["deleted"] for page in pages for change in page["changes"])
+
+    # The feed then carries on incrementally, tombstones included
+    client.delete(f"/api/{user_id}/tasks/{ids[3]}")
+    delta = changes(client, user_id, page["cursor"])
+    assert delta["reset"] is False
+    assert [(change["id"], change["deleted"]) for change in delta["changes"]] == [(ids[3], True)]
+
+
+def test_invalid_cursor_rejected(client: TestClient):
+    assert client.get(f"/api/{uuid4()}/tasks/changes", params={"since": "not-a-cursor"}).status_code == 400
+    assert client.get("/api/not-a-uuid/tasks/changes").status_code == 404
+
+
+def test_missing_columns_added_to_existing_tasks_table(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE tasks (id INTEGER PRIMARY KEY, user_id CHAR(32) NOT NULL, "
+            "title VARCHAR(200) NOT NULL, description VARCHAR, completed BOOLEAN NOT NULL, "
+            "created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL)"
+        ))
+        conn.execute(text(
+            "INSERT INTO tasks (user_id, title, completed, created_at, updated_at) "
+            "VALUES ('00000000000000000000000000000001', 'Old', 0, '2025-01-01', '2025-01-01')"
+        ))
+        add_missing_columns(conn)
+        add_missing_columns(conn)  # idempotent
+
+        columns = {column["name"] for column in inspect(conn).get_columns("tasks")}
+        assert {"change_seq", "deleted_at"} <= columns
+        assert conn.execute(text("SELECT change_seq, deleted_at FROM tasks")).one() == (0, None)
+    engine.dispose()
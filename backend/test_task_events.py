@@ -0,0 +1,158 @@
+"""
+Tests for the per-user task change feed (in-process broker, SSE endpoint).
+"""
+import asyncio
+import json
+import pytest
+from types import SimpleNamespace
+from uuid import uuid4
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.main import app
+from app.routes.tasks import task_event_stream
+from app.services import chat_service
+from app.services.task_events import TaskEventBroker, task_event, task_events
+
+
+@pytest.fixture(name="published")
+def published_fixture(monkeypatch) -> list:
+    """Record (user_id, events) for every publish call."""
+    published = []
+
+    async def record(session, user_id, events):
+        if events:
+            published.append((str(user_id), events))
+
+    monkeypatch.setattr(task_events, "publish", record)
+    return published
+
+
+async def publish_in_transaction(broker: TaskEventBroker, user_id, events: list, commit: bool = True) -> None:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with AsyncSession(engine) as session:
+        await broker.publish(session, user_id, events)
+        if commit:
+            await session.commit()
+    await engine.dispose()
+
+
+def test_broker_delivers_only_to_the_users_streams():
+    broker = TaskEventBroker("task_events", queue_size=10, use_notify=False)
+    alice, bob = uuid4(), uuid4()
+
+    async def scenario():
+        async with broker.subscribe(alice) as alice_queue, broker.subscribe(bob) as bob_queue:
+            await publish_in_transaction(broker, str(alice).upper(), [task_event("deleted", task_id=1)])
+            assert bob_queue.empty()
+            return await alice_queue.get()
+
+    assert asyncio.run(scenario()) == {"type": "deleted", "task_id": 1, "task": None}
+    assert broker.subscriber_count(alice) == 0
+
+
+def test_events_of_a_rolled_back_change_are_dropped():
+    broker = TaskEventBroker("task_events", queue_size=10, use_notify=False)
+    user_id = uuid4()
+
+    async def scenario():
+        async with broker.subscribe(user_id) as queue:
+            await publish_in_transaction(broker, user_id, [task_event("deleted", task_id=1)], commit=False)
+            await publish_in_transaction(broker, user_id, [task_event("deleted", task_id=2)])
+            return [queue.get_nowait() for _ in range(queue.qsize())]
+
+    assert [event["task_id"] for event in asyncio.run(scenario())] == [2]
+
+
+def test_postgres_notifies_on_the_writing_session():
+    broker = TaskEventBroker("task_events", queue_size=10, use_notify=True)
+    user_id = uuid4()
+    statements = []
+
+    async def execute(statement):
+        statements.append(statement)
+
+    session = SimpleNamespace(
+        bind=SimpleNamespace(dialect=SimpleNamespace(name="postgresql")),
+        sync_session=SimpleNamespace(info={}),
+        exec=execute,
+    )
+
+    async def scenario():
+        async with broker.subscribe(user_id) as queue:
+            await broker.publish(session, user_id, [task_event("deleted", task_id=1)])
+            return queue.qsize()
+
+    # Delivery comes back through LISTEN, not in-process
+    assert asyncio.run(scenario()) == 0
+    [statement] = statements
+    assert str(statement) == "SELECT pg_notify(:channel, :payload)"
+    params = statement.compile().params
+    assert params["channel"] == "task_events"
+    assert json.loads(params["payload"]) == {
+        "user_id": str(user_id), "events": [{"type": "deleted", "task_id": 1, "task": None}]
+    }
+
+
+def test_slow_stream_overflow_becomes_resync():
+    broker = TaskEventBroker("task_events", queue_size=2, use_notify=False)
+    user_id = uuid4()
+
+    async def scenario():
+        async with broker.subscribe(user_id) as queue:
+            await publish_in_transaction(broker, user_id, [task_event("deleted", task_id=i) for i in range(5)])
+            return [queue.get_nowait() for _ in range(queue.qsize())]
+
+    assert [event["type"] for event in asyncio.run(scenario())] == ["resync"]
+
+
+def test_rest_writes_publish_events(client, published):
+    user_id = str(uuid4())
+    task_id = client.post(f"/api/{user_id}/tasks", json={"title": "Buy milk"}).json()["id"]
+    client.patch(f"/api/{user_id}/tasks/{task_id}/complete")
+    client.post(f"/api/{user_id}/tasks/batch", json={"create": [{"title": "Call Mom"}], "delete": [task_id]})
+    client.delete(f"/api/{user_id}/tasks/{task_id}")
+
+    assert [[e["type"] for e in events] for _, events in published] == [
+        ["created"], ["updated"], ["created", "deleted"]
+    ]
+    assert published[1][1][0]["task"]["completed"] is True
+    assert {uid for uid, _ in published} == {user_id}
+
+
+class ConnectedRequest:
+    """Minimal stand-in for a Starlette request whose client stays connected."""
+
+    async def is_disconnected(self):
+        return False
+
+
+def parse_frame(frame: str) -> tuple[str, dict]:
+    lines = dict(line.split(": ", 1) for line in frame.strip().splitlines())
+    return lines["event"], json.loads(lines["data"])
+
+
+def test_stream_pushes_agent_tool_changes(async_engine):
+    """A task created by the chat agent's tool reaches an open change stream."""
+    user_id = str(uuid4())
+
+    async def scenario():
+        response = await task_event_stream(user_id, ConnectedRequest())
+        frames = response.body_iterator
+        ready = await frames.__anext__()
+        await chat_service.create_task_action(user_id, "Water plants")
+        change = await frames.__anext__()
+        await frames.aclose()
+        return parse_frame(ready), parse_frame(change)
+
+    ready, change = asyncio.run(scenario())
+    assert ready == ("ready", {"user_id": user_id})
+    assert change[0] == "task"
+    assert change[1]["type"] == "created"
+    assert change[1]["task"]["title"] == "Water plants"
+    assert task_events.subscriber_count(user_id) == 0
+
+
+def test_events_path_is_not_a_task_id():
+    paths = [route.path for route in app.routes]
+    assert paths.index("/api/{user_id}/tasks/events") < paths.index("/api/{user_id}/tasks/{task_id}")
@@ -0,0 +1,154 @@
+"""
+Tests for server-side filtering, sorting and sparse fieldsets on the task list.
+"""
+import pytest
+from datetime import datetime, timedelta, UTC
+from uuid import uuid4
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+
+from app.models.task import Task
+
+
+START = datetime(2025, 1, 1, tzinfo=UTC)
+
+
+@pytest.fixture(name="selects")
+def selects_fixture(async_engine) -> list[str]:
+    """Every SELECT run through the async engine."""
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+
+@pytest.fixture(name="user_id")
+def user_id_fixture(session):
+    """A user with 10 tasks: created an hour apart, every third completed,
+    and updated in reverse creation order."""
+    user_id = uuid4()
+    for i in range(10):
+        session.add(Task(
+            user_id=user_id,
+            title=f"Task {i}",
+            description="details",
+            completed=i % 3 == 0,
+            created_at=START + timedelta(hours=i),
+            updated_at=START + timedelta(days=1, hours=10 - i),
+        ))
+    session.add(Task(user_id=uuid4(), title="Someone else's", created_at=START, updated_at=START))
+    session.commit()
+    return user_id
+
+
+def titles(response) -> list[str]:
+    assert response.status_code == 200, response.text
+    return [task["title"] for task in response.json()]
+
+
+def test_status_filter(client: TestClient, user_id):
+    pending = titles(client.get(f"/api/{user_id}/tasks", params={"status": "pending"}))
+    completed = titles(client.get(f"/api/{user_id}/tasks", params={"status": "completed"}))
+
+    assert completed == ["Task 0", "Task 3", "Task 6", "Task 9"]
+    assert pending == ["Task 1", "Task 2", "Task 4", "Task 5", "Task 7", "Task 8"]
+    assert len(titles(client.get(f"/api/{user_id}/tasks", params={"status": "all"}))) == 10
+
+
+def test_date_filters(client: TestClient, user_id):
+    params = {
+        "created_after": (START + timedelta(hours=2)).isoformat(),
+        "created_before": (START + timedelta(hours=6)).isoformat(),
+    }
+    assert titles(client.get(f"/api/{user_id}/tasks", params=params)) == ["Task 3", "Task 4", "Task 5"]
+
+    # Naive times are taken as UTC; offsets are converted
+    since = (START + timedelta(days=1, hours=8)).replace(tzinfo=None).isoformat()
+    assert titles(client.get(f"/api/{user_id}/tasks", params={"updated_since": since})) == [
+        "Task 0", "Task 1", "Task 2"
+    ]
+    params = {"created_after": "2025-01-01T07:00:00+02:00"}  # 05:00 UTC
+    assert titles(client.get(f"/api/{user_id}/tasks", params=params)) == [
+        "Task 6", "Task 7", "Task 8", "Task 9"
+    ]
+
+
+def test_sort_and_cursor_follow_sort_column(client: TestClient, user_id):
+    seen, cursor = [], None
+    while True:
+        params = {"status": "pending", "sort": "-updated_at", "limit": 4}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(f"/api/{user_id}/tasks", params=params)
+        seen += titles(response)
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    # Updated in reverse creation order, so newest update = lowest task number
+    assert seen == ["Task 1", "Task 2", "Task 4", "Task 5", "Task 7", "Task 8"]
+    assert titles(client.get(f"/api/{user_id}/tasks", params={"sort": "-created_at", "limit": 2})) == [
+        "Task 9", "Task 8"
+    ]
+
+
+def test_sparse_fieldset_selects_only_requested_columns(client: TestClient, user_id, selects):
+    response = client.get(
+        f"/api/{user_id}/tasks", params={"fields": "title,completed", "limit": 3, "sort": "updated_at"}
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body[0] == {"id": 10, "title": "Task 9", "completed": True}
+    assert all(set(task) == {"id", "title", "completed"} for task in body)
+    selected_columns = selects[-1].split("FROM")[0]
+    assert "tasks.description" not in selected_columns
+    assert "tasks.user_id" not in selected_columns
+    assert "tasks.updated_at" in selected_columns  # read for the cursor only
+
+    # The next page still works although updated_at was not returned
+    cursor = response.headers["X-Next-Cursor"]
+    next_page = client.get(
+        f"/api/{user_id}/tasks",
+        params={"fields": "title,completed", "limit": 3, "sort": "updated_at", "cursor": cursor}
+    )
+    assert [task["title"] for task in next_page.json()] == ["Task 6", "Task 5", "Task 4"]
+
+
+def test_full_list_keeps_every_field(client: TestClient, user_id):
+    task = client.get(f"/api/{user_id}/tasks", params={"limit": 1}).json()[0]
+    assert set(task) == {"id", "user_id", "title", "description", "completed", "created_at", "updated_at"}
+
+
+def test_invalid_parameters_rejected(client: TestClient, user_id):
+    assert client.get(f"/api/{user_id}/tasks", params={"fields": "title,secret"}).status_code == 400
+    assert client.get(f"/api/{user_id}/tasks", params={"sort": "title"}).status_code in (400, 422)
+    assert client.get(f"/api/{user_id}/tasks", params={"status": "done"}).status_code in (400, 422)
+
+
+def test_etag_depends_on_query(client: TestClient, user_id):
+    pending = client.get(f"/api/{user_id}/tasks", params={"status": "pending"})
+    completed = client.get(f"/api/{user_id}/tasks", params={"status": "completed"})
+    assert pending.headers["ETag"] != completed.headers["ETag"]
+
+    repeat = client.get(
+        f"/api/{user_id}/tasks",
+        params={"status": "pending"},
+        headers={"If-None-Match": pending.headers["ETag"]}
+    )
+    assert repeat.status_code == 304
+
+
+def test_filtered_sorted_pages_use_composite_indexes(session, user_id):
+    plan = session.exec(text(
+        "EXPLAIN QUERY PLAN SELECT id FROM tasks "
+        "WHERE user_id = :user AND completed = 0 ORDER BY updated_at DESC, id DESC LIMIT 5"
+    ).bindparams(user=user_id.hex)).all()
+    detail = " ".join(row[-1] for row in plan)
+    assert "idx_tasks_user_completed_updated_id" in detail
+    assert "TEMP B-TREE" not in detail
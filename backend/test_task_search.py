@@ -0,0 +1,110 @@
+"""
+Tests for task full-text search: the SQLite inverted-index fallback, the
+search endpoint and the search_tasks agent tool.
+"""
+import asyncio
+import pytest
+from uuid import uuid4
+
+from app.models.task import Task
+from app.services import chat_service
+from app.services.task_search import InvertedIndex, fallback_indexes, tokenize
+
+
+@pytest.fixture(autouse=True)
+def empty_fallback_indexes():
+    fallback_indexes.clear()
+
+
+def seed(session, user_id, *tasks):
+    for title, description in tasks:
+        session.add(Task(user_id=user_id, title=title, description=description))
+    session.commit()
+
+
+def test_tokenize_normalizes_words():
+    assert tokenize("Buy the Groceries!") == ["buy", "grocery"]
+    assert tokenize("grocery") == ["grocery"]
+    assert tokenize("Send emails, fix boxes") == ["send", "email", "fix", "box"]
+    assert tokenize(None) == []
+
+
+def test_inverted_index_requires_all_terms_and_ranks_titles_first():
+    index = InvertedIndex.build([
+        (1, "Buy groceries", None),
+        (2, "Weekend errands", "groceries and the pharmacy"),
+        (3, "Pay rent", None),
+    ])
+
+    assert [task_id for task_id, _ in index.search("groceries")] == [1, 2]
+    assert [task_id for task_id, _ in index.search("grocery pharmacy")] == [2]
+    assert index.search("groceries rent") == []
+    assert index.search("the") == []
+
+
+def test_search_endpoint_ranks_and_scopes_to_user(client, session):
+    user_id, other_id = uuid4(), uuid4()
+    seed(
+        session, user_id,
+        ("Buy groceries", "milk, eggs"),
+        ("Plan week", "remember the groceries"),
+        ("Call mom", None),
+    )
+    seed(session, other_id, ("Groceries for grandma", None))
+
+    response = client.get(f"/api/{user_id}/tasks/search", params={"q": "grocery"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [hit["task"]["title"] for hit in body["results"]] == ["Buy groceries", "Plan week"]
+    assert body["results"][0]["rank"] > body["results"][1]["rank"]
+    assert body["next_offset"] is None
+
+
+def test_search_endpoint_paginates(client, session):
+    user_id = uuid4()
+    seed(session, user_id, *[(f"Report {i}", None) for i in range(5)])
+
+    first = client.get(f"/api/{user_id}/tasks/search", params={"q": "report", "limit": 2}).json()
+    assert len(first["results"]) == 2 and first["next_offset"] == 2
+
+    seen = [hit["task"]["id"] for hit in first["results"]]
+    offset = first["next_offset"]
+    while offset is not None:
+        page = client.get(
+            f"/api/{user_id}/tasks/search", params={"q": "report", "limit": 2, "offset": offset}
+        ).json()
+        seen += [hit["task"]["id"] for hit in page["results"]]
+        offset = page["next_offset"]
+    assert len(seen) == len(set(seen)) == 5
+
+
+def test_search_sees_task_changes(client, session):
+    user_id = uuid4()
+    seed(session, user_id, ("Buy groceries", None))
+    assert len(client.get(f"/api/{user_id}/tasks/search", params={"q": "milk"}).json()["results"]) == 0
+
+    task_id = client.post(f"/api/{user_id}/tasks", json={"title": "Get milk"}).json()["id"]
+    hits = client.get(f"/api/{user_id}/tasks/search", params={"q": "milk"}).json()["results"]
+    assert [hit["task"]["id"] for hit in hits] == [task_id]
+
+    client.put(f"/api/{user_id}/tasks/{task_id}", json={"title": "Get bread"})
+    assert client.get(f"/api/{user_id}/tasks/search", params={"q": "milk"}).json()["results"] == []
+
+
+def test_search_endpoint_rejects_blank_query(client):
+    user_id = uuid4()
+    assert client.get(f"/api/{user_id}/tasks/search", params={"q": "   "}).status_code == 400
+    assert client.get(f"/api/{user_id}/tasks/search").status_code in (400, 422)
+
+
+def test_search_tasks_tool_action(client, session):
+    user_id = uuid4()
+    seed(session, user_id, ("Buy groceries", None), ("Pay rent", None))
+
+    result = asyncio.run(chat_service.search_tasks_action(str(user_id), "the groceries task"))
+    assert result["status"] == "success"
+    assert result["tasks"] == []  # "task" is not in any title: every term must match
+
+    result = asyncio.run(chat_service.search_tasks_action(str(user_id), "groceries"))
+    assert [task["title"] for task in result["tasks"]] == ["Buy groceries"]
@@ -0,0 +1,199 @@
+"""
+Tests that task writes - single tasks and the agent's set-based tools - are
+single UPDATE ... RETURNING statements. API writes are preceded by the
+change sequence upsert (INSERT ... ON CONFLICT); the agent's unit of work
+takes it at commit and stamps it on the touched tasks with one more UPDATE.
+"""
+import asyncio
+import pytest
+from uuid import uuid4
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session, create_engine, select
+
+from app.models.task import Task
+from app.services import chat_service
+
+
+@pytest.fixture(name="statements")
+def statements_fixture(async_engine) -> list[str]:
+    """Verb of every SQL statement run through the async engine."""
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement.lstrip().split()[0].upper())
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+
+@pytest.fixture(name="task")
+def task_fixture(db_path) -> Task:
+    engine = create_engine(f"sqlite:///{db_path}")
+    with Session(engine) as session:
+        task = Task(user_id=uuid4(), title="Buy milk")
+        session.add(task)
+        session.commit()
+        session.refresh(task)
+    engine.dispose()
+    return task
+
+
+def test_toggle_is_one_statement(client: TestClient, statements, task: Task):
+    """Toggling twice flips and restores completed, one UPDATE each."""
+    url = f"/api/{task.user_id}/tasks/{task.id}/complete"
+    assert client.patch(url).json()["completed"] is True
+    assert client.patch(url).json()["completed"] is False
+    assert statements == ["INSERT", "UPDATE", "INSERT", "UPDATE"]
+
+
+def test_update_and_delete_are_one_statement_each(client: TestClient, statements, task: Task):
+    base = f"/api/{task.user_id}/tasks/{task.id}"
+    response = client.put(base, json={"title": "Buy oat milk"})
+    assert response.status_code == 200
+    assert response.json()["title"] == "Buy oat milk"
+    assert response.json()["description"] is None
+
+    # Deletes are soft: an UPDATE that leaves a tombstone
+    assert client.delete(base).status_code == 204
+    assert client.delete(base).status_code == 404
+    assert client.get(base).status_code == 404
+    assert statements == ["INSERT", "UPDATE", "INSERT", "UPDATE", "INSERT", "UPDATE", "SELECT"]
+
+
+def test_writes_to_other_users_tasks_are_not_found(client: TestClient, task: Task):
+    other = uuid4()
+    assert client.patch(f"/api/{other}/tasks/{task.id}/complete").status_code == 404
+    assert client.put(f"/api/{other}/tasks/{task.id}", json={"title": "x"}).status_code == 404
+    assert client.delete(f"/api/{other}/tasks/{task.id}").status_code == 404
+
+
+def test_agent_actions_use_returning(statements, task: Task):
+    user_id = str(task.user_id)
+    updated = asyncio.run(chat_service.update_task_action(user_id, task.id, title="Buy bread"))
+    completed = asyncio.run(chat_service.complete_task_action(user_id, task.id))
+    deleted = asyncio.run(chat_service.delete_task_action(user_id, task.id))
+    missing = asyncio.run(chat_service.delete_task_action(user_id, task.id))
+
+    assert updated["message"] == "Task 'Buy bread' updated successfully!"
+    assert completed["message"] == "Task 'Buy bread' marked as complete!"
+    assert deleted["message"] == "Task 'Buy bread' deleted successfully!"
+    assert missing == {"error": "Task not found", "status": "failed"}
+    assert statements == ["UPDATE", "INSERT", "UPDATE"] * 3 + ["UPDATE"]
+
+
+@pytest.fixture(name="tasks")
+def tasks_fixture(db_path) -> list[Task]:
+    """Four tasks of one user (the last two completed) and one of another user."""
+    engine = create_engine(f"sqlite:///{db_path}")
+    user_id = uuid4()
+    with Session(engine) as session:
+        tasks = [Task(user_id=user_id, title=f"Task {i}", completed=i >= 2) for i in range(4)]
+        tasks.append(Task(user_id=uuid4(), title="Someone else's"))
+        session.add_all(tasks)
+        session.commit()
+        for task in tasks:
+            session.refresh(task)
+    engine.dispose()
+    return tasks
+
+
+def stored(db_path) -> dict[int, Task]:
+    engine = create_engine(f"sqlite:///{db_path}")
+    with Session(engine) as session:
+        tasks = {task.id: task for task in session.exec(select(Task)).all()}
+    engine.dispose()
+    return tasks
+
+
+def test_complete_tasks_is_one_statement(statements, tasks: list[Task], db_path):
+    user_id = str(tasks[0].user_id)
+    ids = [tasks[0].id, tasks[1].id, tasks[4].id, 999]
+    result = asyncio.run(chat_service.complete_tasks_action(user_id, ids))
+
+    assert result["count"] == 2
+    assert result["not_found"] == [tasks[4].id, 999]
+    assert statements == ["UPDATE", "INSERT", "UPDATE"]
+    rows = stored(db_path)
+    assert rows[tasks[0].id].completed and rows[tasks[1].id].completed
+    assert rows[tasks[4].id].completed is False
+
+
+def test_delete_tasks_by_status_is_one_statement(statements, tasks: list[Task], db_path):
+    user_id = str(tasks[0].user_id)
+    assert asyncio.run(chat_service.delete_tasks_action(user_id))["status"] == "failed"
+
+    result = asyncio.run(chat_service.delete_tasks_action(user_id, status="completed"))
+
+    assert sorted(task["id"] for task in result["tasks"]) == [tasks[2].id, tasks[3].id]
+    assert statements == ["UPDATE", "INSERT", "UPDATE"]
+    rows = stored(db_path)
+    assert [rows[task.id].deleted_at is not None for task in tasks] == [False, False, True, True, False]
+
+
+def test_delete_tasks_with_status_all_deletes_every_task_of_the_user(async_engine, tasks: list[Task], db_path):
+    result = asyncio.run(chat_service.delete_tasks_action(str(tasks[0].user_id), status="all"))
+
+    assert result["count"] == 4
+    rows = stored(db_path)
+    assert [rows[task.id].deleted_at is not None for task in tasks] == [True, True, True, True, False]
+
+
+def test_list_tasks_loads_at_most_the_limit(async_engine, tasks: list[Task]):
+    user_id = str(tasks[0].user_id)
+    sql = []
+
+    def record(conn, cursor, statement, parameters, *args):
+        sql.append((statement, parameters))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    capped = asyncio.run(chat_service.list_tasks_action(user_id, limit=3))
+    fits = asyncio.run(chat_service.list_tasks_action(user_id, limit=4))
+    event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+    # One extra row detects the cut; only then is the total counted
+    assert len(capped["tasks"]) == 3 and capped["count"] == 4
+    assert len(fits["tasks"]) == 4 and fits["count"] == 4
+    (capped_select, capped_params), (count_select, _), (fits_select, fits_params) = sql
+    assert "LIMIT" in capped_select and 4 in capped_params
+    assert "count(" in count_select
+    assert "LIMIT" in fits_select and 5 in fits_params
+
+
+def test_bulk_update_is_one_statement(statements, tasks: list[Task], db_path):
+    user_id = str(tasks[0].user_id)
+    result = asyncio.run(chat_service.bulk_update_action(user_id, [
+        {"id": tasks[0].id, "title": "Renamed"},
+        {"id": tasks[1].id, "completed": True, "description": "now done"},
+        {"id": tasks[4].id, "title": "Not mine"},
+    ]))
+
+    assert result["count"] == 2 and result["not_found"] == [tasks[4].id]
+    assert statements == ["UPDATE", "INSERT", "UPDATE"]
+    rows = stored(db_path)
+    assert (rows[tasks[0].id].title, rows[tasks[0].id].completed) == ("Renamed", False)
+    assert (rows[tasks[1].id].title, rows[tasks[1].id].description, rows[tasks[1].id].completed) == (
+        "Task 1", "now done", True
+    )
+    assert rows[tasks[4].id].title == "Someone else's"
+
+
+def test_bulk_update_validates_each_item(async_engine, tasks: list[Task], db_path):
+    user_id = str(tasks[0].user_id)
+    result = asyncio.run(chat_service.bulk_update_action(user_id, [
+        {"id": tasks[0].id, "title": "  Trimmed  "},
+        {"id": tasks[1].id, "title": ""},
+        {"id": tasks[2].id, "title": "x" * 201},
+        {"title": "No ID"},
+    ]))
+
+    assert result["count"] == 1 and result["tasks"][0]["title"] == "Trimmed"
+    assert [item["id"] for item in result["invalid"]] == [tasks[1].id, tasks[2].id, None]
+    assert result["invalid"][0]["error"].startswith("title:")
+    assert "200 characters" in result["invalid"][1]["error"]
+    rows = stored(db_path)
+    assert (rows[tasks[1].id].title, rows[tasks[2].id].title) == ("Task 1", "Task 2")
+
+    rejected = asyncio.run(chat_service.bulk_update_action(user_id, [{"id": tasks[0].id, "title": " "}]))
+    assert rejected["status"] == "failed" and "empty" in rejected["invalid"][0]["error"]
@@ -0,0 +1,109 @@
+"""
+Tests that the timestamps the app writes and filters on bind on PostgreSQL.
+
+asyncpg encodes TIMESTAMP values as `value - pg_epoch_datetime` (a naive
+epoch), so a timezone-aware datetime fails with "can't subtract offset-naive
+and offset-aware datetimes"; TIMESTAMPTZ values are converted to UTC first.
+The statements are compiled for the asyncpg dialect and each datetime
+parameter is encoded by that rule, using asyncpg's own epochs.
+"""
+from datetime import datetime, timedelta, timezone, UTC
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from asyncpg.pgproto import pgproto
+from sqlalchemy import DateTime, insert, select, update
+from sqlalchemy.dialects.postgresql import asyncpg as pg_asyncpg
+
+from app.database import convert_timestamps_to_utc
+from app.models.conversation import Conversation, Message
+from app.models.task import Task, utc_now
+from app.pagination import decode_cursor, encode_cursor
+from app.routes.tasks import _as_utc
+
+DIALECT = pg_asyncpg.dialect()
+
+
+def encode_like_asyncpg(column_type: DateTime, value: datetime) -> timedelta:
+    if column_type.timezone:
+        return value.astimezone(UTC) - pgproto.pg_epoch_datetime_utc
+    return value - pgproto.pg_epoch_datetime
+
+
+def bind_on_postgres(statement) -> int:
+    """Encode every datetime parameter of a statement; returns how many there were."""
+    compiled = statement.compile(dialect=DIALECT)
+    bound = 0
+    for name, value in compiled.params.items():
+        column_type = compiled.binds[name].type
+        if isinstance(value, datetime):
+            assert isinstance(column_type, DateTime), name
+            encode_like_asyncpg(column_type, value)
+            bound += 1
+    return bound
+
+
+def test_encoder_rejects_aware_values_for_naive_columns():
+    with pytest.raises(TypeError):
+        encode_like_asyncpg(DateTime(), utc_now())
+
+
+def test_app_timestamp_columns_are_timezone_aware():
+    for model in (Task, Conversation, Message):
+        for column in model.__table__.columns:
+            if isinstance(column.type, DateTime):
+                assert column.type.timezone, f"{model.__tablename__}.{column.name}"
+                assert column.type.compile(dialect=DIALECT) == "TIMESTAMP WITH TIME ZONE"
+
+
+def test_writes_bind_on_postgres():
+    task = Task(user_id=uuid4(), title="x", deleted_at=utc_now())
+    conversation = Conversation(user_id=uuid4())
+    message = Message(conversation_id=1, user_id=uuid4(), role="user", content="hi")
+
+    assert bind_on_postgres(insert(Task).values(**task.model_dump(exclude={"id"}))) == 3
+    assert bind_on_postgres(update(Task).where(Task.id == 1).values(updated_at=utc_now(), deleted_at=utc_now())) == 2
+    assert bind_on_postgres(insert(Conversation).values(**conversation.model_dump(exclude={"id"}))) == 2
+    assert bind_on_postgres(insert(Message).values(**message.model_dump(exclude={"id"}))) == 1
+    assert bind_on_postgres(update(Conversation).where(Conversation.id == 1).values(updated_at=utc_now())) == 1
+
+
+def test_filters_and_cursors_bind_on_postgres():
+    naive = datetime(2026, 1, 1, 12, 0)
+    offset = datetime(2026, 1, 1, 12, 0, tzinfo=timezone(timedelta(hours=2)))
+    after, _ = decode_cursor(encode_cursor(naive, 7))
+
+    assert bind_on_postgres(select(Task).where(
+        Task.created_at > _as_utc(naive),
+        Task.updated_at >= _as_utc(offset),
+        Task.created_at > after,
+        Task.deleted_at < utc_now() - timedelta(days=30),
+    )) == 4
+
+
+class RecordingConnection:
+    """Answers the information_schema query and records the DDL."""
+
+    def __init__(self, naive_columns):
+        self.naive_columns = naive_columns
+        self.statements = []
+
+    def execute(self, statement):
+        sql = str(statement)
+        if "information_schema" in sql:
+            return [SimpleNamespace(table_name=t, column_name=c) for t, c in self.naive_columns]
+        self.statements.append(sql)
+
+
+def test_naive_postgres_columns_are_converted_once():
+    conn = RecordingConnection([("tasks", "created_at"), ("messages", "created_at"), ("user", "created_at")])
+    convert_timestamps_to_utc(conn)
+
+    assert sorted(conn.statements) == [
+        "ALTER TABLE \"messages\" ALTER COLUMN created_at TYPE TIMESTAMP WITH TIME ZONE "
+        "USING created_at AT TIME ZONE 'UTC'",
+        "ALTER TABLE \"tasks\" ALTER COLUMN created_at TYPE TIMESTAMP WITH TIME ZONE "
+        "USING created_at AT TIME ZONE 'UTC'",
+    ]
+    assert convert_timestamps_to_utc(RecordingConnection([])) is None
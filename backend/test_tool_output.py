@@ -0,0 +1,76 @@
+"""
+Tests for the compact encoding of task tool results.
+"""
+import json
+import pytest
+from datetime import datetime, timedelta, UTC
+
+from app.services.tool_output import encode_task_result, relative_age, truncate
+
+
+NOW = datetime(2026, 3, 1, 12, 0, tzinfo=UTC)
+
+
+def make_tasks(n: int) -> list[dict]:
+    return [
+        {
+            "id": i,
+            "title": f"Task {i}",
+            "description": "Remember to bring the receipts and the signed forms to the office " * 3,
+            "completed": i % 2 == 0,
+            "created_at": (NOW - timedelta(days=i)).isoformat(),
+        }
+        for i in range(1, n + 1)
+    ]
+
+
+def test_compact_task_list():
+    result = {"tasks": make_tasks(2) + [{"id": 3, "title": "Bare", "description": None,
+                                          "completed": False, "created_at": NOW.isoformat()}],
+              "count": 3, "status": "success"}
+    encoded = json.loads(encode_task_result(result, now=NOW, description_chars=30))
+
+    assert encoded["status"] == "success" and encoded["count"] == 3
+    assert "more" not in encoded and "i=id" in encoded["keys"]
+    first, second, bare = encoded["tasks"]
+    assert first["i"] == 1 and first["t"] == "Task 1" and first["a"] == "1d" and "c" not in first
+    assert first["d"].startswith("Remember to bring the") and first["d"].endswith(")")
+    assert len(first["d"].split("…")[0]) <= 30
+    assert second["c"] == 1 and second["a"] == "2d"
+    assert bare == {"i": 3, "t": "Bare", "a": "now"}
+
+
+def test_long_lists_are_capped_with_a_count():
+    result = {"tasks": make_tasks(300), "count": 300, "status": "success"}
+    compact = encode_task_result(result, max_tasks=50, now=NOW)
+    full = encode_task_result(result, style="json")
+
+    encoded = json.loads(compact)
+    assert len(encoded["tasks"]) == 50 and encoded["count"] == 300 and encoded["more"] == 250
+    assert "search_tasks" in encoded["hint"]
+    assert len(compact) * 10 < len(full)
+    assert json.loads(full) == result
+
+
+def test_list_cut_short_by_the_action_reports_the_total():
+    result = {"tasks": make_tasks(50), "count": 300, "status": "success"}
+    encoded = json.loads(encode_task_result(result, max_tasks=50, now=NOW))
+    assert len(encoded["tasks"]) == 50 and encoded["count"] == 300 and encoded["more"] == 250
+
+
+def test_results_without_a_list_pass_through():
+    failed = {"error": "boom", "status": "failed", "tasks": []}
+    assert json.loads(encode_task_result(failed)) == failed
+    created = {"task_id": 1, "status": "created", "title": "x"}
+    assert json.loads(encode_task_result(created)) == created
+    with pytest.raises(ValueError):
+        encode_task_result(created, style="yaml")
+
+
+def test_truncate_and_relative_age():
+    assert truncate("short", 10) == "short"
+    assert truncate("one two three four", 9) == "one two…(+11)"
+    assert truncate("x" * 20, 5) == "xxxxx…(+15)"
+    assert relative_age((NOW - timedelta(minutes=5)).isoformat(), NOW) == "5m"
+    assert relative_age((NOW - timedelta(days=15)).replace(tzinfo=None).isoformat(), NOW) == "2w"
+    assert relative_age((NOW - timedelta(days=400)).isoformat(), NOW) == "1y"
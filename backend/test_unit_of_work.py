@@ -0,0 +1,215 @@
+"""
+Tests for the per-run unit of work shared by the agent's task tools.
+"""
+import asyncio
+import pytest
+from types import SimpleNamespace
+from uuid import uuid4
+from sqlalchemy import event, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel import Session, create_engine, select, SQLModel
+
+from app.models.task import Task
+from app.services import chat_service
+from app.services.chat_service import ChatService
+from app.services.task_events import task_events
+from app.services.unit_of_work import TaskUnitOfWork
+
+
+@pytest.fixture(name="db_path")
+def db_path_fixture(tmp_path):
+    """Path of a fresh SQLite database with all tables created."""
+    path = tmp_path / "test.db"
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine)
+    engine.dispose()
+    return path
+
+
+@pytest.fixture(name="async_engine")
+def async_engine_fixture(db_path, monkeypatch):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+    monkeypatch.setattr(chat_service, "async_engine", engine)
+    return engine
+
+
+@pytest.fixture(name="commits")
+def commits_fixture(async_engine) -> list:
+    """One entry per transaction committed through the async engine."""
+    commits = []
+
+    def record(conn):
+        commits.append(conn)
+
+    event.listen(async_engine.sync_engine, "commit", record)
+    yield commits
+    event.remove(async_engine.sync_engine, "commit", record)
+
+
+@pytest.fixture(name="published")
+def published_fixture(monkeypatch) -> list:
+    """Record (user_id, events) for every publish call."""
+    published = []
+
+    async def record(session, user_id, events):
+        if events:
+            published.append((str(user_id), events))
+
+    monkeypatch.setattr(task_events, "publish", record)
+    return published
+
+
+@pytest.fixture(name="tasks")
+def tasks_fixture(db_path) -> list[Task]:
+    """Three pending tasks of one user."""
+    engine = create_engine(f"sqlite:///{db_path}")
+    user_id = uuid4()
+    with Session(engine) as session:
+        tasks = [Task(user_id=user_id, title=f"Task {i}") for i in range(3)]
+        session.add_all(tasks)
+        session.commit()
+        for task in tasks:
+            session.refresh(task)
+    engine.dispose()
+    return tasks
+
+
+def stored(db_path) -> list[Task]:
+    engine = create_engine(f"sqlite:///{db_path}")
+    with Session(engine) as session:
+        tasks = session.exec(select(Task).order_by(Task.id)).all()
+    engine.dispose()
+    return tasks
+
+
+def test_concurrent_tools_share_one_transaction(async_engine, commits, published, tasks, db_path):
+    user_id = str(tasks[0].user_id)
+
+    async def run():
+        async with TaskUnitOfWork(user_id, async_engine) as unit:
+            results = await asyncio.gather(*(
+                chat_service.complete_task_action(user_id, task.id, unit=unit) for task in tasks
+            ))
+            created = await chat_service.create_task_action(user_id, "Follow up", unit=unit)
+            listed = await chat_service.list_tasks_action(user_id, "completed", unit=unit)
+            # Nothing is published before the commit
+            assert published == []
+        return results, created, listed
+
+    results, created, listed = asyncio.run(run())
+
+    assert [result["status"] for result in results] == ["completed"] * 3
+    assert created["status"] == "created"
+    assert listed["count"] == 3  # reads see the run's own uncommitted writes
+    assert len(commits) == 1
+    assert len(published) == 1 and len(published[0][1]) == 4
+
+    rows = stored(db_path)
+    assert [task.completed for task in rows] == [True, True, True, False]
+    assert len({task.change_seq for task in rows}) == 1
+
+
+def test_change_seq_is_taken_at_commit(async_engine, tasks, db_path):
+    user_id = str(tasks[0].user_id)
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+
+    async def run():
+        async with TaskUnitOfWork(user_id, async_engine) as unit:
+            await chat_service.complete_task_action(user_id, tasks[0].id, unit=unit)
+            await chat_service.delete_task_action(user_id, tasks[1].id, unit=unit)
+            # The user's change counter is not locked while the run goes on
+            assert not any("task_change_counters" in statement for statement in statements)
+
+    asyncio.run(run())
+    event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+    rows = stored(db_path)
+    assert rows[0].change_seq == rows[1].change_seq > rows[2].change_seq
+
+
+def test_failed_run_rolls_back(async_engine, commits, published, tasks, db_path):
+    user_id = str(tasks[0].user_id)
+
+    async def run():
+        async with TaskUnitOfWork(user_id, async_engine) as unit:
+            await chat_service.complete_task_action(user_id, tasks[0].id, unit=unit)
+            await chat_service.delete_task_action(user_id, tasks[1].id, unit=unit)
+            raise RuntimeError("model call failed")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(run())
+
+    assert commits == [] and published == []
+    rows = stored(db_path)
+    assert not any(task.completed or task.deleted_at for task in rows)
+
+
+def test_failed_statement_poisons_the_unit(async_engine, published, tasks, db_path):
+    user_id = str(tasks[0].user_id)
+
+    async def failing():
+        async with TaskUnitOfWork(user_id, async_engine) as unit:
+            done = await chat_service.complete_task_action(user_id, tasks[0].id, unit=unit)
+            with pytest.raises(OperationalError):
+                async with unit.session() as session:
+                    await session.exec(text("SELECT * FROM no_such_table"))
+            after = await chat_service.complete_task_action(user_id, tasks[1].id, unit=unit)
+            return done, after
+
+    done, after = asyncio.run(failing())
+
+    assert done["status"] == "completed"
+    assert after["status"] == "failed" and "rolled back" in after["error"]
+    assert published == []
+    assert not any(task.completed for task in stored(db_path))
+
+
+def test_standalone_actions_commit_on_their_own(async_engine, commits, published, tasks, db_path):
+    user_id = str(tasks[0].user_id)
+    assert asyncio.run(chat_service.complete_task_action(user_id, tasks[0].id))["status"] == "completed"
+    assert len(commits) == 1 and len(published) == 1
+    assert stored(db_path)[0].completed is True
+
+
+class ParallelToolsRunner:
+    """Fake agents.Runner that calls complete_task for every task at once, like parallel tool calls."""
+    task_ids: list = []
+    fail = False
+
+    @classmethod
+    async def run(cls, agent, input, context=None):
+        await asyncio.gather(*(
+            chat_service.complete_task_action(context["user_id"], task_id, unit=context["unit"])
+            for task_id in cls.task_ids
+        ))
+        if cls.fail:
+            raise RuntimeError("model call failed")
+        return SimpleNamespace(final_output="Done", new_items=[])
+
+
+def test_chat_turn_commits_tool_changes_once(async_engine, published, tasks, db_path, monkeypatch):
+    monkeypatch.setattr(ParallelToolsRunner, "task_ids", [task.id for task in tasks])
+    monkeypatch.setattr(chat_service, "Runner", ParallelToolsRunner)
+    service = ChatService()
+    user_id = str(tasks[0].user_id)
+
+    monkeypatch.setattr(ParallelToolsRunner, "fail", True)
+    with pytest.raises(RuntimeError):
+        asyncio.run(service.chat_async(user_id, "finish everything please"))
+    assert not any(task.completed for task in stored(db_path))
+
+    monkeypatch.setattr(ParallelToolsRunner, "fail", False)
+    reply = asyncio.run(service.chat_async(user_id, "finish everything please"))
+
+    assert reply["response"] == "Done"
+    assert all(task.completed for task in stored(db_path))
+    # The three parallel tool calls are published together, after the run's one commit
+    tool_events = [events for _, events in published if events[0]["type"] == "updated"]
+    assert len(tool_events) == 1 and len(tool_events[0]) == 3
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Memory and listing benchmark for the Phase I task stores.
+
+Compares, at N tasks:
+- dict storage holding plain (non-slotted) dataclass tasks, as before
+- TaskStorage holding slotted Task objects
+- CompactTaskStorage (struct of arrays)
+
+Usage:
+    python3 benchmark_storage.py            # 1,000,000 tasks
+    python3 benchmark_storage.py -n 100000
+"""
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+sys.path.insert(0, 'src')
+
+from todo_app.compact_storage import CompactTaskStorage
+from todo_app.models import Task
+from todo_app.storage import TaskStorage
+
+
+@dataclass
+class DictTask:
+    """The pre-slots Task layout, kept here for comparison."""
+    id: int
+    title: str
+    description: Optional[str]
+    completed: bool
+    created_at: datetime
+    updated_at: datetime
+
+
+class DictTaskStorage(TaskStorage):
+    """TaskStorage whose get_all copies into a new list, as it used to."""
+
+    def get_all(self):
+        return list(self._tasks.values())
+
+
+def fill(storage: TaskStorage, task_cls, n: int) -> None:
+    start = datetime(2025, 1, 1)
+    for i in range(1, n + 1):
+        created = start + timedelta(seconds=i)
+        storage.add(task_cls(
+            id=i,
+            title=f"Task {i % 1000}",
+            description=None if i % 4 else f"Details for task {i}",
+            completed=i % 3 == 0,
+            created_at=created,
+            updated_at=created,
+        ))
+
+
+def measure(name: str, storage_cls, task_cls, n: int) -> None:
+    gc.collect()
+    tracemalloc.start()
+    storage = storage_cls()
+    fill(storage, task_cls, n)
+    gc.collect()
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    tasks = storage.get_all()
+    count = len(tasks)
+    get_all_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    completed = sum(1 for task in tasks if task.completed)
+    iterate_ms = (time.perf_counter() - started) * 1000
+
+    assert count == n and completed == n // 3
+    print(f"{name:<28} {used / n:>9.0f} B/task {used / 2**20:>9.1f} MiB "
+          f"{get_all_ms:>10.1f} ms {iterate_ms:>10.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", type=int, default=1_000_000, help="number of tasks")
+    n = parser.parse_args().n
+
+    print(f"\n{n:,} tasks")
+    print(f"{'store':<28} {'memory':>16} {'total':>13} {'get_all+len':>13} {'iterate':>13}")
+    measure("dict + dataclass (before)", DictTaskStorage, DictTask, n)
+    measure("dict + slotted Task", TaskStorage, Task, n)
+    measure("CompactTaskStorage", CompactTaskStorage, Task, n)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,7 @@ import TaskList from "@/components/TaskList";
 import { api, ApiClientError } from "@/lib/api";
 import { useAuth } from "@/hooks/useAuth";
 import { useToast } from "@/lib/toast-context";
-import { CreateTaskDto, Task, UpdateTaskDto } from "@/lib/types";
+import { CreateTaskDto, Task, TaskChangeEvent, UpdateTaskDto } from "@/lib/types";
 import { useRouter } from "next/navigation";
 import { useEffect, useState } from "react";
 
@@ -26,6 +26,25 @@ function TasksPageContent() {
     }
   }, [user?.id]);
 
+  // Apply changes made elsewhere (AI assistant, other devices) as they happen
+  useEffect(() => {
+    if (!user?.id) return;
+    return api.subscribeToTaskEvents(user.id, (event: TaskChangeEvent) => {
+      if (event.type === "resync") {
+        loadTasks();
+      } else if (event.type === "deleted") {
+        setTasks((prev) => prev.filter((t) => t.id !== event.task_id));
+      } else if (event.task) {
+        const changed = event.task;
+        setTasks((prev) =>
+          prev.some((t) => t.id === changed.id)
+            ? prev.map((t) => (t.id === changed.id ? changed : t))
+            : [changed, ...prev]
+        );
+      }
+    });
+  }, [user?.id]);
+
   const loadTasks = async () => {
     if (!user?.id) return;
 
@@ -52,7 +71,7 @@ function TasksPageContent() {
 
     try {
       const newTask = await api.createTask(user.id, data);
-      setTasks((prev) => [newTask, ...prev]);
+      setTasks((prev) => [newTask, ...prev.filter((t) => t.id !== newTask.id)]);
       showSuccess("Task created!");
     } catch (err: any) {
       if (err instanceof ApiClientError) {
@@ -1,7 +1,14 @@
 // API Client for backend communication
 // Handles JWT token attachment and all task operations
 
-import { ApiError, CreateTaskDto, Task, UpdateTaskDto } from "./types";
+import {
+  ApiError,
+  CreateTaskDto,
+  Task,
+  TaskChangeEvent,
+  TaskListOptions,
+  UpdateTaskDto,
+} from "./types";
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
 
@@ -143,13 +150,53 @@ async function handleResponse<T>(response: Response): Promise<T> {
 export const api = {
   /**
    * Get all tasks for a user
+   * Follows the X-Next-Cursor header until every page has been fetched.
+   * Filtering and sorting happen on the server, so e.g. a "pending only"
+   * view downloads only pending tasks.
    * @param userId - The user ID
+   * @param options - Optional status/date filters and sort order
    * @returns Promise<Task[]>
    */
-  async getTasks(userId: string): Promise<Task[]> {
-    const url = `${API_BASE_URL}/api/${userId}/tasks`;
-    const response = await fetchWithAuth(url, { method: "GET" });
-    return handleResponse<Task[]>(response);
+  async getTasks(userId: string, options: TaskListOptions = {}): Promise<Task[]> {
+    const baseUrl = `${API_BASE_URL}/api/${userId}/tasks`;
+    const tasks: Task[] = [];
+    let cursor: string | null = null;
+
+    do {
+      const params = new URLSearchParams();
+      for (const [key, value] of Object.entries(options)) {
+        if (value !== undefined) params.set(key, value);
+      }
+      if (cursor) params.set("cursor", cursor);
+      const query = params.toString();
+      const url: string = query ? `${baseUrl}?${query}` : baseUrl;
+      const response = await fetchWithAuth(url, { method: "GET" });
+      const page = await handleResponse<Task[]>(response);
+      tasks.push(...page);
+      cursor = response.headers.get("X-Next-Cursor");
+    } while (cursor);
+
+    return tasks;
+  },
+
+  /**
+   * Subscribe to live task changes (Server-Sent Events)
+   * The browser reconnects automatically; a "resync" event is also sent when
+   * the stream (re)connects, so callers should refetch the list on it.
+   * @param userId - The user ID
+   * @param onEvent - Called for every change
+   * @returns Function that closes the stream
+   */
+  subscribeToTaskEvents(
+    userId: string,
+    onEvent: (event: TaskChangeEvent) => void
+  ): () => void {
+    const source = new EventSource(`${API_BASE_URL}/api/${userId}/tasks/events`);
+    source.addEventListener("ready", () => onEvent({ type: "resync", task_id: null, task: null }));
+    source.addEventListener("task", (message) => {
+      onEvent(JSON.parse((message as MessageEvent).data) as TaskChangeEvent);
+    });
+    return () => source.close();
   },
 
   /**
@@ -249,19 +296,22 @@ export const api = {
   },
 
   /**
-   * Get all conversations for a user
+   * Get one page of conversations for a user (most recently updated first)
    * @param userId - The user ID
-   * @returns Promise with list of conversations
+   * @param cursor - Optional next_cursor from a previous page
+   * @returns Promise with list of conversations and the next page cursor
    */
-  async getConversations(userId: string): Promise<{
+  async getConversations(userId: string, cursor?: string): Promise<{
     conversations: Array<{
       id: number;
       title: string;
       created_at: string;
       message_count: number;
     }>;
+    next_cursor: string | null;
   }> {
-    const url = `${API_BASE_URL}/api/${userId}/conversations`;
+    const baseUrl = `${API_BASE_URL}/api/${userId}/conversations`;
+    const url = cursor ? `${baseUrl}?cursor=${encodeURIComponent(cursor)}` : baseUrl;
     const response = await fetchWithAuth(url, { method: "GET" });
     return handleResponse(response);
   },
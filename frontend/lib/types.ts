@@ -21,6 +21,17 @@ export interface UpdateTaskDto {
   completed?: boolean;
 }
 
+/**
+ * Server-side filters and sort for GET /api/{user_id}/tasks
+ */
+export interface TaskListOptions {
+  status?: "all" | "pending" | "completed";
+  created_after?: string;
+  created_before?: string;
+  updated_since?: string;
+  sort?: "created_at" | "-created_at" | "updated_at" | "-updated_at";
+}
+
 export interface User {
   id: string;
   email: string;
@@ -31,3 +42,12 @@ export interface ApiError {
   detail: string;
   status_code: number;
 }
+
+/**
+ * Task change pushed by GET /api/{user_id}/tasks/events
+ */
+export interface TaskChangeEvent {
+  type: "created" | "updated" | "deleted" | "resync";
+  task_id: number | null;
+  task: Task | null;
+}
@@ -0,0 +1,280 @@
+"""
+Compact in-memory storage for the todo application.
+
+This module provides a TaskStorage that keeps tasks column by column
+(struct of arrays) instead of as one object per task:
+
+    ids          array('q')   - task IDs, kept sorted (lookups use bisect)
+    live         bytearray    - 0 marks a deleted row awaiting compaction
+    titles       list[str]    - interned, so repeated titles share one string
+    descriptions list         - mostly None, which costs only a pointer
+    completed    bytearray    - one byte per task
+    created_at   array('q')   - microseconds since 1970-01-01 (naive)
+    updated_at   array('q')
+
+There is no per-task object or dictionary entry, so a task costs a few
+dozen bytes plus its strings. Task objects are built only when a task is
+read, so they are copies: save changes with update().
+"""
+
+import sys
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional
+from .indexes import TaskQuery
+from .models import Task
+from .storage import TaskStorage, TaskView
+
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+# Rebuild the columns once this many rows (and at least half of them) are deleted
+_COMPACT_MIN_DELETED = 1024
+
+
+def _to_micros(value: datetime) -> int:
+    """Encode a naive datetime as integer microseconds since the epoch (exact)."""
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def _from_micros(value: int) -> datetime:
+    return _EPOCH + timedelta(0, 0, value)
+
+
+class CompactTaskStorage(TaskStorage):
+    """
+    Column-oriented in-memory task storage.
+
+    Drop-in replacement for TaskStorage for very large task sets. Tasks are
+    kept and listed in ID order, which is creation order for IDs from
+    generate_id(). Deletes leave a tombstone row that is reclaimed by
+    periodic compaction. Timestamps must be naive datetimes, as produced
+    by TaskOperations.
+    """
+
+    def _init_tasks(self) -> None:
+        """Initialize empty columns."""
+        self._ids = array("q")
+        self._live = bytearray()
+        self._titles: list = []
+        self._descriptions: list = []
+        self._completed = bytearray()
+        self._created_at = array("q")
+        self._updated_at = array("q")
+        self._count = 0
+        self._deleted = 0
+
+    def _find(self, task_id: int) -> Optional[int]:
+        """Return the row of a live task, or None."""
+        row = bisect_left(self._ids, task_id)
+        if row < len(self._ids) and self._ids[row] == task_id and self._live[row]:
+            return row
+        return None
+
+    @staticmethod
+    def _build(task_id, title, description, completed, created_at, updated_at) -> Task:
+        created = _from_micros(created_at)
+        # Never-edited tasks share one datetime for both timestamps
+        updated = created if updated_at == created_at else _from_micros(updated_at)
+        return Task(task_id, title, description, bool(completed), created, updated)
+
+    def _task_at(self, row: int) -> Task:
+        return self._build(
+            self._ids[row], self._titles[row], self._descriptions[row],
+            self._completed[row], self._created_at[row], self._updated_at[row],
+        )
+
+    def _write_row(self, row: int, task: Task) -> None:
+        self._titles[row] = sys.intern(task.title)
+        self._descriptions[row] = task.description
+        self._completed[row] = task.completed
+        self._created_at[row] = _to_micros(task.created_at)
+        self._updated_at[row] = _to_micros(task.updated_at)
+
+    def _insert_row(self, row: int, task_id: int) -> None:
+        """Open an empty row at `row`; appending when IDs arrive in order."""
+        if row == len(self._ids):
+            self._ids.append(task_id)
+            self._live.append(1)
+            self._titles.append("")
+            self._descriptions.append(None)
+            self._completed.append(0)
+            self._created_at.append(0)
+            self._updated_at.append(0)
+        else:
+            self._ids.insert(row, task_id)
+            self._live.insert(row, 1)
+            self._titles.insert(row, "")
+            self._descriptions.insert(row, None)
+            self._completed.insert(row, 0)
+            self._created_at.insert(row, 0)
+            self._updated_at.insert(row, 0)
+
+    def _compact(self) -> None:
+        """Drop tombstone rows."""
+        live = [row for row, flag in enumerate(self._live) if flag]
+        self._ids = array("q", (self._ids[row] for row in live))
+        self._live = bytearray(b"\x01" * len(live))
+        self._titles = [self._titles[row] for row in live]
+        self._descriptions = [self._descriptions[row] for row in live]
+        self._completed = bytearray(self._completed[row] for row in live)
+        self._created_at = array("q", (self._created_at[row] for row in live))
+        self._updated_at = array("q", (self._updated_at[row] for row in live))
+        self._deleted = 0
+
+    def add(self, task: Task) -> Task:
+        """
+        Add a task to storage.
+
+        Args:
+            task: The task to add
+
+        Returns:
+            Task: The added task
+        """
+        row = bisect_left(self._ids, task.id)
+        if row < len(self._ids) and self._ids[row] == task.id:
+            if not self._live[row]:
+                self._live[row] = 1
+                self._deleted -= 1
+                self._count += 1
+        else:
+            self._insert_row(row, task.id)
+            self._count += 1
+        self._write_row(row, task)
+        return task
+
+    def get(self, task_id: int) -> Optional[Task]:
+        """
+        Retrieve a task by ID.
+
+        Args:
+            task_id: The ID of the task to retrieve
+
+        Returns:
+            Optional[Task]: A copy of the task if found, None otherwise
+        """
+        row = self._find(task_id)
+        return self._task_at(row) if row is not None else None
+
+    def get_all(self) -> TaskView:
+        """
+        Retrieve all tasks.
+
+        Returns:
+            TaskView: Lazy view of all tasks in ID order
+        """
+        return TaskView(self._iter_tasks, lambda: self._count)
+
+    def _iter_tasks(self) -> Iterator[Task]:
+        columns = zip(
+            self._live, self._ids, self._titles, self._descriptions,
+            self._completed, self._created_at, self._updated_at,
+        )
+        for live, task_id, title, description, completed, created_at, updated_at in columns:
+            if not live:
+                continue
+            created = _EPOCH + timedelta(0, 0, created_at)
+            updated = created if updated_at == created_at else _EPOCH + timedelta(0, 0, updated_at)
+            yield Task(task_id, title, description, completed == 1, created, updated)
+
+    def query(self, query: TaskQuery) -> List[Task]:
+        """
+        Find tasks by status, date range and title prefix.
+
+        This store keeps no secondary indexes (they would cost more memory
+        than the columns themselves). Instead the status and date filters
+        are checked against the raw columns, and a Task object is only built
+        for a row that passes them.
+
+        Args:
+            query: Filters, sort order and limit
+
+        Returns:
+            List[Task]: Matching tasks in the requested order
+        """
+        low_created = _to_micros(query.created_since) if query.created_since else None
+        high_created = _to_micros(query.created_before) if query.created_before else None
+        low_updated = _to_micros(query.updated_since) if query.updated_since else None
+        high_updated = _to_micros(query.updated_before) if query.updated_before else None
+        status = None if query.completed is None else int(query.completed)
+
+        def rows() -> Iterator[int]:
+            for row, live in enumerate(self._live):
+                if not live:
+                    continue
+                if status is not None and self._completed[row] != status:
+                    continue
+                if low_created is not None and self._created_at[row] < low_created:
+                    continue
+                if high_created is not None and self._created_at[row] >= high_created:
+                    continue
+                if low_updated is not None and self._updated_at[row] < low_updated:
+                    continue
+                if high_updated is not None and self._updated_at[row] >= high_updated:
+                    continue
+                yield row
+
+        # Rows are in ID order, which lets ID-sorted queries stop at the limit
+        if query.order_by == "id":
+            order = reversed(list(rows())) if query.descending else rows()
+            return query.apply((self._task_at(row) for row in order), presorted=True)
+        return query.apply(self._task_at(row) for row in rows())
+
+    def count_completed(self) -> int:
+        """Count completed tasks straight from the column (no Task objects)."""
+        return self._completed.count(1)
+
+    def update(self, task_id: int, task: Task) -> Optional[Task]:
+        """
+        Update an existing task.
+
+        Args:
+            task_id: The ID of the task to update
+            task: The updated task object
+
+        Returns:
+            Optional[Task]: The updated task if found, None otherwise
+        """
+        row = self._find(task_id)
+        if row is None:
+            return None
+        self._write_row(row, task)
+        return task
+
+    def delete(self, task_id: int) -> bool:
+        """
+        Delete a task from storage.
+
+        Args:
+            task_id: The ID of the task to delete
+
+        Returns:
+            bool: True if task was deleted, False if not found
+        """
+        row = self._find(task_id)
+        if row is None:
+            return False
+        self._live[row] = 0
+        self._titles[row] = ""
+        self._descriptions[row] = None
+        self._completed[row] = 0
+        self._count -= 1
+        self._deleted += 1
+        if self._deleted >= _COMPACT_MIN_DELETED and self._deleted * 2 >= len(self._ids):
+            self._compact()
+        return True
+
+    def exists(self, task_id: int) -> bool:
+        """
+        Check if a task exists in storage.
+
+        Args:
+            task_id: The ID of the task to check
+
+        Returns:
+            bool: True if task exists, False otherwise
+        """
+        return self._find(task_id) is not None
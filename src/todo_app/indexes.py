@@ -0,0 +1,296 @@
+"""
+Secondary indexes and queries for the todo application.
+
+This module defines TaskQuery (the filter, sort and limit of a task query)
+and TaskIndex, the secondary indexes TaskStorage maintains so queries do
+not have to scan every task:
+
+    status      two sorted ID lists, pending and completed
+    created_at  sorted (created_at, id) pairs - range lookups by bisect
+    updated_at  sorted (updated_at, id) pairs
+    title       sorted (casefolded title, id) pairs - prefix lookups by bisect
+
+Each index is a sorted list split into bounded chunks, so keeping it up
+to date costs O(log n) plus a small copy per change. A query is driven by
+the index that should visit the fewest tasks: the smallest filtered range
+(sized by bisection), or, with a limit, the index of the sort field, which
+yields tasks already in order and stops early. The other filters are
+checked on the candidates only.
+"""
+
+import heapq
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from .models import Task
+
+
+ORDER_FIELDS = ("id", "created_at", "updated_at", "title")
+
+# Sorts after every real character, so (prefix + _MAX_CHAR) bounds a prefix range
+_MAX_CHAR = "\U0010ffff"
+
+
+def _title_key(title: str) -> str:
+    return title.casefold()
+
+
+_SORT_KEYS: Dict[str, Callable[[Task], tuple]] = {
+    "id": lambda task: (task.id,),
+    "created_at": lambda task: (task.created_at, task.id),
+    "updated_at": lambda task: (task.updated_at, task.id),
+    "title": lambda task: (_title_key(task.title), task.id),
+}
+
+
+@dataclass(frozen=True)
+class TaskQuery:
+    """
+    Filter, sort and limit for a task query.
+
+    Attributes:
+        completed: Only completed (True) or pending (False) tasks
+        created_since: Created at or after this time
+        created_before: Created strictly before this time
+        updated_since: Last updated at or after this time
+        updated_before: Last updated strictly before this time
+        title_prefix: Title starts with this text (case-insensitive)
+        order_by: One of ORDER_FIELDS; ties are broken by ID
+        descending: Reverse the sort order
+        limit: Return at most this many tasks
+    """
+    completed: Optional[bool] = None
+    created_since: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    updated_since: Optional[datetime] = None
+    updated_before: Optional[datetime] = None
+    title_prefix: Optional[str] = None
+    order_by: str = "id"
+    descending: bool = False
+    limit: Optional[int] = None
+
+    def matches(self, task: Task) -> bool:
+        """Check a task against every filter."""
+        if self.completed is not None and task.completed != self.completed:
+            return False
+        if self.created_since is not None and task.created_at < self.created_since:
+            return False
+        if self.created_before is not None and task.created_at >= self.created_before:
+            return False
+        if self.updated_since is not None and task.updated_at < self.updated_since:
+            return False
+        if self.updated_before is not None and task.updated_at >= self.updated_before:
+            return False
+        if self.title_prefix and not _title_key(task.title).startswith(_title_key(self.title_prefix)):
+            return False
+        return True
+
+    def apply(self, tasks: Iterable[Task], presorted: bool = False) -> List[Task]:
+        """
+        Filter, sort and limit tasks.
+
+        Args:
+            tasks: Candidate tasks
+            presorted: The candidates already arrive in the requested order
+
+        Returns:
+            List[Task]: The matching tasks
+        """
+        matching = (task for task in tasks if self.matches(task))
+        if presorted:
+            return list(islice(matching, self.limit))
+        key = _SORT_KEYS[self.order_by]
+        if self.limit is None:
+            return sorted(matching, key=key, reverse=self.descending)
+        select = heapq.nlargest if self.descending else heapq.nsmallest
+        return select(self.limit, matching, key=key)
+
+
+class _SortedList:
+    """
+    Sorted list split into bounded chunks.
+
+    A plain sorted list shifts every later entry on each insert or delete
+    (about 20 us at 200k entries); here only one chunk of at most
+    2 * _CHUNK entries moves. Positions are (chunk, offset) pairs.
+    """
+
+    _CHUNK = 1000
+
+    def __init__(self) -> None:
+        self._chunks: List[list] = []
+        self._maxes: list = []
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def add(self, item) -> None:
+        self._len += 1
+        if not self._chunks:
+            self._chunks.append([item])
+            self._maxes.append(item)
+            return
+        i = bisect_left(self._maxes, item)
+        if i == len(self._maxes):
+            # New largest item (the common case for IDs and timestamps)
+            i -= 1
+            self._chunks[i].append(item)
+            self._maxes[i] = item
+        else:
+            insort(self._chunks[i], item)
+        chunk = self._chunks[i]
+        if len(chunk) > 2 * self._CHUNK:
+            self._chunks[i:i + 1] = [chunk[:self._CHUNK], chunk[self._CHUNK:]]
+            self._maxes[i:i + 1] = [chunk[self._CHUNK - 1], chunk[-1]]
+
+    def discard(self, item) -> None:
+        i = bisect_left(self._maxes, item)
+        if i == len(self._maxes):
+            return
+        chunk = self._chunks[i]
+        j = bisect_left(chunk, item)
+        if chunk[j] != item:
+            return
+        del chunk[j]
+        self._len -= 1
+        if chunk:
+            self._maxes[i] = chunk[-1]
+        else:
+            del self._chunks[i]
+            del self._maxes[i]
+
+    def position(self, item) -> Tuple[int, int]:
+        """Position of the first entry >= item."""
+        i = bisect_left(self._maxes, item)
+        if i == len(self._maxes):
+            return (i, 0)
+        return (i, bisect_left(self._chunks[i], item))
+
+    def end(self) -> Tuple[int, int]:
+        return (len(self._chunks), 0)
+
+    def count(self, start: Tuple[int, int], stop: Tuple[int, int]) -> int:
+        """Number of entries from start up to (not including) stop."""
+        if start >= stop:
+            return 0
+        if start[0] == stop[0]:
+            return stop[1] - start[1]
+        middle = sum(len(chunk) for chunk in self._chunks[start[0] + 1:stop[0]])
+        return len(self._chunks[start[0]]) - start[1] + middle + stop[1]
+
+    def walk(self, start: Tuple[int, int], stop: Tuple[int, int], reverse: bool = False) -> Iterator:
+        """Yield the entries from start up to (not including) stop."""
+        if start >= stop:
+            return
+        last = min(stop[0], len(self._chunks) - 1)
+        chunks = range(last, start[0] - 1, -1) if reverse else range(start[0], last + 1)
+        for c in chunks:
+            chunk = self._chunks[c]
+            lo = start[1] if c == start[0] else 0
+            hi = stop[1] if c == stop[0] else len(chunk)
+            rows = range(hi - 1, lo - 1, -1) if reverse else range(lo, hi)
+            for row in rows:
+                yield chunk[row]
+
+
+class TaskIndex:
+    """
+    Secondary indexes over a set of tasks.
+
+    The indexed values of every task are remembered, so a task can be
+    re-indexed even when the caller changed the Task object in place
+    before saving it (as TaskOperations does).
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty indexes."""
+        self._keys: Dict[int, Tuple[bool, datetime, datetime, str]] = {}
+        self._status = {False: _SortedList(), True: _SortedList()}  # task IDs
+        self._created = _SortedList()  # (created_at, id)
+        self._updated = _SortedList()  # (updated_at, id)
+        self._titles = _SortedList()   # (casefolded title, id)
+
+    def add(self, task: Task) -> None:
+        """Index a new task, or re-index a changed one."""
+        keys = (task.completed, task.created_at, task.updated_at, _title_key(task.title))
+        old = self._keys.get(task.id)
+        if old == keys:
+            return
+        if old is not None:
+            self.remove(task.id)
+        self._keys[task.id] = keys
+        self._status[task.completed].add(task.id)
+        self._created.add((keys[1], task.id))
+        self._updated.add((keys[2], task.id))
+        self._titles.add((keys[3], task.id))
+
+    def remove(self, task_id: int) -> None:
+        """Drop a task from every index."""
+        keys = self._keys.pop(task_id, None)
+        if keys is None:
+            return
+        completed, created_at, updated_at, title = keys
+        self._status[completed].discard(task_id)
+        self._created.discard((created_at, task_id))
+        self._updated.discard((updated_at, task_id))
+        self._titles.discard((title, task_id))
+
+    def count(self, completed: bool) -> int:
+        """Count completed or pending tasks in O(1)."""
+        return len(self._status[completed])
+
+    def candidates(self, query: TaskQuery) -> Tuple[Optional[Iterator[int]], bool]:
+        """
+        Plan a query.
+
+        Returns:
+            The candidate task IDs (None means every task), and whether
+            they come in the query's sort order.
+        """
+        # (size, order, index, start, stop, entries_are_pairs)
+        plans = []
+        if query.completed is not None:
+            ids = self._status[query.completed]
+            plans.append((len(ids), "id", ids, (0, 0), ids.end(), False))
+        if query.created_since is not None or query.created_before is not None:
+            plans.append(self._range(self._created, "created_at", query.created_since, query.created_before))
+        if query.updated_since is not None or query.updated_before is not None:
+            plans.append(self._range(self._updated, "updated_at", query.updated_since, query.updated_before))
+        if query.title_prefix:
+            prefix = _title_key(query.title_prefix)
+            plans.append(self._range(self._titles, "title", prefix, prefix + _MAX_CHAR))
+
+        # Walking the index of the sort field can stop at the limit, so it
+        # may beat a smaller but unordered candidate set
+        by_order = {"created_at": self._created, "updated_at": self._updated, "title": self._titles}
+        if query.order_by in by_order and all(plan[1] != query.order_by for plan in plans):
+            full = by_order[query.order_by]
+            plans.append((len(full), query.order_by, full, (0, 0), full.end(), True))
+        if not plans:
+            return None, False
+
+        # Cost = candidates visited. An ordered walk with a limit stops after
+        # about limit / (fraction of candidates that match) entries, and at
+        # most the smallest candidate set can match.
+        matching = min(plan[0] for plan in plans)
+
+        def cost(plan: tuple) -> float:
+            if plan[1] != query.order_by or query.limit is None:
+                return plan[0]
+            return min(plan[0], query.limit * plan[0] / max(matching, 1))
+
+        _, order, index, start, stop, pairs = min(plans, key=cost)
+        presorted = order == query.order_by
+        entries = index.walk(start, stop, reverse=presorted and query.descending)
+        if pairs:
+            return (task_id for _, task_id in entries), presorted
+        return entries, presorted
+
+    @staticmethod
+    def _range(index: _SortedList, order: str, low, high) -> tuple:
+        start = index.position((low,)) if low is not None else (0, 0)
+        stop = index.position((high,)) if high is not None else index.end()
+        return (index.count(start, stop), order, index, start, stop, True)
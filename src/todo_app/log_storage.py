@@ -0,0 +1,259 @@
+"""
+Durable storage for the todo application.
+
+This module provides a TaskStorage backed by an append-only operation log
+plus periodic compacted snapshots, so tasks survive restarts.
+
+On-disk layout (inside the data directory):
+    snapshot.json  - every live task and the ID counter as of log sequence N
+    tasks.log      - one JSON record per change made after the snapshot
+
+Every change is appended to the log; fsync is batched. After
+`snapshot_every` changes the live tasks are written to a new snapshot
+(atomically, via rename) and the log is truncated. Startup loads the
+snapshot and replays only the log tail, so startup time and write latency
+depend on the number of live tasks, not on the length of the history.
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+from .models import Task
+from .storage import TaskStorage
+
+
+SNAPSHOT_FILE = "snapshot.json"
+LOG_FILE = "tasks.log"
+
+
+def task_to_record(task: Task) -> Dict[str, Any]:
+    """Serialize a task to a JSON-compatible dict."""
+    return {
+        "id": task.id,
+        "title": task.title,
+        "description": task.description,
+        "completed": task.completed,
+        "created_at": task.created_at.isoformat(),
+        "updated_at": task.updated_at.isoformat(),
+    }
+
+
+def task_from_record(record: Dict[str, Any]) -> Task:
+    """Rebuild a task from a dict produced by task_to_record."""
+    return Task(
+        id=record["id"],
+        title=record["title"],
+        description=record["description"],
+        completed=record["completed"],
+        created_at=datetime.fromisoformat(record["created_at"]),
+        updated_at=datetime.fromisoformat(record["updated_at"]),
+    )
+
+
+class LogTaskStorage(TaskStorage):
+    """
+    Task storage persisted as an append-only log with snapshots.
+
+    Reads are served from the in-memory dictionary inherited from
+    TaskStorage; only writes touch the disk. Use as a context manager, or
+    call close(), so buffered log records are flushed and fsynced on exit.
+    """
+
+    def __init__(
+        self,
+        data_dir: str,
+        snapshot_every: int = 10_000,
+        sync_every: int = 64,
+        sync_interval: float = 1.0,
+    ) -> None:
+        """
+        Open (or create) a storage directory and load its tasks.
+
+        Args:
+            data_dir: Directory holding the snapshot and the log
+            snapshot_every: Compact into a new snapshot after this many logged changes
+            sync_every: fsync the log after this many unsynced changes...
+            sync_interval: ...or once this many seconds passed since the last fsync
+        """
+        super().__init__()
+        self.data_dir = data_dir
+        self.snapshot_every = snapshot_every
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+
+        self._seq: int = 0  # Sequence number of the last applied change
+        self._snapshot_seq: int = 0
+        self._unsynced: int = 0
+        self._last_sync: float = time.monotonic()
+
+        os.makedirs(data_dir, exist_ok=True)
+        self._snapshot_path = os.path.join(data_dir, SNAPSHOT_FILE)
+        self._log_path = os.path.join(data_dir, LOG_FILE)
+        self._load()
+        self._log = open(self._log_path, "a", encoding="utf-8")
+
+    # ----- Recovery -----
+
+    def _load(self) -> None:
+        """Load the latest snapshot, then replay the log records after it."""
+        if os.path.exists(self._snapshot_path):
+            with open(self._snapshot_path, encoding="utf-8") as f:
+                snapshot = json.load(f)
+            self._seq = self._snapshot_seq = snapshot["seq"]
+            self._next_id = snapshot["next_id"]
+            for record in snapshot["tasks"]:
+                # The base-class add indexes the task without logging it again
+                super().add(task_from_record(record))
+
+        if not os.path.exists(self._log_path):
+            return
+
+        valid_bytes = 0
+        with open(self._log_path, "rb") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn final write from a crash: drop it and everything after
+                    break
+                valid_bytes += len(line)
+                # Records already folded into the snapshot (crash before truncation)
+                if record["seq"] <= self._snapshot_seq:
+                    continue
+                self._apply(record)
+
+        if valid_bytes < os.path.getsize(self._log_path):
+            with open(self._log_path, "r+b") as f:
+                f.truncate(valid_bytes)
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        """Apply one log record to the in-memory state."""
+        self._seq = record["seq"]
+        if record["op"] == "put":
+            task = super().add(task_from_record(record["task"]))
+            self._next_id = max(self._next_id, task.id + 1)
+        elif record["op"] == "delete":
+            super().delete(record["id"])
+
+    # ----- Writing -----
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        """Append a change to the log, syncing and compacting as configured."""
+        self._seq += 1
+        record["seq"] = self._seq
+        self._log.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._unsynced += 1
+
+        if (self._unsynced >= self.sync_every
+                or time.monotonic() - self._last_sync >= self.sync_interval):
+            self.sync()
+        if self._seq - self._snapshot_seq >= self.snapshot_every:
+            self.snapshot()
+
+    def sync(self) -> None:
+        """Flush buffered log records and fsync them to disk."""
+        self._log.flush()
+        os.fsync(self._log.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def snapshot(self) -> None:
+        """
+        Write all live tasks to a new snapshot and truncate the log.
+
+        The snapshot is written to a temporary file, fsynced and renamed
+        over the old one, so a crash at any point leaves either the old
+        snapshot plus the full log or the new snapshot.
+        """
+        self.sync()
+        snapshot = {
+            "seq": self._seq,
+            "next_id": self._next_id,
+            "tasks": [task_to_record(task) for task in self._tasks.values()],
+        }
+        tmp_path = self._snapshot_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._snapshot_path)
+        self._fsync_dir()
+
+        self._log.truncate(0)
+        self._log.seek(0)
+        self._snapshot_seq = self._seq
+
+    def _fsync_dir(self) -> None:
+        """Persist the rename itself (no-op where directories cannot be opened)."""
+        try:
+            fd = os.open(self.data_dir, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def close(self) -> None:
+        """Flush and fsync pending changes and close the log."""
+        if not self._log.closed:
+            self.sync()
+            self._log.close()
+
+    def __enter__(self) -> "LogTaskStorage":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    # ----- TaskStorage interface -----
+
+    def add(self, task: Task) -> Task:
+        """
+        Add a task to storage and log it.
+
+        Args:
+            task: The task to add
+
+        Returns:
+            Task: The added task
+        """
+        super().add(task)
+        self._next_id = max(self._next_id, task.id + 1)
+        self._append({"op": "put", "task": task_to_record(task)})
+        return task
+
+    def update(self, task_id: int, task: Task) -> Optional[Task]:
+        """
+        Update an existing task and log its new state.
+
+        Args:
+            task_id: The ID of the task to update
+            task: The updated task object
+
+        Returns:
+            Optional[Task]: The updated task if found, None otherwise
+        """
+        updated = super().update(task_id, task)
+        if updated is not None:
+            self._append({"op": "put", "task": task_to_record(updated)})
+        return updated
+
+    def delete(self, task_id: int) -> bool:
+        """
+        Delete a task from storage and log the deletion.
+
+        Args:
+            task_id: The ID of the task to delete
+
+        Returns:
+            bool: True if task was deleted, False if not found
+        """
+        deleted = super().delete(task_id)
+        if deleted:
+            self._append({"op": "delete", "id": task_id})
+        return deleted
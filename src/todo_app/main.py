@@ -4,11 +4,40 @@ Main entry point for the todo application.
 This module initializes the application components and runs the main loop.
 """
 
-from .storage import TaskStorage
+import os
+
+from .log_storage import LogTaskStorage
 from .operations import TaskOperations
+from .sqlite_storage import SqliteTaskStorage
+from .storage import TaskStorage
 from .ui import ConsoleUI
 
 
+# Where persistent backends keep tasks between runs (override with TODO_DATA_DIR)
+DEFAULT_DATA_DIR = os.path.join(os.path.expanduser("~"), ".todo_app")
+
+
+def create_storage() -> TaskStorage:
+    """
+    Build the storage backend selected by the TODO_STORAGE environment variable.
+
+    "memory" (default) keeps tasks for the session only; "log" keeps them in
+    memory backed by an append-only log; "sqlite" keeps them in a SQLite
+    database, for very large task sets. Both persistent backends write
+    under TODO_DATA_DIR.
+    """
+    backend = os.environ.get("TODO_STORAGE", "memory")
+    if backend == "memory":
+        return TaskStorage()
+    data_dir = os.environ.get("TODO_DATA_DIR", DEFAULT_DATA_DIR)
+    if backend == "sqlite":
+        os.makedirs(data_dir, exist_ok=True)
+        return SqliteTaskStorage(os.path.join(data_dir, "tasks.db"))
+    if backend == "log":
+        return LogTaskStorage(data_dir)
+    raise ValueError(f"Unknown TODO_STORAGE backend: {backend}")
+
+
 def main() -> None:
     """Main application entry point."""
     # Display welcome message
@@ -18,7 +47,7 @@ def main() -> None:
     print("=" * 50)
 
     # Initialize components
-    storage = TaskStorage()
+    storage = create_storage()
     operations = TaskOperations(storage)
     ui = ConsoleUI(operations)
 
@@ -53,6 +82,9 @@ def main() -> None:
     except Exception as e:
         print(f"\n❌ Fatal error: {e}")
         print("Application terminated unexpectedly\n")
+    finally:
+        # Flush pending changes of a persistent backend to disk
+        storage.close()
 
 
 if __name__ == "__main__":
@@ -9,11 +9,14 @@ from datetime import datetime
 from typing import Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class Task:
     """
     Represents a todo task.
 
+    Slotted: instances carry no per-instance __dict__, roughly halving
+    their size when many tasks are held in memory.
+
     Attributes:
         id: Unique identifier for the task
         title: Task title (1-200 characters)
@@ -6,8 +6,9 @@ This module provides task operations with validation and error handling.
 
 from datetime import datetime
 from typing import List, Optional
+from .indexes import ORDER_FIELDS, TaskQuery
 from .models import Task
-from .storage import TaskStorage
+from .storage import TaskStorage, TaskView
 
 
 class TaskOperations:
@@ -70,15 +71,64 @@ class TaskOperations:
 
         return self.storage.add(task)
 
-    def list_tasks(self) -> List[Task]:
+    def list_tasks(self) -> TaskView:
         """
         List all tasks.
 
         Returns:
-            List[Task]: List of all tasks
+            TaskView: Lazy view of all tasks
         """
         return self.storage.get_all()
 
+    def query(
+        self,
+        completed: Optional[bool] = None,
+        created_since: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        updated_since: Optional[datetime] = None,
+        updated_before: Optional[datetime] = None,
+        title_prefix: Optional[str] = None,
+        order_by: str = "id",
+        descending: bool = False,
+        limit: Optional[int] = None
+    ) -> List[Task]:
+        """
+        Find tasks using the storage's secondary indexes.
+
+        Args:
+            completed: Only completed (True) or pending (False) tasks
+            created_since: Created at or after this time
+            created_before: Created before this time
+            updated_since: Last updated at or after this time
+            updated_before: Last updated before this time
+            title_prefix: Title starts with this text (case-insensitive)
+            order_by: Sort field: id, created_at, updated_at or title
+            descending: Sort in reverse order
+            limit: Return at most this many tasks
+
+        Returns:
+            List[Task]: Matching tasks in the requested order
+
+        Raises:
+            ValueError: If the sort field or limit is invalid
+        """
+        if order_by not in ORDER_FIELDS:
+            raise ValueError(f"Cannot sort by '{order_by}'; use one of: {', '.join(ORDER_FIELDS)}")
+        if limit is not None and limit < 0:
+            raise ValueError("Limit cannot be negative")
+
+        return self.storage.query(TaskQuery(
+            completed=completed,
+            created_since=created_since,
+            created_before=created_before,
+            updated_since=updated_since,
+            updated_before=updated_before,
+            title_prefix=title_prefix.strip() if title_prefix else None,
+            order_by=order_by,
+            descending=descending,
+            limit=limit
+        ))
+
     def update_task(
         self,
         task_id: int,
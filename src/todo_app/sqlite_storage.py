@@ -0,0 +1,346 @@
+"""
+SQLite storage for the todo application.
+
+This module provides a TaskStorage that keeps tasks in a SQLite database
+instead of memory, for task sets too large to hold in RAM.
+
+- WAL journaling, so readers never block the writer and commits are cheap
+- Constant SQL text throughout, so every statement is served from the
+  connection's prepared statement cache
+- Task IDs come from SQLite's AUTOINCREMENT rowid allocation
+- Multi-task changes can be grouped into one transaction with transaction()
+  or add_many()
+- query() is answered by SQL over indexes on status, dates and title; the
+  title index is on a casefolded copy of the title (title_key), so prefix
+  matches and title order agree with the in-memory TaskIndex for any script
+"""
+
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional
+from .indexes import TaskQuery
+from .models import Task
+from .storage import TaskStorage, TaskView
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    description TEXT,
+    completed INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    title_key TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_completed ON tasks (completed);
+CREATE INDEX IF NOT EXISTS idx_tasks_created_at ON tasks (created_at);
+CREATE INDEX IF NOT EXISTS idx_tasks_updated_at ON tasks (updated_at);
+"""
+# Databases created before title_key: add and fill the column (see _migrate)
+_TITLE_KEY_ADD = "ALTER TABLE tasks ADD COLUMN title_key TEXT NOT NULL DEFAULT ''"
+_TITLE_KEY_FILL = "UPDATE tasks SET title_key = ? WHERE id = ?"
+_TITLE_KEY_INDEX = """
+DROP INDEX IF EXISTS idx_tasks_title;
+CREATE INDEX IF NOT EXISTS idx_tasks_title_key ON tasks (title_key);
+"""
+
+_COLUMNS = "id, title, description, completed, created_at, updated_at"
+_INSERT = f"INSERT OR REPLACE INTO tasks ({_COLUMNS}, title_key) VALUES (?, ?, ?, ?, ?, ?, ?)"
+_SELECT_ONE = f"SELECT {_COLUMNS} FROM tasks WHERE id = ?"
+_SELECT_ALL = f"SELECT {_COLUMNS} FROM tasks ORDER BY id"
+_SELECT_NTH = f"SELECT {_COLUMNS} FROM tasks ORDER BY id LIMIT 1 OFFSET ?"
+_UPDATE = (
+    "UPDATE tasks SET title = ?, title_key = ?, description = ?, completed = ?, updated_at = ? "
+    "WHERE id = ?"
+)
+_DELETE = "DELETE FROM tasks WHERE id = ?"
+_EXISTS = "SELECT 1 FROM tasks WHERE id = ?"
+_COUNT = "SELECT COUNT(*) FROM tasks"
+_SEQUENCE_INIT = (
+    "INSERT INTO sqlite_sequence (name, seq) "
+    "SELECT 'tasks', 0 WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = 'tasks')"
+)
+_SEQUENCE_NEXT = "UPDATE sqlite_sequence SET seq = seq + 1 WHERE name = 'tasks'"
+_SEQUENCE_GET = "SELECT seq FROM sqlite_sequence WHERE name = 'tasks'"
+
+# Query building blocks: the SQL text only varies with which filters are set
+_ORDER_COLUMNS = {
+    "id": "id",
+    "created_at": "created_at, id",
+    "updated_at": "updated_at, id",
+    "title": "title_key, id",
+}
+_MAX_CHAR = "\U0010ffff"
+
+
+def _to_row(task: Task) -> tuple:
+    return (
+        task.id,
+        task.title,
+        task.description,
+        int(task.completed),
+        task.created_at.isoformat(),
+        task.updated_at.isoformat(),
+        task.title.casefold(),
+    )
+
+
+def _from_row(row: tuple) -> Task:
+    return Task(
+        id=row[0],
+        title=row[1],
+        description=row[2],
+        completed=bool(row[3]),
+        created_at=datetime.fromisoformat(row[4]),
+        updated_at=datetime.fromisoformat(row[5]),
+    )
+
+
+class SqliteTaskStorage(TaskStorage):
+    """
+    SQLite-backed task storage.
+
+    Drop-in replacement for TaskStorage: TaskOperations works with it
+    unchanged. Tasks are read from the database on demand; nothing is
+    cached in memory, so the returned Task objects are copies and changes
+    to them must be saved with update().
+    """
+
+    def __init__(self, path: str, cached_statements: int = 256) -> None:
+        """
+        Open (or create) the database.
+
+        Args:
+            path: Database file path (":memory:" for a throwaway database)
+            cached_statements: Size of the connection's prepared statement cache
+        """
+        super().__init__()
+        # Autocommit mode: each write commits on its own unless inside transaction()
+        self._conn = sqlite3.connect(
+            path, isolation_level=None, cached_statements=cached_statements
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._depth = 0
+        self._migrate()
+        self._conn.execute(_SEQUENCE_INIT)
+
+    def _migrate(self) -> None:
+        """Add and fill title_key in databases created without it."""
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(tasks)")}
+        if "title_key" not in columns:
+            with self.transaction():
+                self._conn.execute(_TITLE_KEY_ADD)
+                self._conn.executemany(
+                    _TITLE_KEY_FILL,
+                    ((title.casefold(), task_id) for task_id, title in
+                     self._conn.execute("SELECT id, title FROM tasks").fetchall())
+                )
+        self._conn.executescript(_TITLE_KEY_INDEX)
+
+    def _init_tasks(self) -> None:
+        """Tasks live in the database: no in-memory dictionary or indexes."""
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Group several changes into a single transaction (and a single fsync).
+
+        Nested blocks join the outermost transaction. On error every change
+        made inside the block is rolled back.
+        """
+        if self._depth == 0:
+            self._conn.execute("BEGIN IMMEDIATE")
+        self._depth += 1
+        try:
+            yield
+        except BaseException:
+            self._depth -= 1
+            if self._depth == 0:
+                self._conn.execute("ROLLBACK")
+            raise
+        self._depth -= 1
+        if self._depth == 0:
+            self._conn.execute("COMMIT")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+    def __enter__(self) -> "SqliteTaskStorage":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def generate_id(self) -> int:
+        """
+        Reserve the next task ID from SQLite's AUTOINCREMENT sequence.
+
+        Returns:
+            int: The next available task ID
+        """
+        with self.transaction():
+            self._conn.execute(_SEQUENCE_NEXT)
+            return self._conn.execute(_SEQUENCE_GET).fetchone()[0]
+
+    def add(self, task: Task) -> Task:
+        """
+        Add a task to storage.
+
+        Args:
+            task: The task to add
+
+        Returns:
+            Task: The added task
+        """
+        self._conn.execute(_INSERT, _to_row(task))
+        return task
+
+    def add_many(self, tasks: Iterable[Task]) -> int:
+        """
+        Add many tasks in one transaction.
+
+        Args:
+            tasks: Tasks with IDs already assigned
+
+        Returns:
+            int: Number of tasks written
+        """
+        with self.transaction():
+            cursor = self._conn.executemany(_INSERT, (_to_row(task) for task in tasks))
+        return cursor.rowcount
+
+    def get(self, task_id: int) -> Optional[Task]:
+        """
+        Retrieve a task by ID.
+
+        Args:
+            task_id: The ID of the task to retrieve
+
+        Returns:
+            Optional[Task]: The task if found, None otherwise
+        """
+        row = self._conn.execute(_SELECT_ONE, (task_id,)).fetchone()
+        return _from_row(row) if row else None
+
+    def get_all(self) -> TaskView:
+        """
+        Retrieve all tasks, ordered by ID.
+
+        Returns:
+            TaskView: Lazy view of all tasks; rows are read as it is iterated
+        """
+        return TaskView(self.iter_all, self.count, self._nth)
+
+    def _nth(self, index: int) -> Task:
+        return _from_row(self._conn.execute(_SELECT_NTH, (index,)).fetchone())
+
+    def iter_all(self, batch_size: int = 1000) -> Iterator[Task]:
+        """
+        Stream all tasks, ordered by ID, without materializing the whole table.
+
+        Args:
+            batch_size: Rows fetched from SQLite per round
+
+        Yields:
+            Task: Each stored task
+        """
+        cursor = self._conn.execute(_SELECT_ALL)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            for row in rows:
+                yield _from_row(row)
+
+    def count(self) -> int:
+        """Return the number of stored tasks."""
+        return self._conn.execute(_COUNT).fetchone()[0]
+
+    def query(self, query: TaskQuery) -> List[Task]:
+        """
+        Find tasks by status, date range and title prefix.
+
+        Timestamps are stored as ISO 8601 text, which sorts chronologically,
+        so date ranges are index range scans. Title prefixes are matched
+        on the casefolded title, like TaskIndex ("STRASSE" finds "Straße").
+
+        Args:
+            query: Filters, sort order and limit
+
+        Returns:
+            List[Task]: Matching tasks in the requested order
+        """
+        clauses, params = [], []
+        if query.completed is not None:
+            clauses.append("completed = ?")
+            params.append(int(query.completed))
+        for column, since, before in (
+            ("created_at", query.created_since, query.created_before),
+            ("updated_at", query.updated_since, query.updated_before),
+        ):
+            if since is not None:
+                clauses.append(f"{column} >= ?")
+                params.append(since.isoformat())
+            if before is not None:
+                clauses.append(f"{column} < ?")
+                params.append(before.isoformat())
+        if query.title_prefix:
+            prefix = query.title_prefix.casefold()
+            clauses.append("title_key >= ? AND title_key < ?")
+            params.extend((prefix, prefix + _MAX_CHAR))
+
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        direction = " DESC" if query.descending else ""
+        order = ", ".join(
+            column + direction for column in _ORDER_COLUMNS[query.order_by].split(", ")
+        )
+        sql = f"SELECT {_COLUMNS} FROM tasks{where} ORDER BY {order} LIMIT ?"
+        params.append(query.limit if query.limit is not None else -1)
+        return [_from_row(row) for row in self._conn.execute(sql, params)]
+
+    def update(self, task_id: int, task: Task) -> Optional[Task]:
+        """
+        Update an existing task.
+
+        Args:
+            task_id: The ID of the task to update
+            task: The updated task object
+
+        Returns:
+            Optional[Task]: The updated task if found, None otherwise
+        """
+        cursor = self._conn.execute(
+            _UPDATE,
+            (task.title, task.title.casefold(), task.description, int(task.completed),
+             task.updated_at.isoformat(), task_id)
+        )
+        return task if cursor.rowcount else None
+
+    def delete(self, task_id: int) -> bool:
+        """
+        Delete a task from storage.
+
+        Args:
+            task_id: The ID of the task to delete
+
+        Returns:
+            bool: True if task was deleted, False if not found
+        """
+        return self._conn.execute(_DELETE, (task_id,)).rowcount > 0
+
+    def exists(self, task_id: int) -> bool:
+        """
+        Check if a task exists in storage.
+
+        Args:
+            task_id: The ID of the task to check
+
+        Returns:
+            bool: True if task exists, False otherwise
+        """
+        return self._conn.execute(_EXISTS, (task_id,)).fetchone() is not None
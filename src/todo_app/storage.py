@@ -1,25 +1,86 @@
 """
 Storage layer for the todo application.
 
-This module provides in-memory storage for tasks with CRUD operations.
+This module provides in-memory storage for tasks with CRUD operations
+and indexed queries.
 """
 
-from typing import Dict, List, Optional
+from itertools import islice
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Union, overload
+from .indexes import TaskIndex, TaskQuery
 from .models import Task
 
 
+class TaskView(Sequence[Task]):
+    """
+    Lazy, read-only sequence of the tasks in a storage.
+
+    Nothing is copied up front: iteration and len() go straight to the
+    storage, so listing a million tasks does not build a million-entry
+    list. The view is live (it reflects later changes); do not add or
+    delete tasks while iterating over it.
+    """
+
+    def __init__(
+        self,
+        iterate: Callable[[], Iterator[Task]],
+        length: Callable[[], int],
+        item: Optional[Callable[[int], Task]] = None,
+    ) -> None:
+        self._iterate = iterate
+        self._length = length
+        self._item = item
+
+    def __iter__(self) -> Iterator[Task]:
+        return self._iterate()
+
+    def __len__(self) -> int:
+        return self._length()
+
+    @overload
+    def __getitem__(self, index: int) -> Task: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "list[Task]": ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Task, "list[Task]"]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("task index out of range")
+        if self._item is not None:
+            return self._item(index)
+        return next(islice(self._iterate(), index, None))
+
+    def __repr__(self) -> str:
+        return f"<TaskView of {len(self)} tasks>"
+
+
 class TaskStorage:
     """
     In-memory storage for tasks.
 
     Manages task storage using a dictionary with task IDs as keys.
     Provides CRUD operations and maintains data integrity during the session.
+    Secondary indexes (status, dates, title) are kept in step with every
+    change, so query() does not scan all tasks.
+
+    Subclasses that keep tasks elsewhere override _init_tasks(), so they
+    do not allocate the dictionary and indexes.
     """
 
     def __init__(self) -> None:
         """Initialize empty task storage and ID counter."""
-        self._tasks: Dict[int, Task] = {}
         self._next_id: int = 1
+        self._init_tasks()
+
+    def _init_tasks(self) -> None:
+        """Initialize the empty task dictionary and indexes."""
+        self._tasks: Dict[int, Task] = {}
+        self._index = TaskIndex()
 
     def generate_id(self) -> int:
         """
@@ -43,6 +104,7 @@ class TaskStorage:
             Task: The added task
         """
         self._tasks[task.id] = task
+        self._index.add(task)
         return task
 
     def get(self, task_id: int) -> Optional[Task]:
@@ -57,14 +119,29 @@ class TaskStorage:
         """
         return self._tasks.get(task_id)
 
-    def get_all(self) -> List[Task]:
+    def get_all(self) -> TaskView:
         """
         Retrieve all tasks.
 
         Returns:
-            List[Task]: List of all tasks in storage
+            TaskView: Lazy view of all tasks in storage, in insertion order
+        """
+        return TaskView(lambda: iter(self._tasks.values()), lambda: len(self._tasks))
+
+    def query(self, query: TaskQuery) -> List[Task]:
+        """
+        Find tasks by status, date range and title prefix.
+
+        Args:
+            query: Filters, sort order and limit
+
+        Returns:
+            List[Task]: Matching tasks in the requested order
         """
-        return list(self._tasks.values())
+        ids, presorted = self._index.candidates(query)
+        if ids is None:
+            return query.apply(self._tasks.values())
+        return query.apply((self._tasks[task_id] for task_id in ids), presorted)
 
     def update(self, task_id: int, task: Task) -> Optional[Task]:
         """
@@ -79,6 +156,7 @@ class TaskStorage:
         """
         if task_id in self._tasks:
             self._tasks[task_id] = task
+            self._index.add(task)
             return task
         return None
 
@@ -94,6 +172,7 @@ class TaskStorage:
         """
         if task_id in self._tasks:
             del self._tasks[task_id]
+            self._index.remove(task_id)
             return True
         return False
 
@@ -108,3 +187,6 @@ class TaskStorage:
             bool: True if task exists, False otherwise
         """
         return task_id in self._tasks
+
+    def close(self) -> None:
+        """Release resources held by the storage (nothing to do in memory)."""
@@ -5,7 +5,7 @@ This module provides the console UI with menu display, user input handling,
 and workflow coordination for all task operations.
 """
 
-from typing import Optional
+from typing import Optional, Sequence
 from .models import Task
 from .operations import TaskOperations
 
@@ -73,12 +73,12 @@ class ConsoleUI:
             print(f"    Description: {task.description}")
         print(f"    Created: {task.created_at.strftime('%Y-%m-%d %I:%M %p')}")
 
-    def display_tasks(self, tasks: list[Task]) -> None:
+    def display_tasks(self, tasks: Sequence[Task]) -> None:
         """
         Display a list of tasks.
 
         Args:
-            tasks: List of tasks to display
+            tasks: Tasks to display (a list or a storage's lazy view)
         """
         if not tasks:
             print("\n📝 No tasks found. Your todo list is empty!")
@@ -8,7 +8,11 @@ import sys
 sys.path.insert(0, 'src')
 
 from todo_app.storage import TaskStorage
+from todo_app.log_storage import LogTaskStorage
+from todo_app.sqlite_storage import SqliteTaskStorage
+from todo_app.compact_storage import CompactTaskStorage
 from todo_app.operations import TaskOperations
+from todo_app.indexes import TaskQuery
 from todo_app.models import Task
 
 
@@ -252,6 +256,337 @@ def test_edge_cases():
     return True
 
 
+def test_log_storage():
+    """Test durable storage: restart recovery, snapshots and torn writes."""
+    print("\n=== Testing Log Storage ===")
+    import os
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        # Test 1: Changes survive a restart
+        with LogTaskStorage(data_dir) as storage:
+            ops = TaskOperations(storage)
+            keep = ops.create_task("Keep me", "details")
+            gone = ops.create_task("Delete me")
+            ops.toggle_completion(keep.id)
+            ops.update_task(keep.id, title="Kept")
+            ops.delete_task(gone.id)
+
+        with LogTaskStorage(data_dir) as storage:
+            tasks = storage.get_all()
+            assert [(t.id, t.title, t.completed) for t in tasks] == [(keep.id, "Kept", True)]
+            assert tasks[0].description == "details"
+            assert storage.generate_id() == 3
+        print("✅ Test 1 passed: Tasks and ID counter restored after restart")
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        # Test 2: Snapshots compact the log; replay covers only the tail
+        with LogTaskStorage(data_dir, snapshot_every=10) as storage:
+            ops = TaskOperations(storage)
+            task = ops.create_task("Toggle me")
+            for _ in range(24):
+                ops.toggle_completion(task.id)
+        log_lines = open(os.path.join(data_dir, "tasks.log")).read().splitlines()
+        assert len(log_lines) == 5
+        with LogTaskStorage(data_dir) as storage:
+            assert storage.get(task.id).completed is False
+        print("✅ Test 2 passed: Snapshot plus log tail restores state")
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        # Test 3: A torn final record from a crash is discarded
+        with LogTaskStorage(data_dir) as storage:
+            TaskOperations(storage).create_task("Survivor")
+        with open(os.path.join(data_dir, "tasks.log"), "a") as log:
+            log.write('{"op":"put","task":{"id":2,"tit')
+        with LogTaskStorage(data_dir) as storage:
+            assert [t.title for t in storage.get_all()] == ["Survivor"]
+            TaskOperations(storage).create_task("After crash")
+        with LogTaskStorage(data_dir) as storage:
+            assert [t.title for t in storage.get_all()] == ["Survivor", "After crash"]
+        print("✅ Test 3 passed: Torn write discarded, later writes intact")
+
+    return True
+
+
+def test_storage_selection():
+    """Test that the CLI keeps tasks in memory unless persistence is asked for."""
+    print("\n=== Testing Storage Selection ===")
+    import os
+    import tempfile
+    from unittest import mock
+    from todo_app.main import create_storage
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        with mock.patch.dict(os.environ, {"TODO_DATA_DIR": data_dir}):
+            os.environ.pop("TODO_STORAGE", None)
+            storage = create_storage()
+            assert type(storage) is TaskStorage
+            storage.close()
+            assert os.listdir(data_dir) == []
+            print("✅ Test 1 passed: In-memory storage by default, nothing written")
+
+            os.environ["TODO_STORAGE"] = "log"
+            storage = create_storage()
+            assert isinstance(storage, LogTaskStorage)
+            storage.close()
+            assert os.listdir(data_dir) != []
+            print("✅ Test 2 passed: TODO_STORAGE=log persists under TODO_DATA_DIR")
+
+    return True
+
+
+def test_sqlite_storage():
+    """Test SQLite storage through the unchanged operations layer."""
+    print("\n=== Testing SQLite Storage ===")
+    import os
+    import tempfile
+    from datetime import datetime
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        path = os.path.join(data_dir, "tasks.db")
+
+        # Test 1: CRUD through TaskOperations, persisted across connections
+        with SqliteTaskStorage(path) as storage:
+            ops = TaskOperations(storage)
+            first = ops.create_task("First", "details")
+            second = ops.create_task("Second")
+            ops.toggle_completion(first.id)
+            ops.update_task(second.id, title="Second (renamed)")
+            assert ops.delete_task(second.id) is True
+            assert ops.delete_task(second.id) is False
+            assert ops.update_task(999, title="Nope") is None
+
+        with SqliteTaskStorage(path) as storage:
+            tasks = storage.get_all()
+            assert [(t.id, t.title, t.completed) for t in tasks] == [(first.id, "First", True)]
+            assert tasks[0].description == "details"
+            assert storage.exists(first.id) and not storage.exists(second.id)
+            # IDs keep counting from the AUTOINCREMENT sequence, never reused
+            assert storage.generate_id() == 3
+            assert storage.generate_id() == 4
+        print("✅ Test 1 passed: CRUD and ID allocation persisted")
+
+        # Test 2: Batched inserts and a rolled-back transaction
+        with SqliteTaskStorage(path) as storage:
+            now = datetime.now()
+            batch = [
+                Task(id=storage.generate_id(), title=f"Bulk {i}", description=None,
+                     completed=False, created_at=now, updated_at=now)
+                for i in range(500)
+            ]
+            assert storage.add_many(batch) == 500
+            assert storage.count() == 501
+
+            try:
+                with storage.transaction():
+                    storage.delete(first.id)
+                    raise RuntimeError("abort")
+            except RuntimeError:
+                pass
+            assert storage.exists(first.id)
+            assert sum(1 for _ in storage.iter_all(batch_size=64)) == 501
+        print("✅ Test 2 passed: Batched inserts and rollback")
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        # Test 3: Databases from before title_key get it filled on open
+        import sqlite3
+        path = os.path.join(data_dir, "tasks.db")
+        conn = sqlite3.connect(path)
+        conn.executescript(
+            "CREATE TABLE tasks (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, "
+            "description TEXT, completed INTEGER NOT NULL DEFAULT 0, "
+            "created_at TEXT NOT NULL, updated_at TEXT NOT NULL);"
+            "CREATE INDEX idx_tasks_title ON tasks (title COLLATE NOCASE);"
+            "INSERT INTO tasks (title, completed, created_at, updated_at) "
+            "VALUES ('Straße fegen', 0, '2025-01-01T00:00:00', '2025-01-01T00:00:00');"
+        )
+        conn.commit()
+        conn.close()
+        with SqliteTaskStorage(path) as storage:
+            assert [t.title for t in storage.query(TaskQuery(title_prefix="STRASSE"))] == ["Straße fegen"]
+            assert TaskOperations(storage).create_task("Next").id == 2
+        print("✅ Test 3 passed: Older database migrated to casefolded titles")
+
+    return True
+
+
+def test_compact_storage():
+    """Test the columnar in-memory store through the operations layer."""
+    print("\n=== Testing Compact Storage ===")
+    from datetime import datetime
+
+    # Test 1: CRUD through TaskOperations, with exact timestamp round-trips
+    storage = CompactTaskStorage()
+    assert not hasattr(storage, "_tasks") and not hasattr(storage, "_index")
+    ops = TaskOperations(storage)
+    first = ops.create_task("First", "details")
+    second = ops.create_task("Second")
+    toggled = ops.toggle_completion(first.id)
+    ops.update_task(second.id, title="Second (renamed)")
+    # Reads return copies, so compare against the task returned by the write
+    stored = storage.get(first.id)
+    assert (stored.title, stored.description, stored.completed) == ("First", "details", True)
+    assert stored.created_at == first.created_at
+    assert stored.updated_at == toggled.updated_at
+    assert ops.delete_task(first.id) is True
+    assert ops.delete_task(first.id) is False
+    assert storage.get(first.id) is None and not storage.exists(first.id)
+    assert [t.title for t in ops.list_tasks()] == ["Second (renamed)"]
+    print("✅ Test 1 passed: CRUD and timestamps")
+
+    # Test 2: get_all is a live, indexable view in ID order
+    storage = CompactTaskStorage()
+    now = datetime(2025, 1, 1, 12, 30, 45, 123456)
+    for task_id in (5, 2, 9):
+        storage.add(Task(id=task_id, title=f"Task {task_id}", description=None,
+                         completed=False, created_at=now, updated_at=now))
+    tasks = storage.get_all()
+    assert len(tasks) == 3
+    assert [t.id for t in tasks] == [2, 5, 9]
+    assert tasks[-1].id == 9 and [t.id for t in tasks[1:]] == [5, 9]
+    storage.delete(5)
+    assert len(tasks) == 2 and [t.id for t in tasks] == [2, 9]
+    assert tasks[0].created_at == now
+    print("✅ Test 2 passed: Lazy ordered view")
+
+    # Test 3: Mass deletion compacts the columns
+    storage = CompactTaskStorage()
+    for i in range(1, 3001):
+        storage.add(Task(id=i, title="Bulk", description=None,
+                         completed=i % 2 == 0, created_at=now, updated_at=now))
+    for i in range(1, 2501):
+        storage.delete(i)
+    assert len(storage._ids) < 3000
+    assert len(storage.get_all()) == 500
+    assert storage.count_completed() == 250
+    assert [t.id for t in storage.get_all()][:2] == [2501, 2502]
+    print("✅ Test 3 passed: Compaction after deletes")
+
+    return True
+
+
+def test_task_queries():
+    """Test indexed queries against a full scan on every store."""
+    print("\n=== Testing Task Queries ===")
+    from datetime import datetime, timedelta
+
+    start = datetime(2025, 1, 1)
+    titles = ["Buy milk", "buy bread", "Call mom", "Build shed", "Read book"]
+
+    def fill(storage):
+        ops = TaskOperations(storage)
+        for i in range(1, 201):
+            created = start + timedelta(hours=i)
+            storage.add(Task(id=storage.generate_id(), title=f"{titles[i % 5]} {i}",
+                             description=None, completed=i % 3 == 0,
+                             created_at=created, updated_at=created))
+        # Keep the indexes in step with in-place updates and deletes
+        for task_id in range(1, 201, 7):
+            ops.toggle_completion(task_id)
+            ops.update_task(task_id, title=f"Buy stamps {task_id}")
+        for task_id in range(2, 201, 11):
+            ops.delete_task(task_id)
+        return ops
+
+    def expected(ops, **filters):
+        order_by = filters.pop("order_by", "id")
+        descending = filters.pop("descending", False)
+        limit = filters.pop("limit", None)
+        tasks = [t for t in ops.list_tasks() if all(
+            (name == "completed" and t.completed == value)
+            or (name == "created_since" and t.created_at >= value)
+            or (name == "created_before" and t.created_at < value)
+            or (name == "updated_since" and t.updated_at >= value)
+            or (name == "title_prefix" and t.title.lower().startswith(value.lower()))
+            for name, value in filters.items()
+        )]
+        key = {"id": lambda t: (t.id,), "created_at": lambda t: (t.created_at, t.id),
+               "updated_at": lambda t: (t.updated_at, t.id),
+               "title": lambda t: (t.title.lower(), t.id)}[order_by]
+        tasks.sort(key=key, reverse=descending)
+        return [t.id for t in tasks[:limit]]
+
+    cases = [
+        {},
+        {"completed": True},
+        {"completed": False, "limit": 5},
+        {"created_since": start + timedelta(hours=50), "created_before": start + timedelta(hours=80)},
+        {"created_since": start + timedelta(hours=150), "order_by": "created_at", "descending": True},
+        {"updated_since": start + timedelta(days=365), "order_by": "updated_at"},
+        {"title_prefix": "buy", "order_by": "title", "limit": 10},
+        {"title_prefix": "Buy b", "completed": True},
+        {"completed": True, "created_before": start + timedelta(hours=100),
+         "order_by": "id", "descending": True, "limit": 3},
+        {"order_by": "title", "descending": True, "limit": 7},
+    ]
+
+    # Test 1: Every store answers every query like a full scan would
+    stores = [TaskStorage(), CompactTaskStorage(), SqliteTaskStorage(":memory:")]
+    for storage in stores:
+        ops = fill(storage)
+        for case in cases:
+            got = [t.id for t in ops.query(**case)]
+            assert got == expected(ops, **dict(case)), (type(storage).__name__, case, got)
+    print("✅ Test 1 passed: Queries match a full scan on all stores")
+
+    # Test 2: Queries are driven by the smallest index range
+    storage = TaskStorage()
+    ops = fill(storage)
+    ids, presorted = storage._index.candidates(TaskQuery(
+        completed=False,
+        created_since=start + timedelta(hours=10),
+        created_before=start + timedelta(hours=12),
+        order_by="created_at",
+    ))
+    assert presorted and len(list(ids)) == 2
+    print("✅ Test 2 passed: Smallest index range drives the query")
+
+    # Test 3: Validation
+    for bad in ({"order_by": "priority"}, {"limit": -1}):
+        try:
+            ops.query(**bad)
+            assert False, "Should have raised ValueError"
+        except ValueError:
+            pass
+    print("✅ Test 3 passed: Invalid sort field and limit rejected")
+
+    # Test 4: Indexes stay consistent across many random changes
+    import random
+    rng = random.Random(16)
+    storage = TaskStorage()
+    ops = TaskOperations(storage)
+    for i in range(5000):
+        created = start + timedelta(minutes=rng.randrange(100000))
+        storage.add(Task(id=storage.generate_id(), title=f"{rng.choice(titles)} {i}",
+                         description=None, completed=rng.random() < 0.3,
+                         created_at=created, updated_at=created))
+    for task_id in rng.sample(range(1, 5001), 1500):
+        if rng.random() < 0.5:
+            ops.delete_task(task_id)
+        else:
+            ops.toggle_completion(task_id)
+    for case in cases + [{"completed": False, "order_by": "created_at", "descending": True, "limit": 5}]:
+        got = [t.id for t in ops.query(**case)]
+        assert got == expected(ops, **dict(case)), (case, got)
+    print("✅ Test 4 passed: Indexes consistent after random changes")
+
+    # Test 5: Non-ASCII prefixes fold the same way on every store
+    for storage in [TaskStorage(), CompactTaskStorage(), SqliteTaskStorage(":memory:")]:
+        ops = TaskOperations(storage)
+        for title in ["Éclair recipe", "éte plans", "Straße fegen", "STRASSE map", "Eclipse"]:
+            ops.create_task(title)
+        name = type(storage).__name__
+        assert [t.title for t in ops.query(title_prefix="É")] == ["Éclair recipe", "éte plans"], name
+        assert [t.title for t in ops.query(title_prefix="strasse")] == ["Straße fegen", "STRASSE map"], name
+        assert [t.title for t in ops.query(title_prefix="ß")] == [], name
+        assert [t.title for t in ops.query(order_by="title")] == [
+            "Eclipse", "Straße fegen", "STRASSE map", "Éclair recipe", "éte plans"
+        ], name
+    print("✅ Test 5 passed: Casefolded prefixes (É, ß) agree across stores")
+
+    return True
+
+
 def run_all_tests():
     """Run all tests."""
     print("\n" + "=" * 60)
@@ -266,6 +601,11 @@ def run_all_tests():
         ("Task Completion", test_task_completion),
         ("Storage Layer", test_storage_layer),
         ("Edge Cases", test_edge_cases),
+        ("Log Storage", test_log_storage),
+        ("Storage Selection", test_storage_selection),
+        ("SQLite Storage", test_sqlite_storage),
+        ("Compact Storage", test_compact_storage),
+        ("Task Queries", test_task_queries),
     ]
 
     passed = 0